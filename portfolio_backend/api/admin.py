@@ -1,11 +1,18 @@
+import datetime
+from functools import partial
+
 from django.contrib import admin
+from django.utils import timezone
 from django.utils.html import format_html
 from .models import (
     Project, BlogPost, ContactSubmission, Category, Tag, Subscriber,
     Profile, Education, SkillGroup, SkillItem, ProjectBullet,
     SocialLink, Experience, ExperienceBullet, Certification,
-    Language, Interest, CustomSection, CustomSectionItem
+    Language, Interest, CustomSection, CustomSectionItem,
+    AnalyticsHourly, AnalyticsDaily, VisitorSketch
 )
+from .pagination import EstimatedCountPaginator
+from .visitors import unique_visitors
 
 
 @admin.register(Category)
@@ -39,8 +46,26 @@ class ProjectBulletInline(admin.TabularInline):
     extra = 1
 
 
+class UniqueVisitorsAdminMixin:
+    """Show the estimated unique visitors of objects with visitor sketches"""
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(
+            unique_visitors_estimate=VisitorSketch.all_time_subquery(self.model)
+        )
+
+    def unique_visitors(self, obj):
+        return obj.unique_visitors_estimate or 0
+    unique_visitors.short_description = 'Unique visitors'
+    unique_visitors.admin_order_field = 'unique_visitors_estimate'
+
+    def unique_visitors_30d(self, obj):
+        return unique_visitors(obj, start=timezone.localdate() - datetime.timedelta(days=29))
+    unique_visitors_30d.short_description = 'Unique visitors (30 days)'
+
+
 @admin.register(Project)
-class ProjectAdmin(admin.ModelAdmin):
+class ProjectAdmin(UniqueVisitorsAdminMixin, admin.ModelAdmin):
     """Admin interface for Project model"""
     inlines = [ProjectBulletInline]
     list_display = [
@@ -48,6 +73,7 @@ class ProjectAdmin(admin.ModelAdmin):
         'status',
         'is_featured',
         'views_count',
+        'unique_visitors',
         'order',
         'image_preview',
         'created_at'
@@ -56,7 +82,10 @@ class ProjectAdmin(admin.ModelAdmin):
     search_fields = ['title', 'description', 'technologies_used']
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ['tags']
-    readonly_fields = ['thumbnail', 'views_count', 'created_at', 'updated_at', 'image_preview']
+    readonly_fields = [
+        'thumbnail', 'views_count', 'unique_visitors', 'unique_visitors_30d',
+        'created_at', 'updated_at', 'image_preview'
+    ]
     
     fieldsets = (
         ('Basic Information', {
@@ -76,7 +105,10 @@ class ProjectAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Status & Ordering', {
-            'fields': ('status', 'is_featured', 'order', 'views_count')
+            'fields': (
+                'status', 'is_featured', 'order',
+                'views_count', 'unique_visitors', 'unique_visitors_30d'
+            )
         }),
         ('Timestamps', {
             'fields': ('created_at', 'updated_at'),
@@ -100,7 +132,7 @@ class ProjectAdmin(admin.ModelAdmin):
 
 
 @admin.register(BlogPost)
-class BlogPostAdmin(admin.ModelAdmin):
+class BlogPostAdmin(UniqueVisitorsAdminMixin, admin.ModelAdmin):
     """Admin interface for BlogPost model"""
     list_display = [
         'title',
@@ -109,6 +141,7 @@ class BlogPostAdmin(admin.ModelAdmin):
         'status',
         'is_featured',
         'views_count',
+        'unique_visitors',
         'reading_time',
         'published_date'
     ]
@@ -116,7 +149,10 @@ class BlogPostAdmin(admin.ModelAdmin):
     search_fields = ['title', 'excerpt', 'content']
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ['tags']
-    readonly_fields = ['reading_time', 'views_count', 'published_date', 'updated_at', 'image_preview']
+    readonly_fields = [
+        'reading_time', 'views_count', 'unique_visitors', 'unique_visitors_30d',
+        'published_date', 'updated_at', 'image_preview'
+    ]
     
     fieldsets = (
         ('Basic Information', {
@@ -133,7 +169,10 @@ class BlogPostAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
         ('Status & Metrics', {
-            'fields': ('status', 'is_featured', 'views_count', 'reading_time')
+            'fields': (
+                'status', 'is_featured', 'views_count',
+                'unique_visitors', 'unique_visitors_30d', 'reading_time'
+            )
         }),
         ('Timestamps', {
             'fields': ('published_date', 'updated_at'),
@@ -171,6 +210,9 @@ class ContactSubmissionAdmin(admin.ModelAdmin):
     list_filter = ['status', 'submitted_at']
     search_fields = ['name', 'email', 'subject', 'message']
     readonly_fields = ['name', 'email', 'subject', 'message', 'phone', 'ip_address', 'user_agent', 'submitted_at']
+    # Estimated (unfiltered) or cached counts instead of two COUNT(*) per page
+    paginator = partial(EstimatedCountPaginator, domain='contact')
+    show_full_result_count = False
     
     fieldsets = (
         ('Contact Information', {
@@ -458,6 +500,35 @@ class CustomSectionAdmin(admin.ModelAdmin):
     item_count.short_description = 'Items'
 
 
+@admin.register(AnalyticsDaily)
+class AnalyticsDailyAdmin(admin.ModelAdmin):
+    list_display = ['date', 'kind', 'name', 'count']
+    list_filter = ['kind', 'date']
+    search_fields = ['name']
+    date_hierarchy = 'date'
+    ordering = ['-date', '-count']
+    readonly_fields = ['date', 'kind', 'name', 'count']
+
+
+@admin.register(AnalyticsHourly)
+class AnalyticsHourlyAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'kind', 'name', 'count']
+    list_filter = ['kind']
+    search_fields = ['name']
+    date_hierarchy = 'hour'
+    ordering = ['-hour', '-count']
+    readonly_fields = ['hour', 'kind', 'name', 'count']
+
+
+@admin.register(VisitorSketch)
+class VisitorSketchAdmin(admin.ModelAdmin):
+    list_display = ['model', 'object_id', 'date', 'estimate', 'updated_at']
+    list_filter = ['model', 'date']
+    ordering = ['-date', '-estimate']
+    exclude = ['registers']
+    readonly_fields = ['model', 'object_id', 'date', 'estimate', 'updated_at']
+
+
 # Customize admin site
 admin.site.site_header = "Portfolio Admin"
 admin.site.site_title = "Portfolio Admin Portal"
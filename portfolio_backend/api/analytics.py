@@ -0,0 +1,136 @@
+"""
+Page and section view analytics
+
+The frontend sends batches of view events with navigator.sendBeacon. They
+are appended to a compact buffer of 'hour|kind|name' strings (a Redis list
+shared by all workers, or an in-process list without Redis) and never
+inserted one by one. Every ANALYTICS_FLUSH_INTERVAL seconds the buffer is
+counted in one pass and added to the hourly and daily rollup tables with a
+handful of bulk queries, however many events it holds.
+"""
+import datetime
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .counters import buffer_redis, start_flusher
+from .models import AnalyticsHourly, AnalyticsDaily
+
+
+REDIS_KEY = 'portfolio:analytics:events'
+MAX_EVENTS_PER_BATCH = 50
+
+_events = []
+_events_lock = threading.Lock()
+
+
+def buffer_events(events, now=None):
+    """
+    Append view events to the buffer
+
+    Args:
+        events: Iterable of (kind, name) tuples
+        now: Unix time the events happened at (default: now)
+    """
+    start_flusher(flush_analytics, settings.ANALYTICS_FLUSH_INTERVAL, _events.clear)
+    hour = int(now or time.time()) // 3600
+    packed = [f"{hour}|{kind}|{name}" for kind, name in events]
+    if not packed:
+        return
+
+    redis = buffer_redis()
+    if redis is not None:
+        try:
+            redis.rpush(REDIS_KEY, *packed)
+            return
+        except Exception as e:
+            print(f"Error buffering analytics events in Redis: {e}")
+
+    with _events_lock:
+        _events.extend(packed)
+
+
+def _take_events():
+    """Atomically take every buffered event"""
+    with _events_lock:
+        taken = _events[:]
+        del _events[:]
+
+    redis = buffer_redis()
+    if redis is not None:
+        try:
+            pipe = redis.pipeline()
+            pipe.lrange(REDIS_KEY, 0, -1)
+            pipe.delete(REDIS_KEY)
+            taken.extend(event.decode() for event in pipe.execute()[0])
+        except Exception as e:
+            print(f"Error reading analytics events from Redis: {e}")
+
+    return taken
+
+
+def aggregate_events(packed):
+    """
+    Count packed events per hour and per day
+
+    Returns:
+        (hourly, daily) Counters keyed by (datetime, kind, name) and
+        (date, kind, name)
+    """
+    hourly = Counter()
+    daily = Counter()
+    for event, count in Counter(packed).items():
+        hour, kind, name = event.split('|', 2)
+        bucket = datetime.datetime.fromtimestamp(int(hour) * 3600, tz=datetime.timezone.utc)
+        hourly[(bucket, kind, name)] += count
+        daily[(timezone.localdate(bucket), kind, name)] += count
+    return hourly, daily
+
+
+def _add_counts(model, bucket_field, counts):
+    """Add counts to a rollup table: one INSERT, one SELECT and one UPDATE"""
+    model.objects.bulk_create(
+        [model(**{bucket_field: bucket}, kind=kind, name=name) for bucket, kind, name in counts],
+        ignore_conflicts=True
+    )
+    rows = model.objects.filter(**{
+        f'{bucket_field}__in': {key[0] for key in counts},
+        'name__in': {key[2] for key in counts},
+    })
+    updated = []
+    for row in rows:
+        count = counts.get((getattr(row, bucket_field), row.kind, row.name))
+        if count:
+            row.count = F('count') + count
+            updated.append(row)
+    model.objects.bulk_update(updated, ['count'], batch_size=500)
+
+
+def flush_analytics():
+    """
+    Aggregate the buffered events into the rollup tables
+
+    Returns:
+        Number of events flushed
+    """
+    packed = _take_events()
+    if not packed:
+        return 0
+
+    hourly, daily = aggregate_events(packed)
+    try:
+        with transaction.atomic():
+            _add_counts(AnalyticsHourly, 'hour', hourly)
+            _add_counts(AnalyticsDaily, 'date', daily)
+    except Exception as e:
+        print(f"Error flushing analytics: {e}")
+        # Put them back for the next flush
+        with _events_lock:
+            _events.extend(packed)
+        return 0
+    return len(packed)
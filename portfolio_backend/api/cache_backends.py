@@ -0,0 +1,567 @@
+"""
+Two-tier cache backend: a per-process LRU in front of a shared cache
+
+Hot keys such as the portfolio snapshot, featured lists and throttle
+counters are served from memory inside each gunicorn worker. Writes go to
+the shared cache (Redis) and are broadcast on a pub/sub channel so every
+other worker drops its local copy. Without a shared cache the local tier is
+used on its own, like LocMemCache.
+
+A value read from the shared tier is only kept locally if no invalidation
+reached the worker during the read, so a slow read cannot put back a value
+that was replaced meanwhile. Keys starting with one of the SHARED_ONLY
+prefixes (the content version keys by default) are never kept locally: every
+worker must see a bump at once, not up to LOCAL_TIMEOUT later.
+
+Keys can be tagged when set (`cache.set(key, value, tags=['project:42'])`)
+and every key of a tag deleted with `cache.delete_tags(['project:42'])`.
+Tag membership lives in Redis sets, or in an in-process index when there is
+no Redis, so invalidation never scans the keyspace.
+
+Configuration:
+    CACHES = {
+        'default': {
+            'BACKEND': 'api.cache_backends.TwoTierCache',
+            'OPTIONS': {
+                'SHARED_CACHE': 'shared',    # alias of the shared tier (optional)
+                'MAX_ENTRIES': 1000,         # local tier entry limit
+                'MAX_BYTES': 32 * 1024 * 1024,  # local tier size limit
+                'LOCAL_TIMEOUT': 60,         # max local lifetime with a shared tier
+                'CHANNEL': 'cache-invalidation',
+                'SHARED_ONLY': ['cache_version:', 'cache_changed:'],
+            },
+        },
+        'shared': {'BACKEND': 'django_redis.cache.RedisCache', ...},
+    }
+"""
+import fnmatch
+import json
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+_MISSING = object()
+
+# Adds keys to a tag set, extending (never shortening) its expiry to the
+# longest-lived member. ARGV[1] is the timeout in seconds, 0 for none.
+_TAG_KEYS_SCRIPT = """
+local new = redis.call('EXISTS', KEYS[1]) == 0
+redis.call('SADD', KEYS[1], unpack(ARGV, 2))
+local timeout = tonumber(ARGV[1])
+if timeout == 0 then
+    redis.call('PERSIST', KEYS[1])
+else
+    local ttl = redis.call('TTL', KEYS[1])
+    if new or (ttl >= 0 and ttl < timeout) then
+        redis.call('EXPIRE', KEYS[1], timeout)
+    end
+end
+"""
+
+# Per-process tier state, keyed by cache LOCATION. Django creates a cache
+# instance per thread, but all threads of a worker share one local tier.
+_tiers = {}
+_tiers_lock = threading.Lock()
+
+
+class LocalLRUCache:
+    """Thread-safe LRU of pickled values, bounded by entry count and total size"""
+
+    def __init__(self, max_entries, max_bytes):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.evictions = 0
+        self._data = OrderedDict()  # key -> (expires_at, pickled)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    @property
+    def size(self):
+        return self._bytes
+
+    def _pop(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+        return item
+
+    def _get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[0] is not None and item[0] <= time.time():
+            self._pop(key)
+            return None
+        self._data.move_to_end(key)
+        return item
+
+    def _set(self, key, pickled, expires_at):
+        self._pop(key)
+        if len(pickled) > self.max_bytes:
+            return
+        self._data[key] = (expires_at, pickled)
+        self._bytes += len(pickled)
+        while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+            self._pop(next(iter(self._data)))
+            self.evictions += 1
+
+    def get(self, key):
+        """Return the pickled value, or None if missing or expired"""
+        with self._lock:
+            item = self._get(key)
+        return item and item[1]
+
+    def set(self, key, pickled, expires_at):
+        with self._lock:
+            self._set(key, pickled, expires_at)
+
+    def add(self, key, pickled, expires_at):
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._set(key, pickled, expires_at)
+            return True
+
+    def incr(self, key, delta):
+        with self._lock:
+            item = self._get(key)
+            if item is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(item[1]) + delta
+            self._set(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), item[0])
+        return value
+
+    def touch(self, key, expires_at):
+        with self._lock:
+            item = self._get(key)
+            if item is None:
+                return False
+            self._data[key] = (expires_at, item[1])
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            return self._pop(key) is not None
+
+    def delete_matching(self, pattern):
+        with self._lock:
+            for key in [key for key in self._data if fnmatch.fnmatchcase(key, pattern)]:
+                self._pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+
+class ProcessTier:
+    """Local tier of one worker process, shared by its threads"""
+
+    def __init__(self, local):
+        self.local = local
+        self.counters = dict.fromkeys(
+            ('local_hits', 'local_misses', 'shared_hits', 'shared_misses', 'invalidations'),
+            0
+        )
+        # Changed after every local write or invalidation (see _fill_local)
+        self.generation = 0
+        self.pid = None
+        self.redis = None
+        self.sender_id = None
+        self.lock = threading.Lock()
+        # tag -> {key: expires_at}, used when there is no Redis
+        self.tags = {}
+        self.tags_lock = threading.Lock()
+        self.tag_script = None
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend keeping hot keys in process memory in front of a shared cache
+
+    Reads check the local LRU first and fall back to the shared tier; writes
+    go to both and publish the key on the invalidation channel. Hit and miss
+    counters are kept per tier (see stats()).
+    """
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._shared_alias = options.get('SHARED_CACHE')
+        self._local_timeout = int(options.get('LOCAL_TIMEOUT', 60))
+        self._channel = options.get('CHANNEL', 'cache-invalidation')
+        self._shared_only = tuple(options.get('SHARED_ONLY', ('cache_version:', 'cache_changed:')))
+        with _tiers_lock:
+            if location not in _tiers:
+                _tiers[location] = ProcessTier(LocalLRUCache(
+                    self._max_entries,
+                    int(options.get('MAX_BYTES', 32 * 1024 * 1024))
+                ))
+            self._tier = _tiers[location]
+        self._local = self._tier.local
+        self._counters = self._tier.counters
+        self._shared = None
+
+    # ----- tiers -----
+
+    def _shared_tier(self):
+        """Return the shared cache, (re)starting the subscriber in a new process"""
+        if self._shared_alias is None:
+            return None
+        if self._tier.pid != os.getpid():
+            self._connect()
+        if self._shared is None:
+            self._shared = caches[self._shared_alias]
+        return self._shared
+
+    def _connect(self):
+        tier = self._tier
+        with tier.lock:
+            if tier.pid == os.getpid():
+                return
+            client = getattr(caches[self._shared_alias], 'client', None)
+            get_client = getattr(client, 'get_client', None)
+            tier.redis = get_client(write=True) if get_client else None
+            tier.sender_id = uuid.uuid4().hex
+            # A forked worker inherits its parent's local entries unsubscribed
+            self._local.clear()
+            if tier.redis is not None:
+                threading.Thread(
+                    target=self._listen, name='cache-invalidation', daemon=True
+                ).start()
+            tier.pid = os.getpid()
+
+    def _listen(self):
+        """Drop local entries invalidated by other processes"""
+        while True:
+            try:
+                pubsub = self._tier.redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    self._handle_invalidation(message['data'])
+            except Exception as e:
+                print(f"Cache invalidation subscriber error: {e}")
+            # Messages may have been missed while disconnected
+            self._local.clear()
+            self._tier.generation += 1
+            time.sleep(1)
+
+    def _handle_invalidation(self, data):
+        payload = json.loads(data)
+        if payload['sender'] == self._tier.sender_id:
+            return
+        self._counters['invalidations'] += 1
+        if payload['keys'] is None:
+            self._local.clear()
+        elif 'pattern' in payload:
+            self._local.delete_matching(payload['pattern'])
+        else:
+            for key in payload['keys']:
+                self._local.delete(key)
+        self._tier.generation += 1
+
+    def _publish(self, keys, pattern=None):
+        redis = self._tier.redis
+        if redis is None:
+            return
+        payload = {'sender': self._tier.sender_id, 'keys': keys}
+        if pattern is not None:
+            payload['pattern'] = pattern
+        try:
+            redis.publish(self._channel, json.dumps(payload))
+        except Exception as e:
+            print(f"Error publishing cache invalidation: {e}")
+
+    def _local_expiry(self, timeout=DEFAULT_TIMEOUT):
+        """Expiry of a local entry: the key's own, capped while a shared tier exists"""
+        expires_at = self.get_backend_timeout(timeout)
+        if self._shared_alias is None:
+            return expires_at
+        cap = time.time() + self._local_timeout
+        return cap if expires_at is None else min(expires_at, cap)
+
+    def _dumps(self, value):
+        return pickle.dumps(value, self.pickle_protocol)
+
+    def _keeps_locally(self, key):
+        """Whether the local tier may hold the key (SHARED_ONLY keys it may not)"""
+        return self._shared_alias is None or not key.startswith(self._shared_only)
+
+    def _set_local(self, key, local_key, value, timeout=DEFAULT_TIMEOUT):
+        """Write a value just written to the shared tier locally too"""
+        if self._keeps_locally(key):
+            self._local.set(local_key, self._dumps(value), self._local_expiry(timeout))
+        self._tier.generation += 1
+
+    def _fill_local(self, key, local_key, value, generation):
+        """
+        Keep a value read from the shared tier locally
+
+        `generation` is the tier's generation from before the read. If it
+        changed, the key may have been written or invalidated since, and the
+        value is dropped rather than kept for up to LOCAL_TIMEOUT.
+        """
+        if not self._keeps_locally(key) or self._tier.generation != generation:
+            return
+        self._local.set(local_key, self._dumps(value), self._local_expiry())
+        # An invalidation may have arrived between the check and the set
+        if self._tier.generation != generation:
+            self._local.delete(local_key)
+
+    # ----- cache API -----
+
+    def get(self, key, default=None, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        pickled = self._local.get(local_key)
+        if pickled is not None:
+            self._counters['local_hits'] += 1
+            return pickle.loads(pickled)
+        self._counters['local_misses'] += 1
+
+        shared = self._shared_tier()
+        if shared is None:
+            return default
+
+        generation = self._tier.generation
+        value = shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._counters['shared_misses'] += 1
+            return default
+        self._counters['shared_hits'] += 1
+        self._fill_local(key, local_key, value, generation)
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = []
+        for key in keys:
+            pickled = self._local.get(self.make_and_validate_key(key, version=version))
+            if pickled is None:
+                missing.append(key)
+            else:
+                found[key] = pickle.loads(pickled)
+        self._counters['local_hits'] += len(found)
+        self._counters['local_misses'] += len(missing)
+
+        shared = self._shared_tier()
+        if missing and shared is not None:
+            generation = self._tier.generation
+            fetched = shared.get_many(missing, version=version)
+            self._counters['shared_hits'] += len(fetched)
+            self._counters['shared_misses'] += len(missing) - len(fetched)
+            for key, value in fetched.items():
+                local_key = self.make_and_validate_key(key, version=version)
+                self._fill_local(key, local_key, value, generation)
+            found.update(fetched)
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, tags=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        shared = self._shared_tier()
+        if shared is not None:
+            shared.set(key, value, timeout=timeout, version=version)
+            self._publish([local_key])
+        self._set_local(key, local_key, value, timeout)
+        if tags:
+            self.tag(key, tags, timeout=timeout, version=version)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        shared = self._shared_tier()
+        failed = []
+        if shared is not None:
+            failed = shared.set_many(data, timeout=timeout, version=version) or []
+        local_keys = []
+        for key, value in data.items():
+            local_key = self.make_and_validate_key(key, version=version)
+            local_keys.append(local_key)
+            if key not in failed:
+                self._set_local(key, local_key, value, timeout)
+        if shared is not None:
+            self._publish(local_keys)
+        return failed
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        shared = self._shared_tier()
+        if shared is None:
+            return self._local.add(local_key, self._dumps(value), self._local_expiry(timeout))
+        added = shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._publish([local_key])
+            self._set_local(key, local_key, value, timeout)
+        return added
+
+    def incr(self, key, delta=1, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        shared = self._shared_tier()
+        if shared is None:
+            return self._local.incr(local_key, delta)
+        value = shared.incr(key, delta, version=version)
+        self._publish([local_key])
+        self._set_local(key, local_key, value)
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        shared = self._shared_tier()
+        if shared is None:
+            return self._local.touch(local_key, self.get_backend_timeout(timeout))
+        self._local.delete(local_key)
+        self._tier.generation += 1
+        return shared.touch(key, timeout=timeout, version=version)
+
+    def has_key(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        if self._local.get(local_key) is not None:
+            return True
+        shared = self._shared_tier()
+        return shared is not None and shared.has_key(key, version=version)
+
+    def delete(self, key, version=None):
+        local_key = self.make_and_validate_key(key, version=version)
+        deleted = self._local.delete(local_key)
+        self._tier.generation += 1
+        shared = self._shared_tier()
+        if shared is None:
+            return deleted
+        self._publish([local_key])
+        return bool(shared.delete(key, version=version))
+
+    def delete_many(self, keys, version=None):
+        local_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        for local_key in local_keys:
+            self._local.delete(local_key)
+        self._tier.generation += 1
+        shared = self._shared_tier()
+        if shared is not None:
+            shared.delete_many(keys, version=version)
+            self._publish(local_keys)
+
+    def delete_pattern(self, pattern, version=None):
+        """Delete keys matching a glob pattern (delegated to django-redis if shared)"""
+        local_pattern = self.make_key(pattern, version=version)
+        self._local.delete_matching(local_pattern)
+        self._tier.generation += 1
+        shared = self._shared_tier()
+        if shared is not None and hasattr(shared, 'delete_pattern'):
+            shared.delete_pattern(pattern, version=version)
+            self._publish([], pattern=local_pattern)
+
+    def clear(self):
+        self._local.clear()
+        self._tier.generation += 1
+        with self._tier.tags_lock:
+            self._tier.tags.clear()
+        shared = self._shared_tier()
+        if shared is not None:
+            shared.clear()
+            self._publish(None)
+
+    # ----- tags -----
+
+    def _tag_redis(self, shared):
+        """Raw Redis client and key maker of the shared tier, if it is django-redis"""
+        client = getattr(shared, 'client', None)
+        if self._tier.redis is None or not hasattr(client, 'make_key'):
+            return None, None
+        return self._tier.redis, client.make_key
+
+    def tag(self, key, tags, timeout=DEFAULT_TIMEOUT, version=None):
+        """Attach tags to an existing key"""
+        shared = self._shared_tier()
+        redis, make_key = self._tag_redis(shared)
+
+        if redis is not None:
+            expires_at = self.get_backend_timeout(timeout)
+            seconds = 0 if expires_at is None else max(1, int(expires_at - time.time()) + 1)
+            try:
+                if self._tier.tag_script is None:
+                    self._tier.tag_script = redis.register_script(_TAG_KEYS_SCRIPT)
+                script = self._tier.tag_script
+                pipe = redis.pipeline(transaction=False)
+                for tag in tags:
+                    script(keys=[str(make_key(f"tag:{tag}", version=version))],
+                           args=[seconds, key], client=pipe)
+                pipe.execute()
+            except Exception as e:
+                print(f"Error tagging cache key {key}: {e}")
+            return
+
+        expires_at = self.get_backend_timeout(timeout)
+        now = time.time()
+        with self._tier.tags_lock:
+            for tag in tags:
+                members = self._tier.tags.setdefault(self.make_key(f"tag:{tag}", version), {})
+                members[key] = expires_at
+                if len(members) % 100 == 0:
+                    # Forget members that expired on their own
+                    for member in [m for m, exp in members.items() if exp is not None and exp <= now]:
+                        del members[member]
+
+    def delete_tags(self, tags, version=None):
+        """
+        Delete every key attached to any of the given tags
+
+        Reads the tag sets in one pipeline and deletes their keys (and only
+        those members, so keys tagged meanwhile survive) in one transaction.
+
+        Returns:
+            Number of keys invalidated
+        """
+        shared = self._shared_tier()
+        redis, make_key = self._tag_redis(shared)
+
+        if redis is not None:
+            tag_keys = [str(make_key(f"tag:{tag}", version=version)) for tag in tags]
+            pipe = redis.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = [
+                {member.decode() if isinstance(member, bytes) else member for member in found}
+                for found in pipe.execute()
+            ]
+            keys = set().union(*members)
+
+            pipe = redis.pipeline()
+            if keys:
+                pipe.delete(*[str(make_key(key, version=version)) for key in keys])
+            for tag_key, found in zip(tag_keys, members):
+                if found:
+                    pipe.srem(tag_key, *found)
+            pipe.execute()
+        else:
+            with self._tier.tags_lock:
+                keys = set()
+                for tag in tags:
+                    keys.update(self._tier.tags.pop(self.make_key(f"tag:{tag}", version), {}))
+            if keys and shared is not None:
+                shared.delete_many(list(keys), version=version)
+
+        local_keys = [self.make_key(key, version) for key in keys]
+        for local_key in local_keys:
+            self._local.delete(local_key)
+        self._tier.generation += 1
+        if local_keys and shared is not None:
+            self._publish(local_keys)
+        return len(keys)
+
+    def stats(self):
+        """Hit/miss counters per tier for this process"""
+        return {
+            **self._counters,
+            'local_entries': len(self._local),
+            'local_bytes': self._local.size,
+            'local_evictions': self._local.evictions,
+            'shared': self._shared_alias is not None,
+        }
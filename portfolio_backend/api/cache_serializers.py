@@ -0,0 +1,101 @@
+"""
+Compact value encoding for the Redis cache (django-redis)
+
+Cached API payloads are plain dicts, lists and strings, so they are stored
+as JSON instead of pickles and compressed with zlib once they are large
+enough for it to pay off. Anything JSON cannot represent exactly (cached
+HttpResponse objects, tuples, non-string dict keys, ...) falls back to
+pickle. The leading byte tells the formats apart: pickles start with 0x80
+and zlib streams with 'x', which no JSON document does.
+
+Configuration:
+    'OPTIONS': {
+        'SERIALIZER': 'api.cache_serializers.JSONSerializer',
+        'COMPRESSOR': 'api.cache_serializers.ZlibCompressor',
+        'COMPRESS_MIN_LENGTH': 1024,  # bytes; smaller values stay uncompressed
+        'COMPRESS_LEVEL': 6,
+    }
+"""
+import base64
+import datetime
+import json
+import pickle
+import zlib
+
+from django_redis.compressors.base import BaseCompressor
+from django_redis.exceptions import CompressorError
+from django_redis.serializers.base import BaseSerializer
+
+
+class _NotJSON(Exception):
+    pass
+
+
+def _to_json(value):
+    """Convert a value to JSON types, tagging bytes and datetimes"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        if not all(isinstance(key, str) for key in value):
+            raise _NotJSON
+        return {key: _to_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, bytes):
+        try:
+            return {'__bytes__': value.decode('utf-8')}
+        except UnicodeDecodeError:
+            return {'__b64__': base64.b64encode(value).decode('ascii')}
+    if isinstance(value, datetime.datetime):
+        return {'__datetime__': value.isoformat()}
+    raise _NotJSON
+
+
+def _from_json(obj):
+    if len(obj) == 1:
+        if '__bytes__' in obj:
+            return obj['__bytes__'].encode('utf-8')
+        if '__b64__' in obj:
+            return base64.b64decode(obj['__b64__'])
+        if '__datetime__' in obj:
+            return datetime.datetime.fromisoformat(obj['__datetime__'])
+    return obj
+
+
+class JSONSerializer(BaseSerializer):
+    """Serialize values as compact UTF-8 JSON, falling back to pickle"""
+
+    def dumps(self, value):
+        try:
+            data = _to_json(value)
+        except (_NotJSON, RecursionError):
+            return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, value):
+        if value[:1] == b'\x80':
+            return pickle.loads(value)
+        return json.loads(value, object_hook=_from_json)
+
+
+class ZlibCompressor(BaseCompressor):
+    """Compress values of at least COMPRESS_MIN_LENGTH bytes with zlib"""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.min_length = int(options.get('COMPRESS_MIN_LENGTH', 1024))
+        self.level = int(options.get('COMPRESS_LEVEL', 6))
+
+    def compress(self, value):
+        if len(value) >= self.min_length:
+            return zlib.compress(value, self.level)
+        return value
+
+    def decompress(self, value):
+        if value[:1] != b'x':
+            # Stored uncompressed
+            raise CompressorError('value is not compressed')
+        try:
+            return zlib.decompress(value)
+        except zlib.error as e:
+            raise CompressorError(e)
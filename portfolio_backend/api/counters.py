@@ -0,0 +1,213 @@
+"""
+Write-behind view counters
+
+Detail page views are absorbed by a buffer instead of an UPDATE per request:
+Redis hashes (HINCRBY) shared by all workers when Redis is configured, or an
+in-process batch otherwise. A background thread in each worker flushes the
+buffer every VIEW_COUNT_FLUSH_INTERVAL seconds with one UPDATE per model,
+
+    UPDATE ... SET views_count = views_count + CASE id WHEN 1 THEN 3 ... END
+
+so concurrent hits are never lost to read-modify-write races, and at most
+one interval of hits is lost if a worker dies (gunicorn.conf.py flushes on
+a clean worker exit). An interval of 0, or BACKGROUND_FLUSH = False (as under
+the test runner), starts no thread: the buffer is then only written by explicit
+flush_view_counts() calls.
+
+Each flush also stores the new totals in the cache (view_counts()), which
+cached responses read their views_count from when served, so flushes leave
+the cached responses themselves alone.
+"""
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+
+REDIS_KEY_PREFIX = 'portfolio:views:'
+CACHE_KEY_PREFIX = 'views_count:'
+
+_buffer = defaultdict(Counter)  # model label -> {pk: hits}
+_buffer_lock = threading.Lock()
+
+_flushers = {}  # name -> pid of the process running it
+_flushers_lock = threading.Lock()
+
+
+def buffer_redis():
+    """Raw Redis client of the shared cache, or None to buffer in-process"""
+    if 'redis' not in settings.CACHES:
+        return None
+    from django_redis import get_redis_connection
+    return get_redis_connection('redis')
+
+
+def record_view(model, pk, hits=1):
+    """Count a view of a model instance, to be written by the next flush"""
+    start_flusher(flush_view_counts, settings.VIEW_COUNT_FLUSH_INTERVAL, _buffer.clear)
+    label = model._meta.label
+
+    redis = buffer_redis()
+    if redis is not None:
+        try:
+            redis.hincrby(f"{REDIS_KEY_PREFIX}{label}", pk, hits)
+            return
+        except Exception as e:
+            print(f"Error buffering view count in Redis: {e}")
+
+    with _buffer_lock:
+        _buffer[label][pk] += hits
+
+
+def counted_models():
+    """Models with a views_count field"""
+    return [
+        model for model in apps.get_app_config('api').get_models()
+        if any(field.name == 'views_count' for field in model._meta.fields)
+    ]
+
+
+def _take_buffered():
+    """Atomically take every buffered count, as {model label: Counter({pk: hits})}"""
+    with _buffer_lock:
+        taken = {label: counts for label, counts in _buffer.items() if counts}
+        _buffer.clear()
+
+    redis = buffer_redis()
+    if redis is not None:
+        labels = [model._meta.label for model in counted_models()]
+        try:
+            # MULTI: read and reset the hashes atomically
+            pipe = redis.pipeline()
+            for label in labels:
+                pipe.hgetall(f"{REDIS_KEY_PREFIX}{label}")
+            pipe.delete(*[f"{REDIS_KEY_PREFIX}{label}" for label in labels])
+            results = pipe.execute()
+        except Exception as e:
+            print(f"Error reading view counts from Redis: {e}")
+            results = []
+        for label, counts in zip(labels, results):
+            if counts:
+                taken.setdefault(label, Counter()).update(
+                    {int(pk): int(hits) for pk, hits in counts.items()}
+                )
+
+    return taken
+
+
+def apply_view_counts(model, counts):
+    """Add {pk: hits} to views_count with a single UPDATE"""
+    if not counts:
+        return 0
+    increment = Case(
+        *[When(pk=pk, then=Value(hits)) for pk, hits in counts.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return model.objects.filter(pk__in=list(counts)).update(
+        views_count=F('views_count') + increment
+    )
+
+
+def _view_count_key(model, pk):
+    return f"{CACHE_KEY_PREFIX}{model._meta.label}:{pk}"
+
+
+def view_counts(model, pks):
+    """
+    views_count of the given objects as of the last flush, as {pk: count}
+
+    Read from the cache, which every flush updates; counts missing there
+    are read from the database in one query and cached, unless a flush
+    cached newer ones meanwhile.
+    """
+    keys = {pk: _view_count_key(model, pk) for pk in pks}
+    if not keys:
+        return {}
+    cached = cache.get_many(list(keys.values()))
+    counts = {pk: cached[key] for pk, key in keys.items() if key in cached}
+
+    missing = [pk for pk in keys if pk not in counts]
+    if missing:
+        stored = dict(model.objects.filter(pk__in=missing).values_list('pk', 'views_count'))
+        for pk, count in stored.items():
+            remember_view_count(model, pk, count)
+        counts.update(stored)
+    return counts
+
+
+def remember_view_count(model, pk, count):
+    """Cache a views_count just read with its object, unless a flush cached a newer one"""
+    cache.add(_view_count_key(model, pk), count, settings.API_CACHE_TIMEOUT)
+
+
+def flush_view_counts():
+    """
+    Write every buffered view count to the database
+
+    The new totals of the updated objects are then cached for view_counts(),
+    so cached responses show them from the next request on.
+
+    Returns:
+        Number of rows updated
+    """
+    updated = 0
+    for label, counts in _take_buffered().items():
+        model = apps.get_model(label)
+        try:
+            updated += apply_view_counts(model, counts)
+        except Exception as e:
+            print(f"Error flushing view counts for {label}: {e}")
+            # Put them back for the next flush
+            for pk, hits in counts.items():
+                record_view(model, pk, hits)
+            continue
+        try:
+            totals = model.objects.filter(pk__in=list(counts)).values_list('pk', 'views_count')
+            cache.set_many(
+                {_view_count_key(model, pk): count for pk, count in totals},
+                settings.API_CACHE_TIMEOUT
+            )
+        except Exception as e:
+            print(f"Error caching view counts for {label}: {e}")
+    return updated
+
+
+def _flush_periodically(flush, interval):
+    while True:
+        time.sleep(interval)
+        try:
+            close_old_connections()
+            flush()
+        except Exception as e:
+            print(f"Error in {flush.__name__}: {e}")
+
+
+def start_flusher(flush, interval, reset):
+    """
+    Run flush() every `interval` seconds in a daemon thread of this process
+
+    Started once per process and again in forked workers, which first call
+    reset() so they do not flush their parent's buffer a second time. An
+    interval of 0 or less, or BACKGROUND_FLUSH = False, disables it; flush()
+    must then be called explicitly.
+    """
+    if interval <= 0 or not settings.BACKGROUND_FLUSH:
+        return
+    name = flush.__name__
+    if _flushers.get(name) == os.getpid():
+        return
+    with _flushers_lock:
+        if _flushers.get(name) == os.getpid():
+            return
+        reset()
+        threading.Thread(
+            target=_flush_periodically, args=(flush, interval), name=name, daemon=True
+        ).start()
+        _flushers[name] = os.getpid()
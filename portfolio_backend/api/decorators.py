@@ -0,0 +1,145 @@
+"""
+View decorators for the API app
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from django.views.decorators.cache import cache_page
+
+from .signals import CACHE_DOMAINS
+from .utils import get_cache_versions, get_cache_changed_at
+
+
+def _version_prefix(versions):
+    return ':'.join(f"{domain}.v{version}" for domain, version in versions.items())
+
+
+def versioned_cache_page(timeout, *domains):
+    """
+    Like cache_page, but the cache key prefix embeds the current version of
+    each content domain, so saving a model in one of those domains
+    immediately invalidates the cached pages.
+
+    Example:
+        @method_decorator(versioned_cache_page(60 * 60, 'projects'))
+        def list(self, request, *args, **kwargs):
+            ...
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            key_prefix = _version_prefix(get_cache_versions(*domains))
+            cached_view = cache_page(timeout, key_prefix=key_prefix)(view_func)
+            return cached_view(request, *args, **kwargs)
+        return _wrapped_view
+    return decorator
+
+
+def get_last_modified(domains, versions):
+    """
+    Get the Last-Modified timestamp of the content behind the given domains
+
+    Every content change records when it invalidated its domains (which also
+    covers deletions), so that time is used when known. Otherwise, e.g.
+    right after a cache flush, it is the latest updated_at of the domain
+    models, cached per domain version.
+
+    Returns:
+        Unix timestamp, or None if unknown
+    """
+    changed_at = get_cache_changed_at(*domains)
+    if changed_at:
+        return changed_at
+
+    key = f"last_modified:{_version_prefix(versions)}"
+    last_modified = cache.get(key)
+
+    if last_modified is None:
+        models = {
+            model for model, model_domains in CACHE_DOMAINS.items()
+            if set(domains) & set(model_domains)
+            and any(field.name == 'updated_at' for field in model._meta.fields)
+        }
+        candidates = []
+        for model in models:
+            updated_at = model.objects.aggregate(latest=Max('updated_at'))['latest']
+            if updated_at:
+                candidates.append(int(updated_at.timestamp()))
+
+        # 0 records "unknown" so it is not recomputed on every request
+        last_modified = max(candidates, default=0)
+        cache.set(key, last_modified, settings.API_CACHE_TIMEOUT)
+
+    return last_modified or None
+
+
+def conditional_get(*domains):
+    """
+    Conditional GET support for cached API responses
+
+    Responses get a strong ETag (SHA-256 of the body) and a Last-Modified
+    header. The ETag is remembered per domain version, request URL,
+    visibility and renderer, so If-None-Match and If-Modified-Since are
+    answered with 304 before the view runs and before any serialization.
+
+    Browsers are told to revalidate on every use (no-cache), which keeps
+    long server-side TTLs from turning into stale client copies.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            versions = get_cache_versions(*domains)
+            visibility = 'auth' if request.user.is_authenticated else 'public'
+            renderer = getattr(getattr(request, 'accepted_renderer', None), 'format', '')
+            variant = f"{request.get_full_path()}|{visibility}|{renderer}"
+            etag_key = (
+                f"etag:{_version_prefix(versions)}:"
+                f"{hashlib.md5(variant.encode()).hexdigest()}"
+            )
+
+            etag = cache.get(etag_key)
+            last_modified = get_last_modified(domains, versions)
+
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = view_func(request, *args, **kwargs)
+
+            def set_validators(response):
+                if response.status_code == 200 and not response.streaming:
+                    response_etag = response.get('ETag') or quote_etag(
+                        hashlib.sha256(response.content).hexdigest()
+                    )
+                    # A gzip variant carries the weak form of the identity ETag
+                    strong_etag = response_etag.removeprefix('W/')
+                    if strong_etag != etag:
+                        cache.set(etag_key, strong_etag, settings.API_CACHE_TIMEOUT)
+                    response['ETag'] = response_etag
+                elif response.status_code == 304:
+                    if etag:
+                        response['ETag'] = etag
+                else:
+                    return response
+
+                if last_modified:
+                    response['Last-Modified'] = http_date(last_modified)
+                if response.has_header('Expires'):
+                    del response['Expires']
+                response['Cache-Control'] = 'no-cache'
+                return response
+
+            if getattr(response, 'is_rendered', True):
+                return set_validators(response)
+            response.add_post_render_callback(set_validators)
+            return response
+        return _wrapped_view
+    return decorator
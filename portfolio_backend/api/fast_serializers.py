@@ -0,0 +1,276 @@
+"""
+Compiled read-only serialization from .values() rows
+
+DRF serializes every object by dispatching each field through
+get_attribute and to_representation (and each SerializerMethodField
+through getattr), which for read-only listings of plain columns costs more
+than the query itself. compile_serializer walks a serializer's readable
+fields once and turns each into a precomputed accessor over a .values()
+row (a dict):
+
+- model columns, also through one to-one relation ('author.username'),
+  and choice labels (source='get_<field>_display')
+- primary keys of to-one relations (PrimaryKeyRelatedField)
+- SerializerMethodFields, called with a Row exposing the columns listed in
+  the serializer's Meta.method_sources
+- nested many=True model serializers, compiled in turn and loaded with one
+  .values() query per relation for all rows at once
+
+The output renders to the same bytes as the serializer's (see the parity
+tests and the benchmark_serializers command). A serializer with any other
+kind of field raises NotCompilable and keeps the DRF path.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, FileField
+from django.db.models.fields.reverse_related import ForeignObjectRel
+from django.utils.encoding import force_str
+from django.utils.hashable import make_hashable
+from rest_framework import serializers
+from rest_framework.fields import empty
+
+
+# Values key of the parent primary key in nested rows
+PARENT_KEY = '_compiled_parent'
+
+# Marks a field left out of the output, like DRF's SkipField
+SKIP = object()
+
+
+class NotCompilable(Exception):
+    """A serializer field the compiled path cannot reproduce"""
+
+
+class Row:
+    """Attribute access to a .values() row, for SerializerMethodFields"""
+    __slots__ = ('_values', '_meta')
+
+    def __init__(self, values, meta):
+        self._values = values
+        self._meta = meta
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @property
+    def pk(self):
+        return self._values[self._meta.pk.attname]
+
+
+def _text(value):
+    return value if type(value) is str else str(value)
+
+
+def _converter(field):
+    """Shortcut for the to_representation of the common field types"""
+    if isinstance(field, serializers.CharField):
+        return _text
+    if isinstance(field, serializers.IntegerField):
+        return int
+    if isinstance(field, serializers.BooleanField):
+        return bool
+    return field.to_representation
+
+
+class CompiledSerializer:
+    """
+    Field accessors of a serializer instance over .values() rows
+
+    Build with compile_serializer; see the module docstring.
+    """
+
+    def __init__(self, serializer):
+        self.model = serializer.Meta.model
+        self.opts = self.model._meta
+        self.pk = self.opts.pk.attname
+        self.columns = {self.pk: None}  # ordered set of values() names
+        self.files = {}  # attname -> model FileField
+        self.plan = []  # (output name, getter or None, nested)
+        method_sources = getattr(serializer.Meta, 'method_sources', {})
+
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                self.plan.append((name, None, self._compile_nested(field)))
+            elif isinstance(field, serializers.SerializerMethodField):
+                self.plan.append((name, self._compile_method(serializer, field, method_sources), None))
+            else:
+                self.plan.append((name, self._compile_field(field), None))
+
+    def _column(self, model_field):
+        self.columns[model_field.attname] = None
+        if isinstance(model_field, FileField):
+            self.files[model_field.attname] = model_field
+        return model_field.attname
+
+    def _get_field(self, name):
+        try:
+            return self.opts.get_field(name)
+        except FieldDoesNotExist:
+            raise NotCompilable(f"{self.model.__name__}.{name} is not a model field") from None
+
+    def _compile_method(self, serializer, field, method_sources):
+        if field.field_name not in method_sources:
+            raise NotCompilable(f"{field.field_name} has no Meta.method_sources")
+        for source in method_sources[field.field_name]:
+            model_field = self._get_field(source)
+            if model_field.is_relation:
+                raise NotCompilable(f"{field.field_name} reads the relation {source}")
+            self._column(model_field)
+        method = getattr(serializer, field.method_name)
+        meta = self.opts
+        return lambda row: method(Row(row, meta))
+
+    def _compile_field(self, field):
+        path = field.source_attrs
+        convert = _converter(field)
+
+        if len(path) == 1 and path[0].startswith('get_') and path[0].endswith('_display'):
+            model_field = self._get_field(path[0][len('get_'):-len('_display')])
+            if not model_field.choices:
+                raise NotCompilable(f"{field.field_name} displays a field without choices")
+            key = self._column(model_field)
+            choices = dict(make_hashable(model_field.flatchoices))
+
+            def display(row):
+                value = row[key]
+                label = force_str(choices.get(make_hashable(value), value), strings_only=True)
+                return None if label is None else convert(label)
+            return display
+
+        if len(path) not in (1, 2):
+            raise NotCompilable(f"{field.field_name} reads a nested path")
+        model_field = self._get_field(path[0])
+
+        if len(path) == 1:
+            if isinstance(field, serializers.PrimaryKeyRelatedField):
+                if not (model_field.many_to_one or model_field.one_to_one) or field.pk_field is not None:
+                    raise NotCompilable(f"{field.field_name} is not a to-one primary key")
+                key = self._column(model_field)
+                return lambda row: row[key]
+            if model_field.is_relation or isinstance(field, (serializers.RelatedField, serializers.BaseSerializer)):
+                raise NotCompilable(f"{field.field_name} reads a related object")
+            key = self._column(model_field)
+            if key in self.files:
+                # FieldFile, never None: FileField.to_representation handles empty names
+                return lambda row: convert(row[key])
+            return lambda row: None if row[key] is None else convert(row[key])
+
+        # One to-one hop, e.g. 'author.username'
+        if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+            raise NotCompilable(f"{field.field_name} reads through a to-many relation")
+        try:
+            related_field = model_field.related_model._meta.get_field(path[1])
+        except FieldDoesNotExist:
+            raise NotCompilable(f"{field.field_name} reads a related attribute") from None
+        if related_field.is_relation or isinstance(related_field, FileField):
+            raise NotCompilable(f"{field.field_name} reads a related object")
+        if field.default is not empty or (field.required and not field.allow_null):
+            raise NotCompilable(f"{field.field_name} has a default or is required")
+        relation = self._column(model_field)
+        key = f"{path[0]}__{path[1]}"
+        self.columns[key] = None
+        # Without a related object DRF skips the field, or gives None if allow_null
+        missing = None if field.allow_null else SKIP
+
+        def related(row):
+            if row[relation] is None:
+                return missing
+            value = row[key]
+            return None if value is None else convert(value)
+        return related
+
+    def _compile_nested(self, field):
+        child = field.child
+        if not isinstance(child, serializers.ModelSerializer) or len(field.source_attrs) != 1:
+            raise NotCompilable(f"{field.field_name} is not a nested model serializer")
+        relation = self._get_field(field.source_attrs[0])
+        if not (relation.many_to_many or relation.one_to_many):
+            raise NotCompilable(f"{field.field_name} is not a to-many relation")
+        if isinstance(relation, ForeignObjectRel):
+            lookup = relation.field.name
+        else:
+            lookup = relation.related_query_name()
+        return relation.related_model, lookup, CompiledSerializer(child)
+
+    def rows(self, queryset, *extra):
+        """.values() queryset of the columns read, plus `extra` names"""
+        names = list(self.columns) + [name for name in extra if name not in self.columns]
+        return queryset.prefetch_related(None).values(*names)
+
+    def _load_nested(self, model, lookup, compiled, pks):
+        """Serialized related rows of every parent, by parent primary key"""
+        groups = {}
+        if not pks:
+            return groups
+        rows = list(
+            model._default_manager.filter(**{f"{lookup}__in": pks})
+            .values(*compiled.columns, **{PARENT_KEY: F(lookup)})
+        )
+        for row, item in zip(rows, compiled.serialize(rows)):
+            groups.setdefault(row[PARENT_KEY], []).append(item)
+        return groups
+
+    def serialize(self, rows):
+        """
+        Serialize .values() rows (see rows()) into a list of dicts
+
+        File columns of the rows are replaced by their FieldFile in place.
+        """
+        rows = list(rows)
+        for attname, model_field in self.files.items():
+            attr_class = model_field.attr_class
+            for row in rows:
+                row[attname] = attr_class(None, model_field, row[attname])
+
+        pks = [row[self.pk] for row in rows]
+        nested = {
+            name: self._load_nested(*relation, pks)
+            for name, _, relation in self.plan if relation is not None
+        }
+
+        data = []
+        for row in rows:
+            item = {}
+            for name, getter, _ in self.plan:
+                if getter is None:
+                    item[name] = nested[name].get(row[self.pk], [])
+                    continue
+                value = getter(row)
+                if value is not SKIP:
+                    item[name] = value
+            data.append(item)
+        return data
+
+    def serialize_queryset(self, queryset):
+        return self.serialize(self.rows(queryset))
+
+
+def compile_serializer(serializer_class, context=None):
+    """
+    Compile a model serializer for read-only output
+
+    Args:
+        serializer_class: ModelSerializer subclass
+        context: Serializer context (request, sparse fieldset...)
+
+    Raises:
+        NotCompilable: if a field cannot be reproduced from columns
+    """
+    return CompiledSerializer(serializer_class(context=context or {}))
+
+
+def compiled_data(serializer_class, queryset, context=None):
+    """
+    Output of serializer_class(queryset, many=True, context=context).data
+
+    Through the compiled path when the serializer compiles, DRF otherwise.
+    """
+    try:
+        compiled = compile_serializer(serializer_class, context)
+    except NotCompilable:
+        return serializer_class(queryset, many=True, context=context or {}).data
+    return compiled.serialize_queryset(queryset)
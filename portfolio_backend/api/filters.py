@@ -2,7 +2,52 @@
 Custom filters for API endpoints
 """
 from django_filters import rest_framework as filters
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
 from .models import Project, BlogPost, ContactSubmission
+from .search_backends import get_search_backend
+
+
+def search_queryset(queryset, query, keep_ordering=False, backend=None):
+    """
+    Restrict a queryset to the full-text matches of a query (see
+    api/search_backends.py), ordered by relevance unless keep_ordering
+
+    Every match is kept, not just the best MAX_RESULTS, since the result is
+    a list to paginate. `backend` names a search backend to use instead of
+    SEARCH_BACKEND; unranked ones keep the queryset ordering.
+    """
+    backend = get_search_backend(backend)
+    ranked = [pk for pk, _ in backend.rank(queryset.model, query, queryset, limit=None)]
+    queryset = queryset.filter(pk__in=ranked)
+    if not ranked or keep_ordering or not backend.ranked:
+        return queryset
+    return queryset.order_by(
+        models.Case(
+            *[models.When(pk=pk, then=models.Value(rank)) for rank, pk in enumerate(ranked)],
+            output_field=models.IntegerField(),
+        )
+    )
+
+
+class RankedSearchFilter(BaseFilterBackend):
+    """
+    ?search= through the full-text search backend, ranked by relevance
+    unless ?ordering= is given; goes after OrderingFilter
+
+    A view's `search_backend` names the backend to use instead of
+    SEARCH_BACKEND.
+    """
+    search_param = api_settings.SEARCH_PARAM
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '').strip()
+        if not query:
+            return queryset
+        return search_queryset(
+            queryset, query, bool(request.query_params.get('ordering')),
+            getattr(view, 'search_backend', None)
+        )
 
 
 class ProjectFilter(filters.FilterSet):
@@ -43,13 +88,12 @@ class BlogPostFilter(filters.FilterSet):
     
     def filter_search(self, queryset, name, value):
         """
-        Custom search filter for title, excerpt, and content
+        Full-text search over title, tags, excerpt and content
+
+        Results are ranked by relevance unless an explicit ordering is given.
         """
-        return queryset.filter(
-            models.Q(title__icontains=value) |
-            models.Q(excerpt__icontains=value) |
-            models.Q(content__icontains=value)
-        )
+        keep_ordering = self.request is not None and bool(self.request.query_params.get('ordering'))
+        return search_queryset(queryset, value, keep_ordering)
 
 
 class ContactSubmissionFilter(filters.FilterSet):
@@ -0,0 +1,174 @@
+"""
+HyperLogLog cardinality sketches, register-compatible with Redis
+
+Uses the same parameters as Redis (2^14 registers, MurmurHash64A with the
+Redis seed, ranks capped at 51) and the same estimator, so a sketch built
+here and one built with PFADD give the same registers for the same items,
+and Redis sketches (GET of a PFADD key) can be decoded and merged into
+stored ones. Each sketch takes 16 KiB and estimates with ~0.81% standard
+error, however many items were added.
+"""
+import math
+import zlib
+from collections import Counter
+
+
+P = 14
+REGISTERS = 1 << P
+Q = 64 - P
+ALPHA_INF = 0.721347520444481703680
+
+_MASK64 = (1 << 64) - 1
+_MURMUR_M = 0xc6a4a7935bd1e995
+_MURMUR_SEED = 0xadc83b19
+
+_REDIS_HEADER = 16
+_REDIS_DENSE = 0
+_REDIS_SPARSE = 1
+
+
+def murmurhash64a(data, seed=_MURMUR_SEED):
+    """MurmurHash64A of bytes, as computed by Redis for HyperLogLog"""
+    h = (seed ^ (len(data) * _MURMUR_M)) & _MASK64
+    end = len(data) - len(data) % 8
+    for i in range(0, end, 8):
+        k = int.from_bytes(data[i:i + 8], 'little')
+        k = (k * _MURMUR_M) & _MASK64
+        k ^= k >> 47
+        k = (k * _MURMUR_M) & _MASK64
+        h ^= k
+        h = (h * _MURMUR_M) & _MASK64
+
+    tail = data[end:]
+    if tail:
+        h ^= int.from_bytes(tail, 'little')
+        h = (h * _MURMUR_M) & _MASK64
+
+    h ^= h >> 47
+    h = (h * _MURMUR_M) & _MASK64
+    h ^= h >> 47
+    return h
+
+
+def _tau(x):
+    if x == 0 or x == 1:
+        return 0.0
+    y = 1.0
+    z = 1 - x
+    while True:
+        x = math.sqrt(x)
+        z_prev = z
+        y *= 0.5
+        z -= (1 - x) ** 2 * y
+        if z == z_prev:
+            return z / 3
+
+
+def _sigma(x):
+    if x == 1:
+        return math.inf
+    y = 1.0
+    z = x
+    while True:
+        x *= x
+        z_prev = z
+        z += x * y
+        y += y
+        if z == z_prev:
+            return z
+
+
+class HyperLogLog:
+    """A HyperLogLog sketch with one byte per register"""
+
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers or REGISTERS)
+        if len(self.registers) != REGISTERS:
+            raise ValueError(f"Expected {REGISTERS} registers, got {len(self.registers)}")
+
+    def add(self, item):
+        """Add an item (str or bytes); returns True if a register changed"""
+        if isinstance(item, str):
+            item = item.encode('utf-8')
+        h = murmurhash64a(item)
+        index = h & (REGISTERS - 1)
+        # Position of the first set bit of the remaining Q bits, at most Q + 1
+        h = (h >> P) | (1 << Q)
+        rank = (h & -h).bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+            return True
+        return False
+
+    def merge(self, other):
+        """Merge another sketch into this one (register-wise maximum)"""
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        """Estimated number of distinct items added"""
+        histogram = Counter(self.registers)
+        m = REGISTERS
+        z = m * _tau((m - histogram[Q + 1]) / m)
+        for rank in range(Q, 0, -1):
+            z += histogram[rank]
+            z *= 0.5
+        z += m * _sigma(histogram[0] / m)
+        return round(ALPHA_INF * m * m / z)
+
+    def __len__(self):
+        return self.count()
+
+    def to_bytes(self):
+        """Compact form for storage (mostly-empty sketches compress to a few bytes)"""
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(zlib.decompress(data))
+
+    @classmethod
+    def from_redis(cls, data):
+        """
+        Decode the value of a Redis HyperLogLog key (dense or sparse encoding)
+
+        Raises:
+            ValueError: if the value is not a Redis HyperLogLog
+        """
+        if data[:4] != b'HYLL':
+            raise ValueError('Not a Redis HyperLogLog')
+        encoding = data[4]
+        body = data[_REDIS_HEADER:]
+        registers = bytearray(REGISTERS)
+
+        if encoding == _REDIS_DENSE:
+            # 6-bit registers packed least significant bits first
+            for index in range(REGISTERS):
+                byte, shift = divmod(index * 6, 8)
+                value = body[byte] >> shift
+                if shift > 2:
+                    value |= body[byte + 1] << (8 - shift)
+                registers[index] = value & 63
+        elif encoding == _REDIS_SPARSE:
+            # Runs of ZERO (00xxxxxx), XZERO (01xxxxxx yyyyyyyy) and VAL (1vvvvvxx)
+            index = 0
+            position = 0
+            while position < len(body):
+                opcode = body[position]
+                if opcode & 0xc0 == 0:
+                    index += (opcode & 0x3f) + 1
+                    position += 1
+                elif opcode & 0xc0 == 0x40:
+                    index += (((opcode & 0x3f) << 8) | body[position + 1]) + 1
+                    position += 2
+                else:
+                    run = (opcode & 0x03) + 1
+                    registers[index:index + run] = bytes([((opcode >> 2) & 0x1f) + 1]) * run
+                    index += run
+                    position += 1
+            if index != REGISTERS:
+                raise ValueError('Corrupt sparse HyperLogLog')
+        else:
+            raise ValueError(f"Unknown HyperLogLog encoding {encoding}")
+
+        return cls(registers)
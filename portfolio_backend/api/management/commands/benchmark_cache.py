@@ -0,0 +1,108 @@
+"""
+Compare pickled and compressed JSON cache values for every cacheable URL
+"""
+import pickle
+import timeit
+import uuid
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from api.cache_serializers import JSONSerializer, ZlibCompressor
+from api.warmup import get_default_host, get_warmup_urls, warm_url
+
+
+class Command(BaseCommand):
+    help = (
+        'Render the cacheable URLs into a private in-memory cache and report, per URL, '
+        'the size of its cached values pickled vs. as compressed JSON and the decode cost'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', help='Host the URLs are rendered for')
+        parser.add_argument(
+            '--repeat', type=int, default=200,
+            help='Decodes timed per value'
+        )
+        parser.add_argument(
+            '--min-length', type=int, default=1024,
+            help='Compression threshold in bytes'
+        )
+        parser.add_argument('--level', type=int, default=6, help='zlib level')
+
+    def handle(self, *args, **options):
+        serializer = JSONSerializer({})
+        compressor = ZlibCompressor({
+            'COMPRESS_MIN_LENGTH': options['min_length'],
+            'COMPRESS_LEVEL': options['level'],
+        })
+        host = options['host'] or get_default_host()
+        repeat = options['repeat']
+
+        def encode(value):
+            return compressor.compress(serializer.dumps(value))
+
+        def decode(stored):
+            try:
+                stored = compressor.decompress(stored)
+            except Exception:
+                pass
+            return serializer.loads(stored)
+
+        # A private local-only cache, so nothing already cached is reused
+        # and the production cache is left alone
+        benchmark_caches = {
+            'default': {
+                'BACKEND': 'api.cache_backends.TwoTierCache',
+                'LOCATION': f'benchmark-{uuid.uuid4().hex}',
+                'OPTIONS': {'MAX_ENTRIES': 100000, 'MAX_BYTES': 1024 ** 3},
+            }
+        }
+
+        self.stdout.write(
+            f"{'pickle':>9} {'json':>9} {'stored':>9} {'saved':>6} "
+            f"{'pickle us':>10} {'stored us':>10}  url"
+        )
+        totals = [0, 0, 0]
+
+        with override_settings(CACHES=benchmark_caches):
+            local = caches['default']._local
+            for url, _ in get_warmup_urls():
+                before = set(local._data)
+                warm_url(url, host)
+                values = [
+                    pickle.loads(local.get(key))
+                    for key in set(local._data) - before
+                    if not key.endswith(':lock')
+                ]
+                if not values:
+                    continue
+
+                pickled = [pickle.dumps(value, pickle.HIGHEST_PROTOCOL) for value in values]
+                stored = [encode(value) for value in values]
+                json_size = sum(len(serializer.dumps(value)) for value in values)
+                pickle_size = sum(map(len, pickled))
+                stored_size = sum(map(len, stored))
+
+                pickle_us = sum(
+                    timeit.timeit(lambda: pickle.loads(data), number=repeat) for data in pickled
+                ) / repeat * 1e6
+                stored_us = sum(
+                    timeit.timeit(lambda: decode(data), number=repeat) for data in stored
+                ) / repeat * 1e6
+
+                totals[0] += pickle_size
+                totals[1] += json_size
+                totals[2] += stored_size
+                self.stdout.write(
+                    f"{pickle_size:>9} {json_size:>9} {stored_size:>9} "
+                    f"{1 - stored_size / pickle_size:>6.0%} "
+                    f"{pickle_us:>10.1f} {stored_us:>10.1f}  {url}"
+                )
+
+        if totals[0]:
+            self.stdout.write(self.style.SUCCESS(
+                f"Total: {totals[0]} bytes pickled, {totals[1]} as JSON, {totals[2]} stored "
+                f"({1 - totals[2] / totals[0]:.0%} saved)"
+            ))
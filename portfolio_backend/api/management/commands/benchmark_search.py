@@ -0,0 +1,97 @@
+"""
+Compare search backends on a generated corpus of blog posts
+"""
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_save
+
+from api.models import BlogPost
+from api.search_backends import get_search_backend
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate blog posts inside a transaction that is rolled back, index them '
+        'with each search backend and time the same queries against each'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000, help='Posts generated')
+        parser.add_argument('--words', type=int, default=300, help='Words per post')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs timed per query')
+        parser.add_argument(
+            '--backend', action='append', dest='backends',
+            help='Backend to time (repeatable; default: contains, index and database)'
+        )
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        backends = options['backends'] or ['contains', 'index', 'database']
+        random.seed(options['seed'])
+        # Zipf-like vocabulary: a few common words and a long tail of rare ones
+        vocabulary = [f"word{i}" for i in range(20000)]
+        weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+        queries = ['word3', 'word500 word40', 'word15000', 'nosuchword']
+
+        try:
+            with transaction.atomic():
+                self.generate(options['posts'], options['words'], vocabulary, weights)
+                for name in backends:
+                    self.benchmark(get_search_backend(name), queries, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def generate(self, count, words, vocabulary, weights):
+        started = time.perf_counter()
+        author = User.objects.create(username=f'search-benchmark-{random.getrandbits(32)}')
+
+        def text(length):
+            return ' '.join(random.choices(vocabulary, weights, k=length))
+
+        posts = [
+            BlogPost(
+                title=text(6), slug=f'search-benchmark-{i}', excerpt=text(20),
+                content=text(words), author=author, status='published', reading_time=1
+            )
+            for i in range(count)
+        ]
+        # Signals are not sent by bulk_create, so no backend indexes them yet
+        BlogPost.objects.bulk_create(posts, batch_size=500)
+        self.stdout.write(f"Generated {count} posts in {time.perf_counter() - started:.1f}s")
+
+    def benchmark(self, backend, queries, repeat):
+        # Index with signals muted so other backends are not updated too
+        receivers = post_save.receivers, m2m_changed.receivers
+        post_save.receivers, m2m_changed.receivers = [], []
+        try:
+            started = time.perf_counter()
+            backend.rebuild(BlogPost)
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{backend.name}: indexed in {time.perf_counter() - started:.1f}s"
+            ))
+        finally:
+            post_save.receivers, m2m_changed.receivers = receivers
+            post_save.sender_receivers_cache.clear()
+            m2m_changed.sender_receivers_cache.clear()
+
+        published = BlogPost.objects.filter(status='published')
+        for query in queries:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results = backend.rank(BlogPost, query, published, limit=20)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"  {query!r:>20}: {len(results):>2} results, "
+                f"median {statistics.median(timings):8.2f} ms, max {max(timings):8.2f} ms"
+            )
@@ -0,0 +1,179 @@
+"""
+Compare the DRF serializers with their compiled read path
+"""
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from rest_framework.renderers import JSONRenderer
+from rest_framework.serializers import ListSerializer
+
+from api.fast_serializers import compile_serializer
+from api.models import (
+    BlogPost, Category, Certification, CustomSection, CustomSectionItem, Education,
+    Experience, ExperienceBullet, Interest, Language, Project, ProjectBullet,
+    SkillGroup, SkillItem, Tag
+)
+from api.snapshots import SnapshotRequest
+from api.serializers import (
+    BlogPostListSerializer, CertificationSerializer, CustomSectionSerializer,
+    EducationSerializer, ExperienceSerializer, InterestSerializer, LanguageSerializer,
+    PortfolioProjectSerializer, ProjectListSerializer, SkillGroupSerializer
+)
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Generate content inside a transaction that is rolled back, then time each '
+        'compiled serializer against its DRF serializer, queries included, and check '
+        'that both render the same bytes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Objects generated per model')
+        parser.add_argument('--repeat', type=int, default=10, help='Runs timed per serializer')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['seed'])
+        # Media URLs are made absolute, as in API responses
+        context = {'request': SnapshotRequest('https://example.com/')}
+        cases = [
+            (ProjectListSerializer, Project.objects.all(), context),
+            (BlogPostListSerializer, BlogPost.objects.all(), context),
+            (PortfolioProjectSerializer, Project.objects.all(), context),
+            (SkillGroupSerializer, SkillGroup.objects.all(), {}),
+            (EducationSerializer, Education.objects.all(), {}),
+            (ExperienceSerializer, Experience.objects.all(), {}),
+            (CertificationSerializer, Certification.objects.all(), {}),
+            (LanguageSerializer, Language.objects.all(), {}),
+            (InterestSerializer, Interest.objects.all(), {}),
+            (CustomSectionSerializer, CustomSection.objects.all(), {}),
+        ]
+
+        # No cache invalidation, index updates or snapshot rebuilds for
+        # content that is rolled back
+        signals = post_save, post_delete, m2m_changed
+        receivers = [signal.receivers for signal in signals]
+        for signal in signals:
+            signal.receivers = []
+            signal.sender_receivers_cache.clear()
+        try:
+            with transaction.atomic():
+                self.generate(options['rows'])
+                for serializer_class, queryset, serializer_context in cases:
+                    self.benchmark(serializer_class, queryset, serializer_context, options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+        finally:
+            for signal, saved in zip(signals, receivers):
+                signal.receivers = saved
+                signal.sender_receivers_cache.clear()
+
+    def generate(self, count):
+        started = time.perf_counter()
+        prefix = f"benchmark-{random.getrandbits(32)}"
+        author = User.objects.create(username=prefix, email=f"{prefix}@example.com")
+        category = Category.objects.create(name=prefix)
+        tags = Tag.objects.bulk_create(Tag(name=f"{prefix}-{i}", slug=f"{prefix}-{i}") for i in range(20))
+        language = Language._meta.get_field('proficiency').choices[0][0]
+
+        projects = Project.objects.bulk_create(
+            Project(
+                title=f"Project {i}", slug=f"{prefix}-project-{i}", description='Description ' * 50,
+                short_description='Short', technologies_used='Django, Vue, PostgreSQL',
+                image=f"projects/{i}.png" if i % 2 else '', status='published', order=i
+            )
+            for i in range(count)
+        )
+        posts = BlogPost.objects.bulk_create(
+            BlogPost(
+                title=f"Post {i}", slug=f"{prefix}-post-{i}", excerpt='Excerpt', content='Content ' * 200,
+                author=author, category=category if i % 3 else None, status='published', reading_time=1
+            )
+            for i in range(count)
+        )
+        Project.tags.through.objects.bulk_create(
+            Project.tags.through(project=project, tag=tag)
+            for project in projects for tag in random.sample(tags, 3)
+        )
+        BlogPost.tags.through.objects.bulk_create(
+            BlogPost.tags.through(blogpost=post, tag=tag)
+            for post in posts for tag in random.sample(tags, 3)
+        )
+        ProjectBullet.objects.bulk_create(
+            ProjectBullet(project=project, text='Bullet', order=i) for project in projects for i in range(3)
+        )
+
+        groups = SkillGroup.objects.bulk_create(SkillGroup(title=f"Group {i}") for i in range(count))
+        SkillItem.objects.bulk_create(
+            SkillItem(group=group, name='Skill', proficiency=80, order=i) for group in groups for i in range(5)
+        )
+        Education.objects.bulk_create(
+            Education(date=random.choice(['Depuis 2025', '2021–2025', '2019-2021']), title='Degree', subtitle='School')
+            for _ in range(count)
+        )
+        experiences = Experience.objects.bulk_create(
+            Experience(title='Engineer', company='Acme', start_date='2023', end_date='2024', is_current=i % 2 == 0)
+            for i in range(count)
+        )
+        ExperienceBullet.objects.bulk_create(
+            ExperienceBullet(experience=experience, text='Shipped', order=i)
+            for experience in experiences for i in range(3)
+        )
+        Certification.objects.bulk_create(
+            Certification(name='Cert', issuing_organization='Org', issue_date='2024', expiry_date='2026')
+            for _ in range(count)
+        )
+        Language.objects.bulk_create(Language(name='French', proficiency=language) for _ in range(count))
+        Interest.objects.bulk_create(Interest(name='Chess') for _ in range(count))
+        sections = CustomSection.objects.bulk_create(
+            CustomSection(title='Talks', slug=f"{prefix}-section-{i}") for i in range(count)
+        )
+        CustomSectionItem.objects.bulk_create(
+            CustomSectionItem(section=section, title='Talk', order=i) for section in sections for i in range(3)
+        )
+        self.stdout.write(f"Generated {count} objects per model in {time.perf_counter() - started:.1f}s")
+
+    def benchmark(self, serializer_class, queryset, context, repeat):
+        # The DRF path gets the joins and prefetches the views give it
+        fields = serializer_class(context=context).fields.values()
+        related = {field.source.split('.')[0] for field in fields if '.' in field.source}
+        prefetch = [field.source for field in fields if isinstance(field, ListSerializer)]
+
+        def drf():
+            return serializer_class(
+                queryset.select_related(*related).prefetch_related(*prefetch),
+                many=True, context=context
+            ).data
+
+        def compiled():
+            return compile_serializer(serializer_class, context).serialize_queryset(queryset)
+
+        renderer = JSONRenderer()
+        identical = renderer.render(drf()) == renderer.render(compiled())
+
+        timings = {}
+        for name, serialize in (('drf', drf), ('compiled', compiled)):
+            runs = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                serialize()
+                runs.append((time.perf_counter() - started) * 1000)
+            timings[name] = statistics.median(runs)
+
+        self.stdout.write(
+            f"{serializer_class.__name__:>28}: drf {timings['drf']:8.2f} ms, "
+            f"compiled {timings['compiled']:8.2f} ms, "
+            f"{timings['drf'] / timings['compiled']:5.1f}x, "
+            + (self.style.SUCCESS('identical') if identical else self.style.ERROR('DIFFERENT'))
+        )
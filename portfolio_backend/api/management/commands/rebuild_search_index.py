@@ -0,0 +1,27 @@
+"""
+Rebuild the full-text search index of the active search backend
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.search_backends import SEARCH_FIELDS, get_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Reindex all searchable content for full-text search'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backend', help='Backend to rebuild (default: SEARCH_BACKEND)'
+        )
+
+    def handle(self, *args, **options):
+        backend = get_search_backend(options['backend'])
+        for model in SEARCH_FIELDS:
+            started = time.perf_counter()
+            count = backend.rebuild(model)
+            self.stdout.write(self.style.SUCCESS(
+                f"{backend.name}: indexed {count} {model._meta.verbose_name_plural} "
+                f"in {time.perf_counter() - started:.1f}s"
+            ))
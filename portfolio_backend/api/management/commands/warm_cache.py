@@ -0,0 +1,65 @@
+"""
+Populate the API caches by rendering every cacheable public URL
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.warmup import warm_cache
+
+
+class Command(BaseCommand):
+    help = 'Render the cacheable public API URLs in-process to warm the caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--host',
+            help='Host the URLs are rendered for (default: CACHE_WARMUP_HOST, '
+                 'RENDER_EXTERNAL_HOSTNAME or the first ALLOWED_HOSTS entry)'
+        )
+        parser.add_argument(
+            '--secure', action='store_true', default=None,
+            help='Render as HTTPS requests (default when DEBUG is off)'
+        )
+        parser.add_argument(
+            '--insecure', action='store_false', dest='secure',
+            help='Render as plain HTTP requests'
+        )
+        parser.add_argument(
+            '--workers', type=int, default=4,
+            help='Number of URLs rendered in parallel'
+        )
+        parser.add_argument(
+            '--pages', type=int, default=3,
+            help='Number of pages warmed per list endpoint'
+        )
+        parser.add_argument(
+            '--search', action='append', dest='search_terms',
+            help='Search term to warm (repeatable; default: CACHE_WARMUP_SEARCH_TERMS '
+                 'or the most used blog tags)'
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        results = warm_cache(
+            host=options['host'],
+            secure=options['secure'],
+            workers=options['workers'],
+            max_pages=options['pages'],
+            search_terms=options['search_terms'],
+        )
+
+        failed = 0
+        for result in results:
+            line = f"{result['status']}  {result['seconds'] * 1000:8.1f} ms  {result['url']}"
+            if result['status'] == 200:
+                self.stdout.write(line)
+            else:
+                failed += 1
+                self.stdout.write(self.style.WARNING(line))
+
+        summary = (
+            f"Warmed {len(results) - failed}/{len(results)} URLs "
+            f"in {time.perf_counter() - start:.2f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(summary) if not failed else self.style.WARNING(summary))
@@ -0,0 +1,56 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_skillgroup_icon_skillitem_proficiency'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('kind', models.CharField(choices=[('page', 'Page'), ('section', 'Section')], max_length=20)),
+                ('name', models.CharField(help_text='Page path or section id', max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Daily Analytics',
+                'verbose_name_plural': 'Daily Analytics',
+                'ordering': ['-date', 'kind', 'name'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AnalyticsHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('kind', models.CharField(choices=[('page', 'Page'), ('section', 'Section')], max_length=20)),
+                ('name', models.CharField(help_text='Page path or section id', max_length=200)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Hourly Analytics',
+                'verbose_name_plural': 'Hourly Analytics',
+                'ordering': ['-hour', 'kind', 'name'],
+                'indexes': [models.Index(fields=['kind', 'hour'], name='api_analyti_kind_37ba66_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='analyticshourly',
+            constraint=models.UniqueConstraint(fields=('hour', 'kind', 'name'), name='unique_analytics_hour'),
+        ),
+        migrations.AddIndex(
+            model_name='analyticsdaily',
+            index=models.Index(fields=['kind', 'date'], name='api_analyti_kind_4f9a17_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='analyticsdaily',
+            constraint=models.UniqueConstraint(fields=('date', 'kind', 'name'), name='unique_analytics_day'),
+        ),
+    ]
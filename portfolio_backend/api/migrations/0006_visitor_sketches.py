@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-17 02:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_analytics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(help_text='Model label, e.g. api.Project', max_length=100)),
+                ('object_id', models.PositiveIntegerField()),
+                ('date', models.DateField(blank=True, null=True)),
+                ('registers', models.BinaryField(help_text='zlib-compressed HyperLogLog registers')),
+                ('estimate', models.PositiveIntegerField(default=0, help_text='Estimated unique visitors')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Visitor Sketch',
+                'verbose_name_plural': 'Visitor Sketches',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['model', 'object_id', 'date'], name='api_visitor_model_a566a8_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(condition=models.Q(('date__isnull', False)), fields=('model', 'object_id', 'date'), name='unique_visitor_sketch_day'),
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(condition=models.Q(('date__isnull', True)), fields=('model', 'object_id'), name='unique_visitor_sketch_total'),
+        ),
+    ]
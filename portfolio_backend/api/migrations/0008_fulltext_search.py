@@ -0,0 +1,57 @@
+"""
+Database-native full-text search storage (see api/search_backends.py)
+
+PostgreSQL gets a tsvector column with a GIN index on the project and blog
+post tables, SQLite an FTS5 table per model. Other databases get nothing.
+The columns are filled by `manage.py rebuild_search_index`.
+
+create_search_storage and drop_search_storage take the tables and their
+indexed columns first, so later migrations can reuse them for other tables.
+"""
+from functools import partial
+
+from django.db import migrations
+
+
+FTS_COLUMNS = {
+    'api_blogpost': ['title', 'tags', 'excerpt', 'content'],
+    'api_project': ['title', 'tags', 'technologies_used', 'short_description', 'description'],
+}
+
+
+def create_search_storage(fts_columns, apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, columns in fts_columns.items():
+        if vendor == 'postgresql':
+            schema_editor.execute(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector")
+            schema_editor.execute(
+                f"CREATE INDEX {table}_search_vector_gin ON {table} USING gin (search_vector)"
+            )
+        elif vendor == 'sqlite':
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {table}_fts USING fts5("
+                f"{', '.join(columns)}, tokenize = 'unicode61 remove_diacritics 2')"
+            )
+
+
+def drop_search_storage(fts_columns, apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table in fts_columns:
+        if vendor == 'postgresql':
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_vector_gin")
+            schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector")
+        elif vendor == 'sqlite':
+            schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_blog_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            partial(create_search_storage, FTS_COLUMNS), partial(drop_search_storage, FTS_COLUMNS)
+        ),
+    ]
@@ -0,0 +1,33 @@
+"""
+Full-text search storage for experiences, certifications and custom
+sections and their items, searched with projects and blog posts by
+/api/search/ (created as in 0008_fulltext_search)
+"""
+from functools import partial
+from importlib import import_module
+
+from django.db import migrations
+
+
+fulltext_search = import_module('api.migrations.0008_fulltext_search')
+
+FTS_COLUMNS = {
+    'api_experience': ['title', 'company', 'location', 'description', 'bullets'],
+    'api_certification': ['name', 'issuing_organization', 'description'],
+    'api_customsection': ['title', 'content'],
+    'api_customsectionitem': ['title', 'subtitle', 'description'],
+}
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_fulltext_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            partial(fulltext_search.create_search_storage, FTS_COLUMNS),
+            partial(fulltext_search.drop_search_storage, FTS_COLUMNS)
+        ),
+    ]
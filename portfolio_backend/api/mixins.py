@@ -0,0 +1,418 @@
+"""
+ViewSet mixins for the API app
+"""
+import json
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import QueryDict
+from django_filters import rest_framework as django_filters
+from rest_framework import filters, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+
+from .counters import record_view, remember_view_count, view_counts
+from .fast_serializers import NotCompilable, compile_serializer
+from .filters import RankedSearchFilter
+from .responses import CachedJSONResponse, encode_body
+from .utils import create_cache_key, get_or_build, set_built
+from .visitors import record_visitor, visitor_id
+from .warmup import is_warming
+
+
+# Objects per batch detail request
+MAX_BATCH_SIZE = 50
+
+# Per-process hit/miss counters of the list response cache, by view
+_list_cache_stats = defaultdict(lambda: {'hits': 0, 'misses': 0})
+_list_cache_stats_lock = threading.Lock()
+
+
+def list_cache_stats():
+    """Hit/miss counters and hit ratio of the list response cache, by view"""
+    with _list_cache_stats_lock:
+        stats = {name: dict(counts) for name, counts in _list_cache_stats.items()}
+    for counts in stats.values():
+        total = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / total, 3) if total else None
+    return stats
+
+
+def ordering_columns(view):
+    """Model fields a view can order its list by"""
+    names = [*(view.ordering or []), *(getattr(view, 'ordering_fields', None) or [])]
+    return sorted({name.lstrip('-') for name in names})
+
+
+def parse_fieldset(values):
+    """Sorted distinct field names of comma-separated parameter values"""
+    return sorted({name.strip() for value in values for name in value.split(',') if name.strip()})
+
+
+class SparseFieldsetViewMixin:
+    """
+    ?fields= and ?expand= for serializers with SparseFieldsetMixin
+
+    On `fieldset_actions` the requested names are passed in the serializer
+    context, and the queryset is narrowed to what the selected fields read
+    (see SparseFieldsetMixin.restrict_queryset), so narrow requests also
+    issue narrower SQL. The ordering fields are always loaded, as cursor
+    pagination reads them from the rows.
+    """
+    fieldset_params = ('fields', 'expand')
+    fieldset_actions = ('list', 'retrieve', 'batch')
+
+    def get_fieldset(self):
+        """
+        Requested field names by parameter, empty outside fieldset_actions
+
+        Names the serializer does not know are dropped, so they neither key
+        cache entries nor change the response.
+        """
+        if self.action not in self.fieldset_actions:
+            return {}
+        query_params = self.request.query_params
+        return self.get_serializer_class().known_fieldset({
+            name: parse_fieldset(query_params.getlist(name)) for name in self.fieldset_params
+        })
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), **self.get_fieldset()}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action not in self.fieldset_actions:
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return serializer.restrict_queryset(queryset, also=ordering_columns(self))
+
+
+class CompiledListMixin:
+    """
+    Serialize list pages through the compiled read path
+
+    The filtered queryset is paginated as .values() rows of the columns the
+    serializer reads, plus the ordering fields cursors are made of, and
+    serialized by api/fast_serializers.py. A serializer that does not
+    compile keeps the DRF path.
+    """
+
+    def list(self, request, *args, **kwargs):
+        try:
+            compiled = compile_serializer(self.get_serializer_class(), self.get_serializer_context())
+        except NotCompilable:
+            return super().list(request, *args, **kwargs)
+
+        rows = compiled.rows(self.filter_queryset(self.get_queryset()), *ordering_columns(self))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(compiled.serialize(page))
+        return Response(compiled.serialize(rows))
+
+
+def render_counted(items, pks, prefix=b'', suffix=b''):
+    """
+    Render items between prefix and suffix, leaving out their views_count
+
+    Returns:
+        Dict with the rendered 'chunks' and the 'pks' of the items, whose
+        counts join_counted() puts between the chunks
+    """
+    chunks = [prefix]
+    for i, item in enumerate(items):
+        item = dict(item)
+        del item['views_count']
+        rest = JSONRenderer().render(item)[1:]
+        chunks[-1] += (b',' if i else b'') + b'{"views_count":'
+        chunks.append(rest if rest == b'}' else b',' + rest)
+    chunks[-1] += suffix
+    return {'chunks': chunks, 'pks': list(pks)}
+
+
+def join_counted(entry, counts):
+    """Body of a render_counted() entry with the given {pk: views_count} filled in"""
+    body = [entry['chunks'][0]]
+    for pk, chunk in zip(entry['pks'], entry['chunks'][1:]):
+        body += [str(counts.get(pk, 0)).encode(), chunk]
+    return b''.join(body)
+
+
+class CachedResponseMixin:
+    """
+    Base of the response caching mixins
+
+    Set `cache_domain` to the content domain whose version invalidates the
+    entries. Entries are partitioned by visibility class (public vs. staff),
+    not per user, and stored pre-encoded with a gzip variant (see
+    api/responses.py).
+
+    The views_count of objects is not cached with them: it is filled in from
+    the view counters (api/counters.py) on every request, so counter flushes
+    leave the entries alone. Those bodies are compressed by GZipMiddleware.
+    """
+    cache_domain = None
+
+    def get_visibility(self):
+        # Mirrors get_queryset: authenticated users also see drafts
+        return 'staff' if self.request.user.is_authenticated else 'public'
+
+    def encode_data(self, data, pk=None):
+        """
+        Pre-encode response data for caching, see decode_entries()
+
+        `data` is a list, a page of 'results' or, with its `pk`, one object.
+        List items without their id keep the views_count they were cached with.
+        """
+        if pk is not None:
+            items, pks, prefix, suffix = [data], [pk], b'', b''
+        else:
+            if isinstance(data, list):
+                items, prefix, suffix = data, b'[', b']'
+            else:
+                items = data.get('results') or []
+                prefix, suffix = JSONRenderer().render({**data, 'results': []}).split(b'"results":[]')
+                prefix, suffix = prefix + b'"results":[', b']' + suffix
+            pks = [item.get('id') for item in items]
+
+        if not items or any('views_count' not in item for item in items) or None in pks:
+            return encode_body(JSONRenderer().render(data))
+        for item, item_pk in zip(items, pks):
+            remember_view_count(self.queryset.model, item_pk, item['views_count'])
+        return render_counted(items, pks, prefix, suffix)
+
+    def decode_entries(self, entries):
+        """Pre-encoded bodies of encode_data() entries, with the current view counts"""
+        pks = {pk for entry in entries if 'chunks' in entry for pk in entry['pks']}
+        counts = view_counts(self.queryset.model, pks)
+        return [
+            {**entry, **encode_body(join_counted(entry, counts), compress=False)}
+            if 'chunks' in entry else entry
+            for entry in entries
+        ]
+
+
+class CachedListMixin(CachedResponseMixin):
+    """
+    Cache JSON list responses under a canonical query-string key
+
+    Only parameters the view actually understands (filterset fields, search,
+    ordering, pagination, including an opt-in pagination cursor, and sparse
+    fieldsets) take part in the key. They are sorted, empty
+    values, defaults and unknown field names are dropped, so
+    `?page=1&page_size=10`, `?page_size=10`, `?search=` and `?fields=nope`
+    all share one entry.
+    """
+
+    def get_cache_params(self):
+        """Return the query parameters that can change the list response"""
+        params = {}
+        backends = self.filter_backends
+
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None and django_filters.DjangoFilterBackend in backends:
+            for name, field in filterset_class.base_filters.items():
+                params[name] = (
+                    'boolean' if isinstance(field, django_filters.BooleanFilter) else None
+                )
+        search_param = filters.SearchFilter.search_param
+        if (
+            RankedSearchFilter in backends
+            or (filters.SearchFilter in backends and getattr(self, 'search_fields', None))
+            # A full-text filterset field (BlogPostFilter.search)
+            or search_param in params
+        ):
+            params[search_param] = 'search'
+        if filters.OrderingFilter in backends:
+            params[filters.OrderingFilter.ordering_param] = 'ordering'
+        if self.paginator is not None:
+            params[self.paginator.page_query_param] = 'page'
+            if self.paginator.page_size_query_param:
+                params[self.paginator.page_size_query_param] = 'page_size'
+            cursor_param = getattr(self.paginator, 'cursor_query_param', None)
+            if cursor_param:
+                params[cursor_param] = 'cursor'
+        for name in getattr(self, 'fieldset_params', ()):
+            params[name] = 'fieldset'
+        return params
+
+    def get_canonical_query(self):
+        """Return the normalized query string identifying the list response"""
+        canonical = QueryDict(mutable=True)
+        query_params = self.request.query_params
+
+        for name, kind in sorted(self.get_cache_params().items()):
+            values = [value.strip() for value in query_params.getlist(name)]
+            if kind == 'cursor':
+                # Present even when empty: it selects cursor pagination
+                if values:
+                    canonical.setlist(name, values[:1])
+                continue
+            values = [value for value in values if value]
+            if not values:
+                continue
+
+            if kind == 'boolean':
+                values = [value.lower() for value in values]
+            elif kind == 'fieldset':
+                names = self.get_fieldset().get(name)
+                if not names:
+                    continue
+                values = [','.join(names)]
+            elif kind == 'search':
+                values = [' '.join(value.replace(',', ' ').lower().split()) for value in values]
+            elif kind == 'ordering' and values == [','.join(self.ordering or [])]:
+                continue
+            elif kind == 'page' and values == ['1']:
+                continue
+            elif kind == 'page_size' and values == [str(self.paginator.page_size)]:
+                continue
+
+            canonical.setlist(name, sorted(values))
+
+        return canonical.urlencode()
+
+    def list(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        query = self.get_canonical_query()
+        cache_key = create_cache_key(
+            self.cache_domain, 'list', self.basename,
+            self.get_visibility(), request.build_absolute_uri('/'), query
+        )
+        built = False
+
+        def build():
+            nonlocal built
+            built = True
+            # Build against the canonical URL so pagination links are too
+            request._request.GET = QueryDict(query)
+            request._request.META['QUERY_STRING'] = query
+            response = super(CachedListMixin, self).list(request, *args, **kwargs)
+            return self.encode_data(response.data)
+
+        encoded = get_or_build(
+            cache_key, build, settings.API_CACHE_TIMEOUT, tags=[f'{self.basename}-list']
+        )
+
+        with _list_cache_stats_lock:
+            _list_cache_stats[self.basename]['misses' if built else 'hits'] += 1
+
+        return CachedJSONResponse.from_encoded(request, self.decode_entries([encoded])[0])
+
+
+class CachedDetailMixin(CachedResponseMixin):
+    """
+    Cache JSON detail responses per lookup value (slug) and sparse fieldset
+
+    Entries are tagged '<model_name>:<pk>', so saving or deleting the object
+    invalidates them (see api/signals.py). With `count_views`, every request
+    served counts a view through the write-behind counters, and its visitor
+    in the unique-visitor sketches. Served entries show the flushed view
+    count (see CachedResponseMixin); a visitor flush refreshes the entry.
+
+    batch_retrieve serves several details at once from the same entries.
+    """
+    count_views = False
+
+    def count_view(self, pk):
+        if self.count_views and not is_warming():
+            record_view(self.queryset.model, pk)
+            visitor = visitor_id(self.request)
+            if visitor is not None:
+                record_visitor(self.queryset.model, pk, visitor)
+
+    def get_detail_cache_key(self, lookup):
+        fieldset = getattr(self, 'get_fieldset', dict)()
+        return create_cache_key(
+            self.cache_domain, 'detail', self.basename,
+            self.get_visibility(), self.request.build_absolute_uri('/'), lookup,
+            **{name: ','.join(names) for name, names in fieldset.items() if names}
+        )
+
+    def get_detail_tags(self, encoded):
+        return [f"{self.queryset.model._meta.model_name}:{encoded['pk']}"]
+
+    def encode_detail(self, instance):
+        data = self.get_serializer(instance).data
+        return {**self.encode_data(data, instance.pk), 'pk': instance.pk}
+
+    def retrieve(self, request, *args, **kwargs):
+        if request.accepted_renderer.format != 'json':
+            response = super().retrieve(request, *args, **kwargs)
+            self.count_view(response.data['id'])
+            return response
+
+        lookup = kwargs[self.lookup_url_kwarg or self.lookup_field]
+        encoded = get_or_build(
+            self.get_detail_cache_key(lookup),
+            lambda: self.encode_detail(self.get_object()),
+            settings.API_CACHE_TIMEOUT,
+            tags=self.get_detail_tags
+        )
+        self.count_view(encoded['pk'])
+
+        return CachedJSONResponse.from_encoded(request, self.decode_entries([encoded])[0])
+
+    def batch_retrieve(self, request):
+        """
+        Details of up to MAX_BATCH_SIZE objects by lookup value (?slugs=a,b,c)
+
+        Fresh cached details are read in one round-trip; the rest are
+        fetched with a single query sharing its prefetches, and cached for
+        retrieve as well. Results keep the requested order; lookup values
+        that match nothing visible are listed under 'missing'.
+        """
+        lookups = list(dict.fromkeys(
+            value.strip() for value in request.query_params.get('slugs', '').split(',')
+            if value.strip()
+        ))
+        if not lookups:
+            return Response(
+                {'error': 'Provide the slugs to fetch, e.g. ?slugs=a,b,c.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(lookups) > MAX_BATCH_SIZE:
+            return Response(
+                {'error': f'At most {MAX_BATCH_SIZE} slugs per batch.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        keys = {lookup: self.get_detail_cache_key(lookup) for lookup in lookups}
+        cached = cache.get_many(list(keys.values()))
+        now = time.time()
+        found = {}
+        for lookup, key in keys.items():
+            entry = cached.get(key)
+            if entry is not None and entry['fresh_until'] > now:
+                found[lookup] = entry['value']
+
+        uncached = [lookup for lookup in lookups if lookup not in found]
+        if uncached:
+            queryset = self.get_queryset().filter(**{f'{self.lookup_field}__in': uncached})
+            for instance in queryset:
+                lookup = str(getattr(instance, self.lookup_field))
+                encoded = self.encode_detail(instance)
+                set_built(
+                    keys[lookup], encoded, settings.API_CACHE_TIMEOUT,
+                    tags=self.get_detail_tags(encoded)
+                )
+                found[lookup] = encoded
+
+        results = self.decode_entries([found[lookup] for lookup in lookups if lookup in found])
+        for encoded in results:
+            self.count_view(encoded['pk'])
+
+        # Splice the encoded details instead of serializing them again
+        missing = [lookup for lookup in lookups if lookup not in found]
+        body = b''.join([
+            b'{"results":[', b','.join(encoded['body'] for encoded in results),
+            b'],"missing":', JSONRenderer().render(missing), b'}',
+        ])
+        if request.accepted_renderer.format != 'json':
+            return Response(json.loads(body))
+        return CachedJSONResponse.from_encoded(request, encode_body(body))
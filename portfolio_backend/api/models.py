@@ -166,9 +166,10 @@ class Project(models.Model):
             print(f"Error creating thumbnail: {e}")
 
     def increment_views(self):
-        """Increment view count"""
+        """Count a view; written to the database by the next counter flush"""
+        from .counters import record_view
+        record_view(type(self), self.pk)
         self.views_count += 1
-        self.save(update_fields=['views_count'])
 
 
 class BlogPost(models.Model):
@@ -256,9 +257,10 @@ class BlogPost(models.Model):
         super().save(*args, **kwargs)
 
     def increment_views(self):
-        """Increment view count"""
+        """Count a view; written to the database by the next counter flush"""
+        from .counters import record_view
+        record_view(type(self), self.pk)
         self.views_count += 1
-        self.save(update_fields=['views_count'])
 
 
 class ContactSubmission(models.Model):
@@ -683,4 +685,142 @@ class CustomSectionItem(models.Model):
         verbose_name_plural = "Custom Section Items"
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+
+class AnalyticsHourly(models.Model):
+    """Page and section views aggregated per hour (see api/analytics.py)"""
+    KIND_CHOICES = [
+        ('page', 'Page'),
+        ('section', 'Section'),
+    ]
+
+    hour = models.DateTimeField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    name = models.CharField(max_length=200, help_text="Page path or section id")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-hour', 'kind', 'name']
+        verbose_name = "Hourly Analytics"
+        verbose_name_plural = "Hourly Analytics"
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'kind', 'name'], name='unique_analytics_hour'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'hour']),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.kind} {self.name}: {self.count}"
+
+
+class AnalyticsDaily(models.Model):
+    """Page and section views aggregated per day (see api/analytics.py)"""
+    date = models.DateField()
+    kind = models.CharField(max_length=20, choices=AnalyticsHourly.KIND_CHOICES)
+    name = models.CharField(max_length=200, help_text="Page path or section id")
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date', 'kind', 'name']
+        verbose_name = "Daily Analytics"
+        verbose_name_plural = "Daily Analytics"
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'kind', 'name'], name='unique_analytics_day'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.date} {self.kind} {self.name}: {self.count}"
+
+
+class VisitorSketch(models.Model):
+    """
+    HyperLogLog sketch of the visitors of a project or blog post on one day,
+    or over all time when date is empty (see api/visitors.py)
+    """
+    model = models.CharField(max_length=100, help_text="Model label, e.g. api.Project")
+    object_id = models.PositiveIntegerField()
+    date = models.DateField(null=True, blank=True)
+    registers = models.BinaryField(help_text="zlib-compressed HyperLogLog registers")
+    estimate = models.PositiveIntegerField(default=0, help_text="Estimated unique visitors")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-date']
+        verbose_name = "Visitor Sketch"
+        verbose_name_plural = "Visitor Sketches"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['model', 'object_id', 'date'],
+                condition=models.Q(date__isnull=False),
+                name='unique_visitor_sketch_day'
+            ),
+            models.UniqueConstraint(
+                fields=['model', 'object_id'],
+                condition=models.Q(date__isnull=True),
+                name='unique_visitor_sketch_total'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['model', 'object_id', 'date']),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} {self.date or 'all time'}: ~{self.estimate}"
+
+    @classmethod
+    def all_time_estimate(cls, obj):
+        """Stored all-time estimate of a model instance, 0 before its first flush"""
+        rows = cls.objects.filter(model=obj._meta.label, object_id=obj.pk, date__isnull=True)
+        return rows.values_list('estimate', flat=True).first() or 0
+
+    @classmethod
+    def all_time_subquery(cls, model):
+        """
+        All-time estimate of each row of a `model` queryset, to annotate as
+        unique_visitors_estimate (None before the object's first flush)
+        """
+        rows = cls.objects.filter(
+            model=model._meta.label, object_id=models.OuterRef('pk'), date__isnull=True
+        )
+        return models.Subquery(rows.values('estimate')[:1])
+
+
+class SearchTerm(models.Model):
+    """A token of the blog search index (see api/search.py)"""
+    term = models.CharField(max_length=100, unique=True)
+
+    class Meta:
+        ordering = ['term']
+
+    def __str__(self):
+        return self.term
+
+
+class SearchDocument(models.Model):
+    """A blog post in the search index, with its field-weighted length"""
+    post = models.OneToOneField(BlogPost, on_delete=models.CASCADE, related_name='search_document')
+    length = models.FloatField(default=0)
+    indexed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Index of {self.post}"
+
+
+class SearchPosting(models.Model):
+    """Field-weighted frequency of a term in an indexed blog post"""
+    term = models.ForeignKey(SearchTerm, on_delete=models.CASCADE, related_name='postings')
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    frequency = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['term', 'document'], name='unique_search_posting'),
+        ]
+
+    def __str__(self):
+        return f"{self.term} in {self.document.post}: {self.frequency}"
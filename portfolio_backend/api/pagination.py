@@ -1,17 +1,155 @@
 """
 Custom pagination classes for API endpoints
 """
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet, ValidationError as DjangoValidationError
+from django.core.paginator import EmptyPage, Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
 from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from .utils import create_cache_key
+
+
+# Below this many rows an exact count is cheap and beats the estimate
+ESTIMATE_MIN_ROWS = 10000
+
+
+class CachedCountPaginator(DjangoPaginator):
+    """
+    Paginator caching the count of a queryset under its content domain
+
+    The key is a hash of the COUNT query's SQL, so every request filtering
+    the same way shares it (whatever the page or parameter spelling), and
+    embeds the domain version, so content changes invalidate it. Without a
+    domain, or for plain lists, the count is exact as usual.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0, allow_empty_first_page=True, domain=None):
+        super().__init__(object_list, per_page, orphans, allow_empty_first_page)
+        self.domain = domain
+
+    def count_key(self):
+        """Cache key of the count, or None if it cannot be cached"""
+        if self.domain is None or not hasattr(self.object_list, 'query'):
+            return None
+        try:
+            sql, params = self.object_list.order_by().query.sql_with_params()
+        except EmptyResultSet:
+            return None
+        digest = hashlib.md5(f"{sql}|{params}".encode()).hexdigest()
+        return create_cache_key(self.domain, 'count', self.object_list.db, digest)
+
+    def exact_count(self):
+        key = self.count_key()
+        if key is None:
+            return DjangoPaginator.count.func(self)
+        count = cache.get(key)
+        if count is None:
+            count = self.object_list.count()
+            cache.set(key, count, settings.API_CACHE_TIMEOUT)
+        return count
+
+    @cached_property
+    def count(self):
+        return self.exact_count()
+
+
+class EstimatedCountPaginator(CachedCountPaginator):
+    """
+    Paginator using the planner's row estimate of unfiltered PostgreSQL
+    tables (pg_class.reltuples, kept current by autovacuum/ANALYZE)
+
+    Filtered querysets, small tables and other databases fall back to the
+    cached exact count. `estimated` tells which one was used. Page numbers
+    are not checked against an estimate, which can be low: a page fetches
+    one extra row, and the count is raised to cover the rows seen (or set
+    exactly on the last page). Pages past the real end are simply empty.
+    """
+    estimated = False
+
+    def estimate(self):
+        """Estimated rows of the unfiltered table, or None"""
+        queryset = self.object_list
+        if not hasattr(queryset, 'query') or queryset.query.where or queryset.query.distinct:
+            return None
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # -1 until the table is first analyzed
+        if row is None or row[0] < ESTIMATE_MIN_ROWS:
+            return None
+        return int(row[0])
+
+    @cached_property
+    def count(self):
+        estimate = self.estimate()
+        if estimate is None:
+            return self.exact_count()
+        self.estimated = True
+        return estimate
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Past the estimated last page, which may not be the real one
+            if not self.estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.estimated:
+            return super().page(number)
+
+        bottom = (number - 1) * self.per_page
+        # One more row tells whether a next page exists
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if len(rows) > self.per_page:
+            self.count = max(self.count, bottom + len(rows))
+        elif rows:
+            self.count = bottom + len(rows)
+        self.__dict__.pop('num_pages', None)
+        return self._get_page(rows[:self.per_page], number, self)
 
 
 class StandardResultsSetPagination(PageNumberPagination):
     """
     Standard pagination class with customizable page size
+
+    Counts are cached per filter set under the view's content domain
+    (see CachedCountPaginator).
     """
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
+    count_paginator_class = CachedCountPaginator
+    
+    def get_count_domain(self, view):
+        """Content domain of the view's counts: `count_cache_domain` or `cache_domain`"""
+        return getattr(view, 'count_cache_domain', None) or getattr(view, 'cache_domain', None)
+    
+    def paginate_queryset(self, queryset, request, view=None):
+        self.django_paginator_class = partial(
+            self.count_paginator_class, domain=self.get_count_domain(view)
+        )
+        return super().paginate_queryset(queryset, request, view)
     
     def get_paginated_response(self, data):
         return Response({
@@ -24,6 +162,19 @@ class StandardResultsSetPagination(PageNumberPagination):
         })
 
 
+class EstimatedCountPagination(StandardResultsSetPagination):
+    """
+    Pagination for staff lists of large, append-mostly tables: counts are
+    planner estimates when unfiltered (see EstimatedCountPaginator)
+    """
+    count_paginator_class = EstimatedCountPaginator
+    
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        response.data['count_estimated'] = self.page.paginator.estimated
+        return response
+
+
 class LargeResultsSetPagination(PageNumberPagination):
     """
     Pagination for large datasets
@@ -40,3 +191,160 @@ class SmallResultsSetPagination(PageNumberPagination):
     page_size = 5
     page_size_query_param = 'page_size'
     max_page_size = 50
+
+
+class SignedCursorPagination(BasePagination):
+    """
+    Keyset (seek) pagination over the queryset's ordering
+
+    Instead of OFFSET, each page selects the rows after the last one of the
+    previous page (`WHERE (a, b, id) < (:a, :b, :id)` spelled out for mixed
+    directions), so any page costs one indexed query for page_size + 1 rows,
+    with no COUNT(*), however deep it is. The primary key is appended to the
+    ordering as a tie-breaker; every ordering field must be non-null.
+
+    Cursors are the ordering values of a boundary row, signed so they cannot
+    be forged or reused with another ordering.
+    """
+    cursor_query_param = 'cursor'
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    signing_salt = 'api.pagination.cursor'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """(field, descending) pairs of the queryset ordering, ending with the pk"""
+        ordering = []
+        for name in queryset.query.order_by or queryset.model._meta.ordering:
+            if not isinstance(name, str):
+                raise ValidationError({
+                    self.cursor_query_param: 'Cursor pagination needs an explicit ordering '
+                                             'with relevance-ranked search.'
+                })
+            field_name = name.lstrip('-')
+            if field_name == 'pk':
+                field = queryset.model._meta.pk
+            else:
+                field = queryset.model._meta.get_field(field_name)
+            ordering.append((field, name.startswith('-')))
+        if not any(field.primary_key for field, _ in ordering):
+            descending = ordering[-1][1] if ordering else False
+            ordering.append((queryset.model._meta.pk, descending))
+        return ordering
+
+    def encode_cursor(self, instance, reverse):
+        # Model instances, or .values() rows (see CompiledListMixin)
+        if isinstance(instance, dict):
+            values = [instance[field.attname] for field, _ in self.ordering]
+        else:
+            values = [getattr(instance, field.attname) for field, _ in self.ordering]
+        return signing.dumps({
+            'o': [f"{'-' if descending else ''}{field.name}" for field, descending in self.ordering],
+            'v': [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+            'r': reverse,
+        }, salt=self.signing_salt, compress=True)
+
+    def decode_cursor(self, request):
+        """(values, reverse) of the requested cursor, or None for the first page"""
+        token = request.query_params.get(self.cursor_query_param, '').strip()
+        if not token:
+            return None
+        try:
+            payload = signing.loads(token, salt=self.signing_salt)
+            ordering = [f"{'-' if descending else ''}{field.name}" for field, descending in self.ordering]
+            if payload['o'] != ordering or len(payload['v']) != len(ordering):
+                raise ValueError
+            values = [field.to_python(value) for (field, _), value in zip(self.ordering, payload['v'])]
+        except (signing.BadSignature, KeyError, TypeError, ValueError, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return values, bool(payload['r'])
+
+    def seek(self, values, reverse):
+        """Q selecting the rows after (before, if reverse) the given ordering values"""
+        condition = Q()
+        equal = Q()
+        for (field, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f"{field.attname}__{lookup}": value})
+            equal &= Q(**{field.attname: value})
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        cursor = self.decode_cursor(request)
+        reverse = cursor is not None and cursor[1]
+        if cursor is not None:
+            queryset = queryset.filter(self.seek(*cursor))
+        order_by = [
+            f"{'-' if descending != reverse else ''}{field.attname}"
+            for field, descending in self.ordering
+        ]
+        rows = list(queryset.order_by(*order_by)[:self.page_size + 1])
+
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.page[-1], False)
+        )
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(self.page[0], True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data
+        })
+
+
+class StandardOrCursorPagination(StandardResultsSetPagination):
+    """
+    Page-number pagination, or signed cursor pagination when the request has
+    a `cursor` parameter (empty for the first page): `?cursor=` then follow
+    `next`/`previous`
+    """
+    cursor_pagination_class = SignedCursorPagination
+    cursor_query_param = SignedCursorPagination.cursor_query_param
+
+    def __init__(self):
+        self.cursor_paginator = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.cursor_query_param in request.query_params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
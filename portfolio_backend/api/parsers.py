@@ -0,0 +1,12 @@
+"""
+Custom request parsers for API endpoints
+"""
+from rest_framework.parsers import JSONParser
+
+
+class BeaconJSONParser(JSONParser):
+    """
+    JSON sent by navigator.sendBeacon() with a string body, which browsers
+    label text/plain to avoid a CORS preflight
+    """
+    media_type = 'text/plain'
@@ -0,0 +1,82 @@
+"""
+Responses served from pre-encoded cached bodies
+
+Cached JSON bodies are stored together with a gzip variant, compressed once
+at the highest level when the cache is filled, and the SHA-256 ETag of the
+identity body. Serving them picks the variant from Accept-Encoding and sets
+Content-Encoding and Vary itself, so GZipMiddleware leaves the response
+alone instead of recompressing it on every request.
+"""
+import gzip
+import hashlib
+import json
+import re
+
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.functional import cached_property
+from django.utils.http import quote_etag
+
+
+# Bodies shorter than this are not worth compressing (as in GZipMiddleware)
+MIN_COMPRESS_LENGTH = 200
+
+re_accepts_gzip = re.compile(r'\bgzip\b(?!\s*;\s*q=0(?:\.0+)?\s*(?:,|$))')
+
+
+def accepts_gzip(request):
+    return bool(re_accepts_gzip.search(request.META.get('HTTP_ACCEPT_ENCODING', '')))
+
+
+def encode_body(body, compress=True):
+    """
+    Pre-encode a response body for caching
+
+    compress=False leaves compression to GZipMiddleware, for bodies that
+    are assembled per request and would otherwise be compressed each time.
+
+    Returns:
+        Dict with the identity 'body', its 'gzip' variant (None when not
+        worth it) and the 'etag' content hash
+    """
+    compressed = None
+    if compress and len(body) >= MIN_COMPRESS_LENGTH:
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        if len(compressed) >= len(body):
+            compressed = None
+
+    return {
+        'body': body,
+        'gzip': compressed,
+        'etag': hashlib.sha256(body).hexdigest(),
+    }
+
+
+class CachedJSONResponse(HttpResponse):
+    """Pre-encoded JSON response; `data` is decoded only when accessed"""
+
+    def __init__(self, content, identity=None, **kwargs):
+        kwargs.setdefault('content_type', 'application/json')
+        super().__init__(content, **kwargs)
+        self._identity = content if identity is None else identity
+
+    @cached_property
+    def data(self):
+        return json.loads(self._identity)
+
+    @classmethod
+    def from_encoded(cls, request, encoded, **kwargs):
+        """Serve the variant of a pre-encoded body (see encode_body) the client accepts"""
+        compressed = encoded.get('gzip')
+
+        if compressed is not None and accepts_gzip(request):
+            response = cls(compressed, identity=encoded['body'], **kwargs)
+            response['Content-Encoding'] = 'gzip'
+            # Same content, different coding: weak, like GZipMiddleware
+            response['ETag'] = f"W/{quote_etag(encoded['etag'])}"
+        else:
+            response = cls(encoded['body'], **kwargs)
+            response['ETag'] = quote_etag(encoded['etag'])
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
@@ -0,0 +1,190 @@
+"""
+Inverted index and BM25 ranking for blog search
+
+Each blog post is tokenized into its own SearchDocument with one
+SearchPosting per distinct term, holding the term frequency weighted by
+field (FIELD_BOOSTS: a word in the title counts three times, in a tag
+twice, ...). The index is updated whenever a post, its tags or a tag name
+change (api/signals.py), or rebuilt with `manage.py rebuild_search_index`.
+
+A query reads only the posting lists of its own terms (an indexed lookup)
+plus the corpus size and average length, which are cached under the 'blog'
+cache version and so counted once per blog change. It then scores the
+matches with BM25, so its cost depends on how many posts contain the
+terms, not on how many posts there are or how long they are. Document
+frequencies count every indexed post containing a term, so scores do not
+depend on which posts the query is restricted to.
+"""
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count
+
+from .models import BlogPost, SearchDocument, SearchPosting, SearchTerm
+from .utils import bump_cache_version, create_cache_key, get_or_build
+
+
+# Weight of a term occurrence in each field
+FIELD_BOOSTS = {
+    'title': 3.0,
+    'tags': 2.0,
+    'excerpt': 1.5,
+    'content': 1.0,
+}
+
+# BM25 parameters: term frequency saturation and length normalization
+K1 = 1.2
+B = 0.75
+
+# Most ranked posts a query returns
+MAX_RESULTS = 500
+
+STOPWORDS = frozenset("""
+    a an and are as at be but by for from has have how i in is it its of on or
+    that the this to was were what when where which who why will with you your
+""".split())
+
+_token_re = re.compile(r'\w+')
+
+
+def tokenize(text):
+    """Lowercase, accent-folded word tokens of a text, without stopwords"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return [
+        token[:100] for token in _token_re.findall(text)
+        if token not in STOPWORDS and (len(token) > 1 or token.isdigit())
+    ]
+
+
+def document_terms(post):
+    """
+    Field-weighted term frequencies and length of a blog post
+
+    Returns:
+        ({term: weighted frequency}, weighted length)
+    """
+    fields = {
+        'title': post.title,
+        'tags': ' '.join(tag.name for tag in post.tags.all()),
+        'excerpt': post.excerpt,
+        'content': post.content,
+    }
+    frequencies = Counter()
+    length = 0.0
+    for field, text in fields.items():
+        boost = FIELD_BOOSTS[field]
+        tokens = tokenize(text)
+        length += boost * len(tokens)
+        for token, count in Counter(tokens).items():
+            frequencies[token] += boost * count
+    return frequencies, length
+
+
+def _term_ids(terms):
+    """Ids of the given terms, creating the missing ones"""
+    SearchTerm.objects.bulk_create(
+        [SearchTerm(term=term) for term in terms], ignore_conflicts=True
+    )
+    return dict(SearchTerm.objects.filter(term__in=terms).values_list('term', 'id'))
+
+
+def index_blog_post(post):
+    """(Re)index a blog post, replacing its previous postings"""
+    frequencies, length = document_terms(post)
+    with transaction.atomic():
+        document, _ = SearchDocument.objects.update_or_create(
+            post=post, defaults={'length': length}
+        )
+        document.postings.all().delete()
+        term_ids = _term_ids(list(frequencies))
+        SearchPosting.objects.bulk_create([
+            SearchPosting(term_id=term_ids[term], document=document, frequency=frequency)
+            for term, frequency in frequencies.items()
+        ])
+    return document
+
+
+def rebuild_blog_index():
+    """
+    Reindex every blog post and drop terms no longer used
+
+    Returns:
+        Number of posts indexed
+    """
+    posts = BlogPost.objects.prefetch_related('tags')
+    count = 0
+    for post in posts.iterator(chunk_size=200):
+        index_blog_post(post)
+        count += 1
+    SearchTerm.objects.annotate(used=Count('postings')).filter(used=0).delete()
+    # Corpus statistics and cached searches predate the rebuild
+    bump_cache_version('blog')
+    return count
+
+
+def corpus_stats():
+    """
+    Number of indexed posts and their average weighted length
+
+    Cached under the 'blog' version, which every change of an indexed post
+    bumps, so queries do not aggregate the whole document table.
+    """
+    def build():
+        stats = SearchDocument.objects.aggregate(total=Count('id'), average_length=Avg('length'))
+        return {'total': stats['total'], 'average_length': stats['average_length'] or 1.0}
+
+    return get_or_build(create_cache_key('blog', 'search', 'stats'), build, settings.API_CACHE_TIMEOUT)
+
+
+def rank_blog_posts(query, queryset=None, limit=MAX_RESULTS):
+    """
+    Rank blog posts matching any term of a query by BM25
+
+    Args:
+        query: Search text
+        queryset: Only rank posts of this queryset (e.g. published ones)
+        limit: Most results returned
+
+    Returns:
+        List of (post id, score), best first
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+
+    postings = SearchPosting.objects.filter(term__term__in=terms)
+    if queryset is not None:
+        postings = postings.filter(document__post__in=queryset.values('pk'))
+    postings = list(postings.values_list(
+        'term_id', 'document__post_id', 'document__length', 'frequency'
+    ))
+    if not postings:
+        return []
+
+    stats = corpus_stats()
+    average_length = stats['average_length']
+
+    if queryset is None:
+        document_frequency = Counter(term_id for term_id, _, _, _ in postings)
+    else:
+        # Over the whole index, not just the posts of the queryset
+        document_frequency = dict(
+            SearchPosting.objects.filter(term_id__in={term_id for term_id, _, _, _ in postings})
+            .values('term_id').annotate(count=Count('id')).values_list('term_id', 'count')
+        )
+    scores = defaultdict(float)
+    for term_id, post_id, length, frequency in postings:
+        df = document_frequency[term_id]
+        # The cached total may trail a post indexed since
+        total = max(stats['total'], df)
+        idf = math.log(1 + (total - df + 0.5) / (df + 0.5))
+        norm = K1 * (1 - B + B * length / average_length)
+        scores[post_id] += idf * frequency * (K1 + 1) / (frequency + norm)
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+    return ranked[:limit]
@@ -0,0 +1,280 @@
+"""
+Full-text search backends for projects and blog posts
+
+SEARCH_BACKEND selects how searches are answered:
+
+    'database'  The database's own full-text engine: a GIN-indexed tsvector
+                column on PostgreSQL, an FTS5 shadow table on SQLite (both
+                created by migration 0008). Other databases use 'index'.
+    'index'     The BM25 inverted index of api/search.py (blog posts only;
+                projects use 'contains').
+    'contains'  Unranked icontains matching, as before the indexes existed.
+    'auto'      'database' (the default).
+
+Indexed fields and their weights are listed in SEARCH_FIELDS; projects and
+blog posts are searched by their own endpoints, all of them together by
+/api/search/ (api/unified_search.py). Signals keep
+the active backend up to date (api/signals.py), and only that one; `manage.py
+rebuild_search_index` refills it after bulk changes or a switch of backend.
+"""
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+
+from .models import BlogPost, Certification, CustomSection, CustomSectionItem, Experience, Project
+from .search import MAX_RESULTS, index_blog_post, rebuild_blog_index, rank_blog_posts, tokenize
+
+
+# Indexed fields of each searchable model, with their weight class:
+# A (titles), B (tags, summaries), C (body text). The first field is the
+# title. Related fields (RELATED_TEXT) index the text of all related objects.
+SEARCH_FIELDS = {
+    BlogPost: [('title', 'A'), ('tags', 'B'), ('excerpt', 'B'), ('content', 'C')],
+    Project: [
+        ('title', 'A'), ('tags', 'B'), ('technologies_used', 'B'),
+        ('short_description', 'B'), ('description', 'C'),
+    ],
+    Experience: [
+        ('title', 'A'), ('company', 'B'), ('location', 'B'),
+        ('description', 'C'), ('bullets', 'C'),
+    ],
+    Certification: [('name', 'A'), ('issuing_organization', 'B'), ('description', 'C')],
+    CustomSection: [('title', 'A'), ('content', 'C')],
+    CustomSectionItem: [('title', 'A'), ('subtitle', 'B'), ('description', 'C')],
+}
+
+# Related object field holding the indexed text of each related field
+RELATED_TEXT = {'tags': 'name', 'bullets': 'text'}
+
+# Relative weight of each class for engines that take numeric weights
+WEIGHTS = {'A': 3.0, 'B': 2.0, 'C': 1.0}
+
+
+def related_fields(model):
+    """Indexed related fields of a model, to prefetch before field_values()"""
+    return [field for field, _ in SEARCH_FIELDS[model] if field in RELATED_TEXT]
+
+
+def field_values(instance):
+    """Text of each indexed field of an instance"""
+    values = []
+    for field, _ in SEARCH_FIELDS[type(instance)]:
+        if field in RELATED_TEXT:
+            values.append(' '.join(
+                getattr(related, RELATED_TEXT[field]) for related in getattr(instance, field).all()
+            ))
+        else:
+            values.append(getattr(instance, field) or '')
+    return values
+
+
+def _subquery(queryset):
+    """SQL and params selecting the primary keys of a queryset"""
+    return queryset.order_by().values('pk').query.sql_with_params()
+
+
+class SearchBackend:
+    """Ranks the instances of a searchable model matching a text query"""
+    name = None
+    # False when matches come back in queryset order, without a score
+    ranked = True
+
+    def rank(self, model, query, queryset=None, limit=MAX_RESULTS):
+        """
+        Returns:
+            List of (pk, score) of the best `limit` matches (all of them for
+            None), best first
+        """
+        raise NotImplementedError
+
+    def update(self, instance):
+        """Index a created or changed instance"""
+
+    def remove(self, instance):
+        """Drop a deleted instance from the index"""
+
+    def rebuild(self, model):
+        """
+        Reindex every instance of a model
+
+        Returns:
+            Number of instances indexed
+        """
+        return 0
+
+
+class ContainsBackend(SearchBackend):
+    """Unranked case-insensitive substring matching of every query word"""
+    name = 'contains'
+    ranked = False
+
+    def rank(self, model, query, queryset=None, limit=MAX_RESULTS):
+        words = query.split()
+        if not words:
+            return []
+        if queryset is None:
+            queryset = model.objects.all()
+
+        fields = [
+            f'{field}__{RELATED_TEXT[field]}' if field in RELATED_TEXT else field
+            for field, _ in SEARCH_FIELDS[model]
+        ]
+        for word in words:
+            queryset = queryset.filter(
+                reduce(or_, [Q(**{f'{field}__icontains': word}) for field in fields])
+            )
+        pks = queryset.distinct().values_list('pk', flat=True)[:limit]
+        return [(pk, 0.0) for pk in pks]
+
+
+class IndexBackend(SearchBackend):
+    """BM25 over the inverted index tables of api/search.py"""
+    name = 'index'
+    fallback = ContainsBackend()
+
+    def rank(self, model, query, queryset=None, limit=MAX_RESULTS):
+        if model is not BlogPost:
+            return self.fallback.rank(model, query, queryset, limit)
+        return rank_blog_posts(query, queryset, limit)
+
+    def update(self, instance):
+        if isinstance(instance, BlogPost):
+            index_blog_post(instance)
+
+    def rebuild(self, model):
+        if model is not BlogPost:
+            return 0
+        return rebuild_blog_index()
+
+
+class PostgresBackend(SearchBackend):
+    """Weighted tsvector column with a GIN index, ranked by ts_rank_cd"""
+    name = 'postgresql'
+
+    def rank(self, model, query, queryset=None, limit=MAX_RESULTS):
+        if not query.strip():
+            return []
+        table = model._meta.db_table
+        sql = (
+            f"SELECT t.id, ts_rank_cd(t.search_vector, q, 32) AS score "
+            f"FROM {table} t, websearch_to_tsquery(%s::regconfig, %s) q "
+            f"WHERE t.search_vector @@ q"
+        )
+        params = [settings.SEARCH_CONFIG, query]
+        if queryset is not None:
+            subquery, subparams = _subquery(queryset)
+            sql += f" AND t.id IN ({subquery})"
+            params.extend(subparams)
+        sql += " ORDER BY score DESC, t.id DESC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def update(self, instance):
+        fields = SEARCH_FIELDS[type(instance)]
+        vector = ' || '.join(
+            f"setweight(to_tsvector(%s::regconfig, %s), '{weight}')" for _, weight in fields
+        )
+        params = []
+        for value in field_values(instance):
+            params.extend([settings.SEARCH_CONFIG, value])
+        params.append(instance.pk)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {instance._meta.db_table} SET search_vector = {vector} WHERE id = %s",
+                params
+            )
+
+    def rebuild(self, model):
+        count = 0
+        instances = model.objects.prefetch_related(*related_fields(model))
+        for instance in instances.iterator(chunk_size=200):
+            self.update(instance)
+            count += 1
+        return count
+
+
+class SQLiteBackend(SearchBackend):
+    """FTS5 shadow table '<table>_fts' keyed by rowid, ranked by bm25()"""
+    name = 'sqlite'
+
+    def rank(self, model, query, queryset=None, limit=MAX_RESULTS):
+        # Quote every token so user input is never parsed as FTS5 syntax
+        match = ' '.join(f'"{token}"' for token in tokenize(query))
+        if not match:
+            return []
+        table = f"{model._meta.db_table}_fts"
+        weights = ', '.join(str(WEIGHTS[weight]) for _, weight in SEARCH_FIELDS[model])
+        sql = (
+            f"SELECT rowid, -bm25({table}, {weights}) AS score "
+            f"FROM {table} WHERE {table} MATCH %s"
+        )
+        params = [match]
+        if queryset is not None:
+            subquery, subparams = _subquery(queryset)
+            # Unary plus: FTS5 must not plan the lookup from this constraint
+            # (probing MATCH per rowid), only filter its matches with it
+            sql += f" AND +rowid IN ({subquery})"
+            params.extend(subparams)
+        sql += " ORDER BY score DESC, rowid DESC"
+        if limit is not None:
+            sql += " LIMIT %s"
+            params.append(limit)
+
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            return cursor.fetchall()
+
+    def _insert_sql(self, model):
+        columns = ', '.join(field for field, _ in SEARCH_FIELDS[model])
+        placeholders = ', '.join(['%s'] * (len(SEARCH_FIELDS[model]) + 1))
+        return f"INSERT INTO {model._meta.db_table}_fts (rowid, {columns}) VALUES ({placeholders})"
+
+    def update(self, instance):
+        model = type(instance)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {model._meta.db_table}_fts WHERE rowid = %s", [instance.pk])
+            cursor.execute(self._insert_sql(model), [instance.pk, *field_values(instance)])
+
+    def remove(self, instance):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {instance._meta.db_table}_fts WHERE rowid = %s", [instance.pk]
+            )
+
+    def rebuild(self, model):
+        rows = [
+            [instance.pk, *field_values(instance)]
+            for instance in model.objects.prefetch_related(*related_fields(model))
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {model._meta.db_table}_fts")
+            cursor.executemany(self._insert_sql(model), rows)
+        return len(rows)
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in [ContainsBackend(), IndexBackend(), PostgresBackend(), SQLiteBackend()]
+}
+
+
+def get_search_backend(name=None):
+    """The search backend named by SEARCH_BACKEND (or `name`)"""
+    name = name or settings.SEARCH_BACKEND
+    if name in ('auto', 'database'):
+        name = connection.vendor if connection.vendor in BACKENDS else 'index'
+    return BACKENDS[name]
+
+
+def search(model, query, queryset=None, limit=MAX_RESULTS):
+    """Rank instances of a searchable model with the active backend"""
+    return get_search_backend().rank(model, query, queryset, limit)
@@ -0,0 +1,148 @@
+"""
+Normalized blog search cache with popular-query tracking
+
+Queries are normalized before keying: the tokens of api/search.py's
+`tokenize` (lowercase, accent-folded, without stopwords and punctuation),
+deduplicated and sorted, so "Django", " django " and "the DJANGO" share one
+entry. Searches run on the normalized text too, so an entry never depends
+on how its query was spelled.
+
+Results are stored with get_or_build under keys embedding the 'blog' cache
+version, so the default TwoTierCache serves hot queries from its per-worker
+tier and the rest from the shared tier. Every search also counts its normalized query (a Redis sorted set shared by all workers,
+or an in-process counter); after a blog change commits, the
+SEARCH_REFRESH_QUERIES most popular ones are rendered again in the
+background so they are never served cold.
+"""
+import threading
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.urls import reverse
+
+from .counters import buffer_redis
+from .search import tokenize
+from .utils import create_cache_key, get_or_build
+
+
+REDIS_POPULAR_KEY = 'portfolio:search:popular'
+# Distinct queries counted; the least popular are dropped beyond twice this
+MAX_TRACKED_QUERIES = 1000
+MAX_QUERY_LENGTH = 200
+
+_popular = Counter()
+_popular_lock = threading.Lock()
+
+_local = threading.local()
+
+
+def normalize_query(query):
+    """Sorted distinct search tokens of a query, separated by single spaces"""
+    return ' '.join(sorted(set(tokenize(query))))[:MAX_QUERY_LENGTH]
+
+
+def cached_search(visibility, query, build, timeout):
+    """
+    Results of a normalized blog search, built at most once per blog version
+
+    Args:
+        visibility: 'public' or 'staff', as the results differ
+        query: Normalized query (see normalize_query)
+        build: Callable returning the results
+        timeout: Cache timeout in seconds
+    """
+    key = create_cache_key('blog', 'search', visibility, q=query)
+    return get_or_build(key, build, timeout)
+
+
+def record_query(query):
+    """Count a search for a normalized query"""
+    if not query:
+        return
+
+    redis = buffer_redis()
+    if redis is not None:
+        try:
+            pipe = redis.pipeline()
+            pipe.zincrby(REDIS_POPULAR_KEY, 1, query)
+            pipe.zcard(REDIS_POPULAR_KEY)
+            tracked = pipe.execute()[1]
+            if tracked > 2 * MAX_TRACKED_QUERIES:
+                redis.zremrangebyrank(REDIS_POPULAR_KEY, 0, tracked - MAX_TRACKED_QUERIES - 1)
+            return
+        except Exception as e:
+            print(f"Error counting search query in Redis: {e}")
+
+    with _popular_lock:
+        _popular[query] += 1
+        if len(_popular) > 2 * MAX_TRACKED_QUERIES:
+            kept = _popular.most_common(MAX_TRACKED_QUERIES)
+            _popular.clear()
+            _popular.update(dict(kept))
+
+
+def popular_queries(limit=10):
+    """The most searched normalized queries, most popular first"""
+    redis = buffer_redis()
+    if redis is not None:
+        try:
+            return [query.decode() for query in redis.zrevrange(REDIS_POPULAR_KEY, 0, limit - 1)]
+        except Exception as e:
+            print(f"Error reading popular search queries from Redis: {e}")
+
+    with _popular_lock:
+        ranked = sorted(_popular.items(), key=lambda item: (-item[1], item[0]))
+    return [query for query, _ in ranked[:limit]]
+
+
+def refresh_popular_searches(limit=None):
+    """
+    Render the most popular blog searches under the current blog version
+
+    Returns:
+        Number of queries refreshed
+    """
+    from .warmup import get_default_host, warm_url
+
+    if limit is None:
+        limit = settings.SEARCH_REFRESH_QUERIES
+    url = reverse('blogpost-search')
+    host = get_default_host()
+
+    refreshed = 0
+    for query in popular_queries(limit):
+        try:
+            results = warm_url(f"{url}?{urlencode({'q': query})}", host, not settings.DEBUG)
+            if results[0]['status'] == 200:
+                refreshed += 1
+        except Exception as e:
+            print(f"Error refreshing search for {query!r}: {e}")
+    return refreshed
+
+
+def _refresh_in_thread():
+    try:
+        refresh_popular_searches()
+    finally:
+        connections.close_all()
+
+
+def schedule_search_refresh():
+    """
+    Refresh the popular searches in the background once the transaction commits
+
+    Like schedule_snapshot_rebuild, each call supersedes the previous one.
+    """
+    if settings.SEARCH_REFRESH_QUERIES <= 0:
+        return
+
+    generation = getattr(_local, 'generation', 0) + 1
+    _local.generation = generation
+
+    def refresh():
+        if _local.generation == generation:
+            threading.Thread(target=_refresh_in_thread, daemon=True).start()
+
+    transaction.on_commit(refresh)
@@ -3,12 +3,109 @@ from .models import (
     Project, BlogPost, ContactSubmission, Category, Tag, Subscriber,
     Profile, Education, SkillGroup, SkillItem, ProjectBullet,
     SocialLink, Experience, ExperienceBullet, Certification, 
-    Language, Interest, CustomSection, CustomSectionItem
+    Language, Interest, CustomSection, CustomSectionItem, AnalyticsHourly,
+    VisitorSketch
 )
 from django.contrib.auth.models import User
+from django.core.exceptions import FieldDoesNotExist
 import re
 
 
+class SparseFieldsetMixin:
+    """
+    Output fields selectable per request (?fields= and ?expand=)
+
+    The serializer context may hold 'fields', the names to keep, and
+    'expand', names of Meta.expandable_fields to add: those are left out
+    unless expanded or named in 'fields'. Unknown names are ignored.
+    SerializerMethodFields list the model fields they read in
+    Meta.method_sources, so restrict_queryset can load only what the
+    remaining fields need.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selected = set(self.context.get('fields') or ())
+        expanded = selected | set(self.context.get('expand') or ())
+        for name in getattr(self.Meta, 'expandable_fields', ()):
+            if name not in expanded:
+                fields.pop(name, None)
+        if selected & set(fields):
+            fields = {name: field for name, field in fields.items() if name in selected}
+        return fields
+
+    @classmethod
+    def known_fieldset(cls, fieldset):
+        """
+        Drop the names of a {'fields': [...], 'expand': [...]} fieldset that
+        are not output fields (or Meta.expandable_fields), before it keys a
+        cache entry
+        """
+        known = {
+            'fields': set(cls.Meta.fields),
+            'expand': set(getattr(cls.Meta, 'expandable_fields', ())),
+        }
+        return {
+            param: [name for name in names if name in known.get(param, ())]
+            for param, names in fieldset.items()
+        }
+
+    def restrict_queryset(self, queryset, also=()):
+        """
+        Narrow a queryset to the columns and relations the output fields read
+
+        Columns go through only(), to-one relations read through a dotted
+        source are joined with select_related, and to-many relations are
+        prefetched only when a field reads them. The queryset is returned
+        unchanged if a field reads something that is not a model field.
+
+        Args:
+            queryset: Queryset of Meta.model
+            also: Further model fields to load, e.g. the ordering fields
+        """
+        opts = queryset.model._meta
+        columns = {opts.pk.name, *also}
+        related = set()
+        prefetch = set()
+        method_sources = getattr(self.Meta, 'method_sources', {})
+
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*':
+                if name not in method_sources:
+                    return queryset
+                sources = method_sources[name]
+            else:
+                sources = [field.source]
+
+            for source in sources:
+                path = source.split('.')
+                try:
+                    model_field = opts.get_field(path[0])
+                except FieldDoesNotExist:
+                    return queryset
+                if model_field.many_to_many or model_field.one_to_many:
+                    prefetch.add(path[0])
+                    continue
+                columns.add(path[0])
+                if not model_field.is_relation:
+                    continue
+                if len(path) > 1:
+                    related.add(path[0])
+                    columns.add('__'.join(path[:2]))
+                elif isinstance(field, serializers.BaseSerializer):
+                    # Nested serializer of the whole related object
+                    related.add(path[0])
+
+        queryset = queryset.select_related(None).prefetch_related(None)
+        if related:
+            queryset = queryset.select_related(*sorted(related))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return queryset.only(*sorted(columns))
+
+
 class TagSerializer(serializers.ModelSerializer):
     """Serializer for Tag model"""
     
@@ -31,7 +128,7 @@ class CategorySerializer(serializers.ModelSerializer):
         return obj.blog_posts.filter(status='published').count()
 
 
-class ProjectListSerializer(serializers.ModelSerializer):
+class ProjectListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for project listings"""
     tags = TagSerializer(many=True, read_only=True)
     technology_list = serializers.SerializerMethodField()
@@ -43,6 +140,7 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'title',
             'slug',
             'short_description',
+            'description',
             'thumbnail',
             'technology_list',
             'tags',
@@ -53,13 +151,15 @@ class ProjectListSerializer(serializers.ModelSerializer):
             'created_at'
         ]
         read_only_fields = ['id', 'slug', 'views_count', 'created_at']
+        expandable_fields = ['description']
+        method_sources = {'technology_list': ['technologies_used']}
     
     def get_technology_list(self, obj):
         """Convert comma-separated string to list"""
         return [tech.strip() for tech in obj.technologies_used.split(',') if tech.strip()]
 
 
-class ProjectDetailSerializer(serializers.ModelSerializer):
+class ProjectDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Detailed serializer for single project view"""
     tags = TagSerializer(many=True, read_only=True)
     tag_ids = serializers.PrimaryKeyRelatedField(
@@ -70,6 +170,7 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         required=False
     )
     technology_list = serializers.SerializerMethodField()
+    unique_visitors = serializers.SerializerMethodField()
     
     class Meta:
         model = Project
@@ -93,15 +194,23 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
             'status',
             'is_featured',
             'views_count',
+            'unique_visitors',
             'created_at',
             'updated_at'
         ]
         read_only_fields = ['id', 'slug', 'thumbnail', 'views_count', 'created_at', 'updated_at']
+        method_sources = {'technology_list': ['technologies_used'], 'unique_visitors': []}
     
     def get_technology_list(self, obj):
         """Convert comma-separated string to list"""
         return [tech.strip() for tech in obj.technologies_used.split(',') if tech.strip()]
     
+    def get_unique_visitors(self, obj):
+        """Estimated all-time unique visitors, as annotated by the view if it was"""
+        if hasattr(obj, 'unique_visitors_estimate'):
+            return obj.unique_visitors_estimate or 0
+        return VisitorSketch.all_time_estimate(obj)
+    
     def validate_technologies_used(self, value):
         """Ensure technologies are properly formatted"""
         techs = [tech.strip() for tech in value.split(',') if tech.strip()]
@@ -110,7 +219,7 @@ class ProjectDetailSerializer(serializers.ModelSerializer):
         return ', '.join(techs)
 
 
-class BlogPostListSerializer(serializers.ModelSerializer):
+class BlogPostListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Lightweight serializer for blog post listings"""
     author_name = serializers.CharField(source='author.username', read_only=True)
     author_email = serializers.EmailField(source='author.email', read_only=True)
@@ -124,6 +233,7 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             'title',
             'slug',
             'excerpt',
+            'content',
             'featured_image',
             'author_name',
             'author_email',
@@ -135,9 +245,10 @@ class BlogPostListSerializer(serializers.ModelSerializer):
             'published_date'
         ]
         read_only_fields = ['id', 'slug', 'views_count', 'reading_time', 'published_date']
+        expandable_fields = ['content']
 
 
-class BlogPostDetailSerializer(serializers.ModelSerializer):
+class BlogPostDetailSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Detailed serializer for single blog post view"""
     author_name = serializers.CharField(source='author.username', read_only=True)
     author_email = serializers.EmailField(source='author.email', read_only=True)
@@ -157,6 +268,7 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
         source='tags',
         required=False
     )
+    unique_visitors = serializers.SerializerMethodField()
     
     class Meta:
         model = BlogPost
@@ -179,6 +291,7 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
             'status',
             'is_featured',
             'views_count',
+            'unique_visitors',
             'reading_time',
             'published_date',
             'updated_at'
@@ -187,6 +300,13 @@ class BlogPostDetailSerializer(serializers.ModelSerializer):
             'id', 'slug', 'author', 'views_count', 
             'reading_time', 'published_date', 'updated_at'
         ]
+        method_sources = {'unique_visitors': []}
+    
+    def get_unique_visitors(self, obj):
+        """Estimated all-time unique visitors, as annotated by the view if it was"""
+        if hasattr(obj, 'unique_visitors_estimate'):
+            return obj.unique_visitors_estimate or 0
+        return VisitorSketch.all_time_estimate(obj)
     
     def validate_content(self, value):
         """Ensure content is substantial"""
@@ -268,6 +388,24 @@ class ContactSubmissionSerializer(serializers.ModelSerializer):
         return value
 
 
+class ContactSubmissionListSerializer(serializers.ModelSerializer):
+    """Read-only serializer for the staff list of contact submissions"""
+    
+    class Meta:
+        model = ContactSubmission
+        fields = [
+            'id',
+            'name',
+            'email',
+            'subject',
+            'message',
+            'phone',
+            'status',
+            'submitted_at'
+        ]
+        read_only_fields = fields
+
+
 class SubscriberSerializer(serializers.ModelSerializer):
     """Serializer for newsletter subscribers"""
     
@@ -366,6 +504,10 @@ class EducationSerializer(serializers.ModelSerializer):
             'start_date', 'end_date', 'is_current', 'description',
             'gpa', 'institution_logo', 'order'
         ]
+        method_sources = {
+            'start_date': ['date'], 'end_date': ['date'], 'is_current': ['date'],
+            'description': [], 'gpa': [], 'institution_logo': [],
+        }
     
     def get_start_date(self, obj):
         """Parse date string to extract start year as ISO date format"""
@@ -442,6 +584,9 @@ class ExperienceSerializer(serializers.ModelSerializer):
             'start_date', 'end_date', 'is_current',
             'description', 'bullets', 'company_logo', 'order'
         ]
+        method_sources = {
+            'company_logo': [], 'start_date': ['start_date'], 'end_date': ['is_current', 'end_date'],
+        }
     
     def get_company_logo(self, obj):
         return None  # Can be extended later with actual logo field
@@ -479,6 +624,7 @@ class CertificationSerializer(serializers.ModelSerializer):
             'expiry_date', 'credential_id', 'credential_url',
             'description', 'order'
         ]
+        method_sources = {'issue_date': ['issue_date'], 'expiry_date': ['expiry_date']}
     
     def get_issue_date(self, obj):
         """Convert issue_date to ISO format"""
@@ -586,7 +732,7 @@ class ProfileSerializer(serializers.ModelSerializer):
         return SocialLinkSerializer(links, many=True).data
 
 
-class PortfolioProjectSerializer(serializers.ModelSerializer):
+class PortfolioProjectSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for projects in the portfolio context"""
     bullets = ProjectBulletSerializer(many=True, read_only=True)
     tags = TagSerializer(many=True, read_only=True)
@@ -603,6 +749,11 @@ class PortfolioProjectSerializer(serializers.ModelSerializer):
             'tags', 'live_url', 'github_url',
             'is_featured', 'is_published', 'bullets', 'order', 'created_at'
         ]
+        method_sources = {
+            'technologies': ['technologies_used'],
+            'featured_image': ['image'],
+            'is_published': ['status'],
+        }
     
     def get_technologies(self, obj):
         return [tech.strip() for tech in obj.technologies_used.split(',') if tech.strip()]
@@ -632,4 +783,27 @@ class PortfolioSerializer(serializers.Serializer):
     languages = LanguageSerializer(many=True, read_only=True)
     interests = InterestSerializer(many=True, read_only=True)
     projects = PortfolioProjectSerializer(many=True, read_only=True)
-    custom_sections = CustomSectionSerializer(many=True, read_only=True)
\ No newline at end of file
+    custom_sections = CustomSectionSerializer(many=True, read_only=True)
+
+
+class AnalyticsEventSerializer(serializers.Serializer):
+    """Serializer for a page or section view event sent by the frontend"""
+    kind = serializers.ChoiceField(choices=AnalyticsHourly.KIND_CHOICES)
+    name = serializers.CharField(max_length=2000)
+
+    def validate(self, attrs):
+        name = attrs['name']
+        if attrs['kind'] == 'page':
+            # Pages are counted by path, without query string or fragment
+            name = name.split('?')[0].split('#')[0]
+        attrs['name'] = name.strip()[:200]
+        return attrs
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    """Serializer for the analytics rollup query parameters"""
+    granularity = serializers.ChoiceField(choices=['hour', 'day'], default='day')
+    kind = serializers.ChoiceField(choices=AnalyticsHourly.KIND_CHOICES, required=False)
+    name = serializers.CharField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
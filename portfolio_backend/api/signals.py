@@ -0,0 +1,199 @@
+"""
+Signal handlers keeping cached API responses fresh
+
+Every model that feeds a cached endpoint maps to one or more content
+domains. Saving or deleting an instance (or changing its tags) bumps the
+version of those domains, which invalidates every cache key built from them.
+Entries cached for a single object are tagged '<model_name>:<pk>' (e.g.
+'project:42') and deleted as well.
+
+Searchable content is also reindexed by the active search backend
+(api/search_backends.py) when it, its tags or bullets, or the names of its
+tags change. Project and blog post titles (with tag names and technologies)
+are refreshed in the typeahead index (api/suggest.py), and their words in
+the did-you-mean vocabulary (api/spelling.py). Blog changes also
+re-render the most popular blog searches (api/search_cache.py).
+"""
+from functools import partial
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+
+from .models import (
+    Project, BlogPost, Category, Tag, ContactSubmission,
+    Profile, Education, SkillGroup, SkillItem, ProjectBullet,
+    SocialLink, Experience, ExperienceBullet, Certification,
+    Language, Interest, CustomSection, CustomSectionItem
+)
+from .search_backends import SEARCH_FIELDS, get_search_backend, related_fields
+from .search_cache import schedule_search_refresh
+from .snapshots import schedule_snapshot_rebuild
+from .spelling import refresh_spelling
+from .suggest import refresh_suggestions
+from .utils import bump_cache_version, invalidate_cache_tags
+
+
+# Content domains fed by each model. 'portfolio' covers the aggregated
+# /api/portfolio/ payload, 'search' the cross-content /api/search/ results.
+CACHE_DOMAINS = {
+    Project: ('projects', 'portfolio', 'search'),
+    ProjectBullet: ('projects', 'portfolio'),
+    BlogPost: ('blog', 'categories', 'search'),
+    Category: ('blog', 'categories'),
+    ContactSubmission: ('contact',),
+    Tag: ('projects', 'blog', 'tags', 'portfolio', 'search'),
+    User: ('blog',),
+    Profile: ('profile', 'portfolio'),
+    SocialLink: ('profile', 'social_links', 'portfolio'),
+    SkillGroup: ('skills', 'portfolio'),
+    SkillItem: ('skills', 'portfolio'),
+    Education: ('education', 'portfolio'),
+    Experience: ('experience', 'portfolio', 'search'),
+    ExperienceBullet: ('experience', 'portfolio', 'search'),
+    Certification: ('certifications', 'portfolio', 'search'),
+    Language: ('languages', 'portfolio'),
+    Interest: ('interests', 'portfolio'),
+    CustomSection: ('custom_sections', 'portfolio', 'search'),
+    CustomSectionItem: ('custom_sections', 'portfolio', 'search'),
+}
+
+# Fields whose updates never change a cached response
+UNCACHED_FIELDS = {'views_count', 'last_login'}
+
+
+def invalidate_domains(*domains):
+    """
+    Bump the given domains now and again once the current transaction commits
+
+    The second bump stops a request that read the old rows mid-transaction
+    from caching them under the new version.
+    """
+    bump_cache_version(*domains)
+    transaction.on_commit(partial(bump_cache_version, *domains))
+
+    if 'portfolio' in domains:
+        schedule_snapshot_rebuild()
+    if 'blog' in domains:
+        schedule_search_refresh()
+
+
+def invalidate_objects(*tags):
+    """Delete the entries tagged with the given objects, now and on commit"""
+    invalidate_cache_tags(*tags)
+    transaction.on_commit(partial(invalidate_cache_tags, *tags))
+
+
+def content_changed(sender, instance=None, update_fields=None, **kwargs):
+    """Invalidate the cache domains of a saved or deleted model instance"""
+    if update_fields and set(update_fields) <= UNCACHED_FIELDS:
+        return
+    invalidate_domains(*CACHE_DOMAINS[sender])
+    invalidate_objects(f"{sender._meta.model_name}:{instance.pk}")
+
+
+for model in CACHE_DOMAINS:
+    post_save.connect(content_changed, sender=model, dispatch_uid=f'cache_save_{model.__name__}')
+    post_delete.connect(content_changed, sender=model, dispatch_uid=f'cache_delete_{model.__name__}')
+
+
+@receiver(m2m_changed, sender=Project.tags.through)
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def tags_changed(sender, instance, action, **kwargs):
+    """Invalidate caches when tags are added to or removed from content"""
+    if action.startswith('post_'):
+        invalidate_domains(*CACHE_DOMAINS[Tag])
+        invalidate_objects(f"{instance._meta.model_name}:{instance.pk}")
+
+
+def search_content_saved(sender, instance, update_fields=None, **kwargs):
+    """Reindex a saved searchable instance"""
+    if update_fields and set(update_fields) <= UNCACHED_FIELDS:
+        return
+    get_search_backend().update(instance)
+
+
+def search_content_deleted(sender, instance, **kwargs):
+    get_search_backend().remove(instance)
+
+
+def search_tags_changed(sender, instance, action, reverse, model, pk_set=None, **kwargs):
+    """Reindex projects and blog posts whose tags changed"""
+    if reverse and action == 'pre_clear':
+        instance._indexed_pks = list(
+            model.objects.filter(tags=instance).values_list('pk', flat=True)
+        )
+    if not action.startswith('post_'):
+        return
+    backend = get_search_backend()
+    if not reverse:
+        backend.update(instance)
+        return
+
+    # Content added to or removed from a tag (all of it when cleared)
+    pks = pk_set if pk_set is not None else getattr(instance, '_indexed_pks', [])
+    for content in model.objects.filter(pk__in=pks).prefetch_related('tags'):
+        backend.update(content)
+
+
+for model in SEARCH_FIELDS:
+    post_save.connect(search_content_saved, sender=model, dispatch_uid=f'search_save_{model.__name__}')
+    post_delete.connect(search_content_deleted, sender=model, dispatch_uid=f'search_delete_{model.__name__}')
+    if 'tags' in related_fields(model):
+        m2m_changed.connect(
+            search_tags_changed, sender=model.tags.through, dispatch_uid=f'search_tags_{model.__name__}'
+        )
+
+
+@receiver(post_save, sender=ExperienceBullet)
+@receiver(post_delete, sender=ExperienceBullet)
+def search_bullets_changed(sender, instance, **kwargs):
+    """Reindex the experience of a saved or deleted bullet"""
+    experience = Experience.objects.filter(pk=instance.experience_id).prefetch_related('bullets').first()
+    if experience is not None:
+        get_search_backend().update(experience)
+
+
+def _tagged_content(tag):
+    return [*tag.projects.prefetch_related('tags'), *tag.blog_posts.prefetch_related('tags')]
+
+
+@receiver(post_save, sender=Tag)
+def tag_saved(sender, instance, created, **kwargs):
+    """Reindex the content of a renamed tag"""
+    if not created:
+        backend = get_search_backend()
+        for content in _tagged_content(instance):
+            backend.update(content)
+
+
+@receiver(pre_delete, sender=Tag)
+def tag_deleting(sender, instance, **kwargs):
+    instance._indexed_content = [(type(content), content.pk) for content in _tagged_content(instance)]
+
+
+@receiver(post_delete, sender=Tag)
+def tag_deleted(sender, instance, **kwargs):
+    """Reindex the content of a deleted tag"""
+    backend = get_search_backend()
+    for model, pk in getattr(instance, '_indexed_content', []):
+        for content in model.objects.filter(pk=pk).prefetch_related('tags'):
+            backend.update(content)
+
+
+def vocabulary_changed(sender, instance, update_fields=None, **kwargs):
+    """
+    Refresh the typeahead and spelling entries of a saved or deleted
+    object, now and on commit
+    """
+    if update_fields and set(update_fields) <= UNCACHED_FIELDS:
+        return
+    for refresh in (refresh_suggestions, refresh_spelling):
+        refresh(sender, instance.pk)
+        transaction.on_commit(partial(refresh, sender, instance.pk))
+
+
+for model in (Project, BlogPost, Tag):
+    post_save.connect(vocabulary_changed, sender=model, dispatch_uid=f'vocabulary_save_{model.__name__}')
+    post_delete.connect(vocabulary_changed, sender=model, dispatch_uid=f'vocabulary_delete_{model.__name__}')
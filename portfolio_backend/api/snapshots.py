@@ -0,0 +1,203 @@
+"""
+Materialized snapshot of the /api/portfolio/ payload
+
+The full portfolio is serialized once after each content change and stored
+in the cache as final UTF-8 JSON bytes, their gzip variant and a content
+hash, so the read path does no ORM, serializer or compression work at all.
+"""
+import threading
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.encoding import iri_to_uri
+from rest_framework.renderers import JSONRenderer
+
+from .models import (
+    Project, Profile, Education, SkillGroup, Experience,
+    Certification, Language, Interest, CustomSection
+)
+from .serializers import (
+    ProfileSerializer,
+    SkillGroupSerializer,
+    EducationSerializer,
+    ExperienceSerializer,
+    CertificationSerializer,
+    LanguageSerializer,
+    InterestSerializer,
+    CustomSectionSerializer,
+    PortfolioProjectSerializer
+)
+from .fast_serializers import compiled_data
+from .responses import encode_body
+from .utils import create_cache_key, get_or_build, set_built
+
+
+# Base URLs (scheme + host) the portfolio has been served from. Media URLs in
+# the payload are absolute, so each base URL gets its own snapshot.
+SNAPSHOT_BASES_KEY = 'portfolio:snapshot_bases'
+MAX_SNAPSHOT_BASES = 5
+
+_local = threading.local()
+
+
+class SnapshotRequest:
+    """Stand-in request that resolves absolute URIs against a fixed base URL"""
+
+    def __init__(self, base_url):
+        self.base_url = base_url
+
+    def build_absolute_uri(self, location):
+        return iri_to_uri(urljoin(self.base_url, location))
+
+
+def build_portfolio_data(request, fieldset=None):
+    """
+    Gather all portfolio data with optimized queries
+
+    Args:
+        request: Request (or SnapshotRequest) resolving absolute media URLs
+        fieldset: Optional {'fields': [...], 'expand': [...]} selecting the
+            project fields (see SparseFieldsetMixin)
+    """
+    profile = Profile.objects.first()
+    project_context = {'request': request, **(fieldset or {})}
+
+    # Lists go through the compiled read path (api/fast_serializers.py)
+    return {
+        'profile': ProfileSerializer(
+            profile,
+            context={'request': request}
+        ).data if profile else None,
+
+        'skills': compiled_data(SkillGroupSerializer, SkillGroup.objects.all()),
+
+        'education': compiled_data(EducationSerializer, Education.objects.all()),
+
+        'experiences': compiled_data(
+            ExperienceSerializer,
+            Experience.objects.filter(is_active=True)
+        ),
+
+        'certifications': compiled_data(
+            CertificationSerializer,
+            Certification.objects.filter(is_active=True)
+        ),
+
+        'languages': compiled_data(LanguageSerializer, Language.objects.filter(is_active=True)),
+
+        'interests': compiled_data(InterestSerializer, Interest.objects.filter(is_active=True)),
+
+        'projects': compiled_data(
+            PortfolioProjectSerializer,
+            Project.objects.filter(status='published')
+                .order_by('-is_featured', 'order', '-created_at'),
+            project_context
+        ),
+
+        'custom_sections': compiled_data(
+            CustomSectionSerializer,
+            CustomSection.objects.filter(is_active=True)
+        ),
+    }
+
+
+def build_portfolio_snapshot(base_url):
+    """
+    Serialize the portfolio for a base URL into its final encoded form
+
+    Returns:
+        Dict with the JSON 'body' bytes, its 'gzip' variant, its 'etag'
+        content hash and 'built_at'
+    """
+    data = build_portfolio_data(SnapshotRequest(base_url))
+    body = JSONRenderer().render(data)
+
+    return {
+        **encode_body(body),
+        'built_at': timezone.now(),
+    }
+
+
+def _snapshot_key(base_url):
+    return create_cache_key('portfolio', 'snapshot', base=base_url)
+
+
+def _remember_base(base_url):
+    bases = cache.get(SNAPSHOT_BASES_KEY, [])
+    if base_url not in bases:
+        bases = [base_url] + bases[:MAX_SNAPSHOT_BASES - 1]
+        cache.set(SNAPSHOT_BASES_KEY, bases, None)
+
+
+def get_portfolio_snapshot(request):
+    """
+    Get the current portfolio snapshot for the request's base URL
+
+    Snapshots are normally rebuilt on write; this only builds one itself
+    after a cache flush or for a base URL it has not seen before.
+    """
+    base_url = request.build_absolute_uri('/')
+
+    def build():
+        _remember_base(base_url)
+        return build_portfolio_snapshot(base_url)
+
+    return get_or_build(_snapshot_key(base_url), build, settings.API_CACHE_TIMEOUT)
+
+
+def get_portfolio_fieldset_payload(request, fieldset):
+    """
+    Encoded portfolio with a sparse project fieldset
+
+    Not a snapshot: built on demand and cached per base URL and fieldset
+    until the next content change. Unknown field names are dropped first;
+    if none remain, this is the snapshot.
+    """
+    fieldset = PortfolioProjectSerializer.known_fieldset(fieldset)
+    if not any(fieldset.values()):
+        return get_portfolio_snapshot(request)
+
+    base_url = request.build_absolute_uri('/')
+    key = create_cache_key(
+        'portfolio', 'fieldset', base=base_url,
+        **{name: ','.join(names) for name, names in fieldset.items() if names}
+    )
+
+    def build():
+        data = build_portfolio_data(SnapshotRequest(base_url), fieldset)
+        return encode_body(JSONRenderer().render(data))
+
+    return get_or_build(key, build, settings.API_CACHE_TIMEOUT)
+
+
+def rebuild_portfolio_snapshots():
+    """Rebuild the snapshot of every known base URL under the current version"""
+    for base_url in cache.get(SNAPSHOT_BASES_KEY, []):
+        try:
+            set_built(
+                _snapshot_key(base_url),
+                build_portfolio_snapshot(base_url),
+                settings.API_CACHE_TIMEOUT
+            )
+        except Exception as e:
+            print(f"Error rebuilding portfolio snapshot for {base_url}: {e}")
+
+
+def schedule_snapshot_rebuild():
+    """
+    Rebuild the snapshots once the current transaction commits
+
+    Each call supersedes the previous one, so a transaction saving many
+    objects (e.g. an admin form with inlines) rebuilds only once.
+    """
+    generation = getattr(_local, 'generation', 0) + 1
+    _local.generation = generation
+
+    def rebuild():
+        if _local.generation == generation:
+            rebuild_portfolio_snapshots()
+
+    transaction.on_commit(rebuild)
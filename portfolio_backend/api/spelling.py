@@ -0,0 +1,250 @@
+"""
+Did-you-mean spelling correction from the search vocabulary
+
+The vocabulary is every search token (api/search.py's `tokenize`) of the
+text of published blog posts and projects and of tag names, with its
+number of occurrences. Misspelled words are looked up by symmetric delete:
+each vocabulary term is indexed under every string obtained by deleting up
+to MAX_DISTANCE characters from its first PREFIX_LENGTH characters, so a
+query word only needs its own few deletes looked up to find every term
+within MAX_DISTANCE edits, instead of comparing it with the whole
+vocabulary. Candidates are then checked with a bounded edit distance and
+the closest, most frequent one wins.
+
+The prefix bounds the deletes per term (at most 29), MAX_INDEXED_TERMS
+bounds the index and MAX_CANDIDATES the distance checks per word, so both
+memory and lookup time stay bounded however large the corpus grows.
+
+Each worker holds its own index, kept up to date like the typeahead index
+(api/suggest.py) by utils.VersionedIndex: content signals recount the
+changed object in a copy that replaces the index, and bump the 'spelling'
+cache version; a worker that sees a version it did not produce rebuilds on
+the next lookup.
+"""
+from collections import Counter
+from itertools import combinations
+
+from .models import BlogPost, Project, Tag
+from .search import tokenize
+from .search_backends import RELATED_TEXT, SEARCH_FIELDS
+from .utils import VersionedIndex
+
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+# Words outside these lengths are neither indexed nor corrected
+MIN_WORD_LENGTH = 3
+MAX_WORD_LENGTH = 30
+MAX_INDEXED_TERMS = 50000
+# Vocabulary terms whose distance is computed per query word
+MAX_CANDIDATES = 200
+
+
+def deletes(word, max_distance=MAX_DISTANCE):
+    """Strings left by deleting up to max_distance characters of a word's prefix"""
+    prefix = word[:PREFIX_LENGTH]
+    keys = {prefix}
+    for count in range(1, min(max_distance, len(prefix) - 1) + 1):
+        for positions in combinations(range(len(prefix)), count):
+            keys.add(''.join(char for i, char in enumerate(prefix) if i not in positions))
+    return keys
+
+
+def edit_distance(a, b, max_distance=MAX_DISTANCE):
+    """
+    Optimal string alignment distance (insertions, deletions, substitutions
+    and adjacent transpositions) of two words, or None beyond max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+def _indexable(term):
+    return MIN_WORD_LENGTH <= len(term) <= MAX_WORD_LENGTH and not term.isdigit()
+
+
+class SpellingIndex:
+    """Term frequencies with a symmetric delete index of the terms"""
+
+    def __init__(self, version=None):
+        self.version = version
+        self.frequencies = Counter()
+        self._sources = {}  # source -> Counter of its terms
+        self._deletes = {}  # delete -> set of terms
+        # Copies share the delete sets with their original, so they replace
+        # them instead of changing them
+        self._shared = False
+        self._indexed = set()
+
+    def __len__(self):
+        return len(self._indexed)
+
+    def __copy__(self):
+        # Per-source Counters are replaced, never changed
+        index = SpellingIndex(self.version)
+        index.frequencies = Counter(self.frequencies)
+        index._sources = dict(self._sources)
+        index._deletes = dict(self._deletes)
+        index._indexed = set(self._indexed)
+        index._shared = True
+        return index
+
+    def _index(self, term):
+        if term in self._indexed or len(self._indexed) >= MAX_INDEXED_TERMS:
+            return
+        self._indexed.add(term)
+        for key in deletes(term):
+            terms = self._deletes.get(key)
+            if terms is None:
+                self._deletes[key] = {term}
+            elif self._shared:
+                self._deletes[key] = terms | {term}
+            else:
+                terms.add(term)
+
+    def _unindex(self, term):
+        if term not in self._indexed:
+            return
+        self._indexed.discard(term)
+        for key in deletes(term):
+            terms = self._deletes.get(key)
+            if terms is None:
+                continue
+            if self._shared:
+                terms = self._deletes[key] = terms - {term}
+            else:
+                terms.discard(term)
+            if not terms:
+                del self._deletes[key]
+
+    def set_text(self, source, text):
+        """Replace the counted terms of a source, e.g. ('post', 42)"""
+        self.remove(source)
+        terms = Counter(term for term in tokenize(text) if _indexable(term))
+        if not terms:
+            return
+        self._sources[source] = terms
+        for term, count in terms.items():
+            self.frequencies[term] += count
+            self._index(term)
+
+    def remove(self, source):
+        terms = self._sources.pop(source, None)
+        if terms is None:
+            return
+        self.frequencies.subtract(terms)
+        for term in terms:
+            if self.frequencies[term] <= 0:
+                del self.frequencies[term]
+                self._unindex(term)
+
+    def sources(self, kind):
+        return [source for source in self._sources if source[0] == kind]
+
+    def correct_word(self, word):
+        """The closest most frequent vocabulary term to a word, or None"""
+        if word in self.frequencies or not _indexable(word):
+            return None
+
+        candidates = set()
+        for key in deletes(word):
+            candidates |= self._deletes.get(key, set())
+            if len(candidates) >= MAX_CANDIDATES:
+                break
+
+        best = None
+        for term in sorted(candidates)[:MAX_CANDIDATES]:
+            distance = edit_distance(word, term)
+            if distance is not None:
+                rank = (distance, -self.frequencies[term], term)
+                if best is None or rank < best:
+                    best = rank
+        return best and best[2]
+
+    def correct(self, query):
+        """
+        Query with every unknown word replaced by its correction
+
+        Returns:
+            The corrected search tokens separated by spaces, or None if no
+            word was corrected
+        """
+        corrected = []
+        changed = False
+        for word in tokenize(query):
+            correction = self.correct_word(word)
+            if correction is not None:
+                changed = True
+            corrected.append(correction or word)
+        return ' '.join(corrected) if changed else None
+
+
+def _text_fields(model):
+    return [field for field, _ in SEARCH_FIELDS[model] if field not in RELATED_TEXT]
+
+
+def _text(instance):
+    return ' '.join(getattr(instance, field) or '' for field in _text_fields(type(instance)))
+
+
+SOURCE_KINDS = {Project: 'project', BlogPost: 'post'}
+
+
+def build_spelling_index(version=None):
+    """Build the index from the database"""
+    index = SpellingIndex(version)
+    for model, kind in SOURCE_KINDS.items():
+        published = model.objects.filter(status='published').only('pk', *_text_fields(model))
+        for instance in published.iterator(chunk_size=200):
+            index.set_text((kind, instance.pk), _text(instance))
+    for tag in Tag.objects.only('pk', 'name'):
+        index.set_text(('tag', tag.pk), tag.name)
+    return index
+
+
+_index = VersionedIndex('spelling', build_spelling_index)
+
+
+def get_spelling_index():
+    """This worker's index, rebuilt if another worker changed content"""
+    return _index.get()
+
+
+def correct_query(query):
+    """Did-you-mean correction of a search query, or None"""
+    return get_spelling_index().correct(query)
+
+
+def refresh_spelling(model, pk):
+    """Recount the terms of a saved or deleted object from the database"""
+    def update(index):
+        if model is Tag:
+            source = ('tag', pk)
+            tag = Tag.objects.filter(pk=pk).only('pk', 'name').first()
+            text = tag and tag.name
+        else:
+            source = (SOURCE_KINDS[model], pk)
+            instance = (
+                model.objects.filter(pk=pk, status='published')
+                .only('pk', *_text_fields(model)).first()
+            )
+            text = instance and _text(instance)
+        if text:
+            index.set_text(source, text)
+        else:
+            index.remove(source)
+
+    _index.refresh(update)
@@ -0,0 +1,181 @@
+"""
+Typeahead suggestions from an in-memory prefix index
+
+Published project and blog post titles, tag names and the technologies of
+published projects are kept in a sorted list of (key, source) pairs, with
+one key per word start of each text ('django rest api', 'rest api',
+'api'), so a prefix lookup is a bisection plus a short bounded scan.
+
+Each worker holds its own index. Content signals refresh the changed entry
+in a copy that replaces the index and bump the 'suggest' cache version; a worker that sees a version
+it did not produce itself rebuilds its index on the next lookup.
+"""
+import unicodedata
+from bisect import bisect_left, insort
+
+from .models import BlogPost, Project, Tag
+from .utils import VersionedIndex
+
+
+MAX_RESULTS = 20
+# Entries examined per lookup before ranking
+MAX_SCAN = 200
+MAX_KEY_LENGTH = 64
+
+
+def normalize(text):
+    """Lowercase, accent-folded words of a text separated by single spaces"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(
+        char if char.isalnum() else ' '
+        for char in text if not unicodedata.combining(char)
+    )
+    return ' '.join(text.split())
+
+
+def prefix_keys(text):
+    """Keys matching a text by the start of any of its words"""
+    words = normalize(text).split(' ')
+    return sorted({' '.join(words[i:])[:MAX_KEY_LENGTH] for i in range(len(words)) if words[i]})
+
+
+class PrefixIndex:
+    """Suggestions searchable by the prefix of any word of their text"""
+
+    def __init__(self, version=None):
+        self.version = version
+        self._keys = []  # sorted (key, source)
+        self._sources = {}  # source -> (suggestion, keys, normalized text)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __copy__(self):
+        # Entries are tuples, replaced rather than changed
+        index = PrefixIndex(self.version)
+        index._keys = list(self._keys)
+        index._sources = dict(self._sources)
+        return index
+
+    def add(self, source, suggestion):
+        """Add or replace the suggestion of a source, e.g. ('project', 42)"""
+        self.remove(source)
+        keys = prefix_keys(suggestion['text'])
+        for key in keys:
+            insort(self._keys, (key, source))
+        self._sources[source] = (suggestion, keys, normalize(suggestion['text']))
+
+    def remove(self, source):
+        entry = self._sources.pop(source, None)
+        if entry is None:
+            return
+        for key in entry[1]:
+            position = bisect_left(self._keys, (key, source))
+            if position < len(self._keys) and self._keys[position] == (key, source):
+                del self._keys[position]
+
+    def sources(self, kind):
+        return [source for source in self._sources if source[0] == kind]
+
+    def search(self, prefix, limit=MAX_RESULTS):
+        """
+        Suggestions with a word starting with `prefix`
+
+        Texts starting with it come first, then shorter texts.
+        """
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        matches = {}
+        position = bisect_left(self._keys, (prefix,))
+        end = min(len(self._keys), position + MAX_SCAN)
+        while position < end:
+            key, source = self._keys[position]
+            if not key.startswith(prefix):
+                break
+            if source not in matches:
+                text = self._sources[source][2]
+                matches[source] = (not text.startswith(prefix), len(text), text)
+            position += 1
+
+        ranked = sorted(matches, key=lambda source: (matches[source], source))
+        return [self._sources[source][0] for source in ranked[:limit]]
+
+
+def _project_suggestion(project):
+    return {'type': 'project', 'text': project.title, 'slug': project.slug}
+
+
+def _post_suggestion(post):
+    return {'type': 'post', 'text': post.title, 'slug': post.slug}
+
+
+def _tag_suggestion(tag):
+    return {'type': 'tag', 'text': tag.name, 'slug': tag.slug}
+
+
+def _add_technologies(index):
+    """Replace the technology entries with those of the published projects"""
+    for source in index.sources('technology'):
+        index.remove(source)
+    technologies = {}
+    for value in Project.objects.filter(status='published').values_list('technologies_used', flat=True):
+        for tech in value.split(','):
+            tech = tech.strip()
+            if tech:
+                technologies.setdefault(tech.lower(), tech)
+    for key, tech in technologies.items():
+        index.add(('technology', key), {'type': 'technology', 'text': tech, 'slug': None})
+
+
+def build_suggest_index(version=None):
+    """Build the index from the database"""
+    index = PrefixIndex(version)
+    for project in Project.objects.filter(status='published').only('pk', 'title', 'slug'):
+        index.add(('project', project.pk), _project_suggestion(project))
+    for post in BlogPost.objects.filter(status='published').only('pk', 'title', 'slug'):
+        index.add(('post', post.pk), _post_suggestion(post))
+    for tag in Tag.objects.only('pk', 'name', 'slug'):
+        index.add(('tag', tag.pk), _tag_suggestion(tag))
+    _add_technologies(index)
+    return index
+
+
+_index = VersionedIndex('suggest', build_suggest_index)
+
+
+def get_suggest_index():
+    """This worker's index, rebuilt if another worker changed content"""
+    return _index.get()
+
+
+def suggest(prefix, limit=MAX_RESULTS):
+    """Up to `limit` suggestions (at most MAX_RESULTS) for a typed prefix"""
+    return get_suggest_index().search(prefix, max(1, min(limit, MAX_RESULTS)))
+
+
+def refresh_suggestions(model, pk):
+    """Update the entry of a saved or deleted object from the database"""
+    def update(index):
+        if model is Project:
+            project = Project.objects.filter(pk=pk, status='published').only('pk', 'title', 'slug').first()
+            if project is None:
+                index.remove(('project', pk))
+            else:
+                index.add(('project', pk), _project_suggestion(project))
+            _add_technologies(index)
+        elif model is BlogPost:
+            post = BlogPost.objects.filter(pk=pk, status='published').only('pk', 'title', 'slug').first()
+            if post is None:
+                index.remove(('post', pk))
+            else:
+                index.add(('post', pk), _post_suggestion(post))
+        elif model is Tag:
+            tag = Tag.objects.filter(pk=pk).only('pk', 'name', 'slug').first()
+            if tag is None:
+                index.remove(('tag', pk))
+            else:
+                index.add(('tag', pk), _tag_suggestion(tag))
+
+    _index.refresh(update)
@@ -1,12 +1,63 @@
 """
 Tests for Portfolio Backend API
 """
+import gzip
+import json
+import sys
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
 import pytest
-from django.test import TestCase, Client
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib import admin
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
-from api.models import Project, BlogPost, ContactSubmission, Category, Tag
+from rest_framework.renderers import JSONRenderer
+from django_redis.exceptions import CompressorError
+from api.models import (
+    Project, BlogPost, ContactSubmission, Category, Tag, Profile,
+    AnalyticsHourly, AnalyticsDaily, VisitorSketch, SearchPosting,
+    Experience, ExperienceBullet, Certification, CustomSection, CustomSectionItem,
+    Education, Interest, Language, ProjectBullet, SkillGroup, SkillItem
+)
+from api.serializers import (
+    BlogPostDetailSerializer, BlogPostListSerializer, CertificationSerializer,
+    CustomSectionSerializer, EducationSerializer, ExperienceSerializer, InterestSerializer,
+    LanguageSerializer, PortfolioProjectSerializer, ProfileSerializer, ProjectDetailSerializer,
+    ProjectListSerializer, SkillGroupSerializer
+)
+from api.snapshots import build_portfolio_data
+from api.cache_backends import TwoTierCache, LocalLRUCache
+from api.cache_serializers import JSONSerializer, ZlibCompressor
+from api.analytics import MAX_EVENTS_PER_BATCH, buffer_events, flush_analytics
+from api.counters import flush_view_counts, record_view
+from api.hyperloglog import HyperLogLog
+from api.search import MAX_RESULTS, rank_blog_posts, tokenize
+from api import search_cache
+from api.search_backends import get_search_backend, search
+from api.search_cache import normalize_query, popular_queries, refresh_popular_searches
+from api.spelling import correct_query, deletes, edit_distance, get_spelling_index
+from api.suggest import get_suggest_index, suggest
+from api.unified_search import highlight
+from api.fast_serializers import NotCompilable, compile_serializer
+from api.mixins import MAX_BATCH_SIZE, list_cache_stats
+from api.pagination import EstimatedCountPaginator
+from api.responses import accepts_gzip
+from api.views import ProjectViewSet
+from api.visitors import flush_visitor_sketches, record_visitor, unique_visitors
+from api.warmup import get_warmup_urls, warm_url
+from api.utils import (
+    create_cache_key, get_cache_version, bump_cache_version, get_or_build, set_built,
+    set_tagged
+)
 
 
 class ProjectAPITestCase(APITestCase):
@@ -132,6 +183,691 @@ class BlogPostAPITestCase(APITestCase):
         self.assertEqual(response.data['count'], 2)
 
 
+class SearchCorpusTestCase(APITestCase):
+    """Base of the search test cases: an author and blog posts by slug"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        self.posts = {}
+        for slug, title, content, status_ in [
+            ('caching', 'Caching in Django', 'Redis keeps responses warm. ' * 40, 'published'),
+            ('queries', 'Database queries', 'The ORM builds SQL. ' * 40 + 'Also in Django.', 'published'),
+            ('gardening', 'Gardening notes', 'Tomatoes need sun and water. ' * 40, 'published'),
+            ('draft', 'Django draft', 'Unpublished thoughts. ' * 40, 'draft'),
+        ]:
+            self.posts[slug] = BlogPost.objects.create(
+                title=title, slug=slug, excerpt=title, content=content,
+                author=self.user, status=status_
+            )
+
+
+@override_settings(SEARCH_BACKEND='index')
+class BlogSearchIndexTestCase(SearchCorpusTestCase):
+    """Test cases for the BM25 blog search index"""
+    
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        self.django_tag = Tag.objects.create(name="Django", slug="django")
+    
+    def test_tokenize(self):
+        """Test that tokens are lowercased, accent-folded and without stopwords"""
+        self.assertEqual(tokenize("The Café's API, and Été 2024!"), ['cafe', 'api', 'ete', '2024'])
+    
+    def test_index_follows_saves_and_deletes(self):
+        """Test that posts are reindexed on save and removed on delete"""
+        post = self.posts['gardening']
+        self.assertEqual(rank_blog_posts('tomatoes')[0][0], post.pk)
+        
+        post.content = 'Peppers need sun and water. ' * 40
+        post.save()
+        self.assertEqual(rank_blog_posts('tomatoes'), [])
+        self.assertEqual(rank_blog_posts('peppers')[0][0], post.pk)
+        
+        post.delete()
+        self.assertEqual(rank_blog_posts('peppers'), [])
+        self.assertFalse(SearchPosting.objects.filter(document__post_id=post.pk).exists())
+    
+    def test_tags_are_indexed(self):
+        """Test that tag changes and tag renames reindex posts"""
+        post = self.posts['gardening']
+        post.tags.add(self.django_tag)
+        self.assertIn(post.pk, [pk for pk, _ in rank_blog_posts('django')])
+        
+        self.django_tag.name = 'Python'
+        self.django_tag.save()
+        self.assertEqual(rank_blog_posts('python')[0][0], post.pk)
+        
+        self.django_tag.delete()
+        self.assertEqual(rank_blog_posts('python'), [])
+    
+    def test_title_matches_rank_first(self):
+        """Test that a title match outranks content matches"""
+        ranked = [pk for pk, _ in rank_blog_posts('django', BlogPost.objects.filter(status='published'))]
+        self.assertEqual(ranked, [self.posts['caching'].pk, self.posts['queries'].pk])
+    
+    def test_query_cost_is_independent_of_corpus_size(self):
+        """Test that ranking reads only posting lists once the corpus stats are cached"""
+        with self.assertNumQueries(2):
+            rank_blog_posts('redis django')
+        with self.assertNumQueries(1):
+            rank_blog_posts('redis django')
+        for i in range(30):
+            BlogPost.objects.create(
+                title=f"Post {i}", slug=f"post-{i}", excerpt="Excerpt",
+                content="Filler words about nothing in particular. " * 40, author=self.user
+            )
+        # The new posts changed the corpus, so its stats are counted once more
+        with self.assertNumQueries(2):
+            rank_blog_posts('redis django')
+        with CaptureQueriesContext(connection) as queries:
+            rank_blog_posts('redis django')
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('AVG', queries[0]['sql'].upper())
+    
+    def test_scores_do_not_depend_on_the_queryset(self):
+        """Test that document frequencies count posts outside the queryset too"""
+        everything = dict(rank_blog_posts('django'))
+        published = dict(rank_blog_posts('django', BlogPost.objects.filter(status='published')))
+        self.assertNotIn(self.posts['draft'].pk, published)
+        for pk, score in published.items():
+            self.assertAlmostEqual(score, everything[pk])
+    
+    def test_search_endpoints_rank_published_posts(self):
+        """Test the search action and the ?search= list filter"""
+        response = self.client.get('/api/blog/search/', {'q': 'Django'})
+        self.assertEqual(
+            [post['slug'] for post in response.data['results']], ['caching', 'queries']
+        )
+        
+        response = self.client.get('/api/blog/', {'search': 'django orm'})
+        self.assertEqual(
+            [post['slug'] for post in response.data['results']], ['queries', 'caching']
+        )
+        
+        response = self.client.get('/api/blog/', {'search': 'django', 'ordering': 'published_date'})
+        self.assertEqual(
+            [post['slug'] for post in response.data['results']], ['caching', 'queries']
+        )
+
+
+class FullTextSearchTestCase(SearchCorpusTestCase):
+    """Test cases for the database-native search backend (SQLite FTS5 here)"""
+    
+    def setUp(self):
+        """Set up test data"""
+        super().setUp()
+        self.tag = Tag.objects.create(name="Frontend", slug="frontend")
+        self.projects = {
+            slug: Project.objects.create(
+                title=title, slug=slug, description=description,
+                short_description=description, technologies_used=technologies,
+                status='published'
+            )
+            for slug, title, description, technologies in [
+                ('dashboard', 'Dashboard', 'Charts for metrics', 'React, TypeScript'),
+                ('api', 'REST API', 'A Django backend for a React app', 'Django, PostgreSQL'),
+            ]
+        }
+    
+    def test_database_backend_is_default(self):
+        """Test that the SQLite FTS5 backend answers searches here"""
+        self.assertEqual(get_search_backend().name, 'sqlite')
+        self.assertEqual(get_search_backend('contains').name, 'contains')
+    
+    def test_ranked_by_field_weight(self):
+        """Test that title matches rank above body matches"""
+        ranked = [pk for pk, _ in search(BlogPost, 'django', BlogPost.objects.filter(status='published'))]
+        self.assertEqual(ranked, [self.posts['caching'].pk, self.posts['queries'].pk])
+        self.assertEqual(
+            [pk for pk, _ in search(Project, 'react')],
+            [self.projects['dashboard'].pk, self.projects['api'].pk]
+        )
+    
+    def test_index_follows_changes(self):
+        """Test that saves, deletes and tag changes reach the FTS table"""
+        project = self.projects['dashboard']
+        project.tags.add(self.tag)
+        self.assertEqual([pk for pk, _ in search(Project, 'frontend')], [project.pk])
+        
+        self.tag.name = 'Visualization'
+        self.tag.save()
+        self.assertEqual(search(Project, 'frontend'), [])
+        self.assertEqual(search(Project, 'visualization')[0][0], project.pk)
+        
+        project.title = 'Metrics board'
+        project.save()
+        self.assertEqual(search(Project, 'metrics board')[0][0], project.pk)
+        
+        project.delete()
+        self.assertEqual(search(Project, 'visualization'), [])
+    
+    def test_query_syntax_is_escaped(self):
+        """Test that FTS5 operators in user input are searched as words"""
+        for query in ['django" OR', 'NEAR(django', '*', 'caching AND -redis']:
+            search(BlogPost, query)
+        self.assertEqual(search(BlogPost, '"   "'), [])
+    
+    def test_search_endpoints(self):
+        """Test blog and project search through the API"""
+        response = self.client.get('/api/blog/search/', {'q': 'django'})
+        self.assertEqual([post['slug'] for post in response.data['results']], ['caching', 'queries'])
+        
+        # Projects keep substring matching, in list order
+        response = self.client.get('/api/projects/', {'search': 'Reac'})
+        self.assertEqual([project['slug'] for project in response.data['results']], ['api', 'dashboard'])
+        
+        response = self.client.get('/api/projects/', {'search': 'postgres'})
+        self.assertEqual([project['slug'] for project in response.data['results']], ['api'])
+    
+    def test_search_list_is_not_capped(self):
+        """Test that ?search= pages through every match, not just MAX_RESULTS"""
+        BlogPost.objects.bulk_create([
+            BlogPost(
+                title=f"Caching note {i}", slug=f"note-{i}", excerpt="Excerpt",
+                content="Content", author=self.user, status='published'
+            )
+            for i in range(MAX_RESULTS)
+        ])
+        get_search_backend().rebuild(BlogPost)
+        
+        response = self.client.get('/api/blog/', {'search': 'caching'})
+        self.assertEqual(response.data['count'], MAX_RESULTS + 1)
+    
+    @override_settings(SEARCH_BACKEND='contains')
+    def test_contains_backend(self):
+        """Test the unindexed icontains backend"""
+        self.assertEqual(
+            {pk for pk, _ in search(Project, 'reac backend')}, {self.projects['api'].pk}
+        )
+
+
+class SuggestTestCase(APITestCase):
+    """Test cases for typeahead suggestions"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        user = User.objects.create_user(username='author', password='testpass123')
+        self.project = Project.objects.create(
+            title="Django REST API", slug="django-rest-api", description="Description",
+            short_description="Short", technologies_used="Django, React", status="published"
+        )
+        Project.objects.create(
+            title="Secret draft", slug="secret-draft", description="Description",
+            short_description="Short", technologies_used="Rust", status="draft"
+        )
+        BlogPost.objects.create(
+            title="Caching in Django", slug="caching", excerpt="Excerpt",
+            content="Content " * 50, author=user, status="published"
+        )
+        Tag.objects.create(name="Python", slug="python")
+    
+    def test_prefix_of_any_word(self):
+        """Test matching word prefixes, texts starting with the prefix first"""
+        self.assertEqual(
+            [(item['type'], item['text']) for item in suggest('DJA')],
+            [('technology', 'Django'), ('project', 'Django REST API'), ('post', 'Caching in Django')]
+        )
+        self.assertEqual([item['slug'] for item in suggest('rest a')], ['django-rest-api'])
+        self.assertEqual([item['text'] for item in suggest('py')], ['Python'])
+        self.assertEqual(suggest('secret'), [])
+        self.assertEqual(suggest('rust'), [])
+    
+    def test_changes_refresh_the_index_without_rebuild(self):
+        """Test that local saves and deletes update a copy of the index without a rebuild"""
+        index = get_suggest_index()
+        
+        self.project.title = "GraphQL API"
+        self.project.technologies_used = "Strawberry"
+        self.project.save()
+        Tag.objects.get(slug='python').delete()
+        
+        # Lookups holding the previous index keep a consistent one
+        self.assertEqual([item['text'] for item in index.search('py')], ['Python'])
+        self.assertEqual(index.search('graph'), [])
+        with self.assertNumQueries(0):
+            self.assertIsNot(get_suggest_index(), index)
+            self.assertEqual([item['text'] for item in suggest('graph')], ['GraphQL API'])
+            self.assertEqual([item['type'] for item in suggest('straw')], ['technology'])
+            self.assertEqual(suggest('py'), [])
+            self.assertEqual([item['type'] for item in suggest('dja')], ['post'])
+    
+    def test_lookups_never_see_a_half_refreshed_index(self):
+        """Test that lookups racing with local refreshes always see a whole index"""
+        get_suggest_index()
+        errors = []
+        done = threading.Event()
+        
+        def read():
+            while not done.is_set():
+                try:
+                    suggest('dja')
+                    suggest('graph')
+                except Exception as e:
+                    errors.append(e)
+        
+        reader = threading.Thread(target=read)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        reader.start()
+        try:
+            for i in range(100):
+                self.project.title = f"GraphQL API {i}"
+                self.project.save()
+        finally:
+            done.set()
+            reader.join()
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+    
+    def test_changes_from_other_workers_rebuild(self):
+        """Test that a version bumped elsewhere rebuilds the index"""
+        index = get_suggest_index()
+        bump_cache_version('suggest')
+        self.assertIsNot(get_suggest_index(), index)
+    
+    def test_endpoint_results_are_bounded(self):
+        """Test the suggest endpoint"""
+        Tag.objects.bulk_create([Tag(name=f"topic {i}", slug=f"topic-{i}") for i in range(30)])
+        bump_cache_version('suggest')
+        
+        response = self.client.get('/api/suggest/', {'q': 'topic', 'limit': 100})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 20)
+        
+        response = self.client.get('/api/suggest/', {'q': 'top', 'limit': 3})
+        self.assertEqual([item['text'] for item in response.data['results']], ['topic 0', 'topic 1', 'topic 2'])
+        
+        response = self.client.get('/api/suggest/', {'q': ' '})
+        self.assertEqual(response.data['results'], [])
+
+
+@override_settings(SEARCH_BACKEND='index', CACHE_WARMUP_HOST='testserver')
+class SearchQueryCacheTestCase(APITestCase):
+    """Test cases for the normalized blog search cache"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        search_cache._popular.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        BlogPost.objects.create(
+            title="Caching in Django", slug="caching", excerpt="Excerpt",
+            content="Content " * 50, author=self.user, status="published"
+        )
+    
+    def test_normalize_query(self):
+        """Test that case, whitespace, accents, stopwords and word order are ignored"""
+        self.assertEqual(normalize_query("  The DJANGO   Café "), 'cafe django')
+        self.assertEqual(normalize_query("cafe django django"), 'cafe django')
+        self.assertEqual(normalize_query("the and"), '')
+    
+    def test_query_variants_share_one_entry(self):
+        """Test that spelling variants of a query are built once and counted together"""
+        with patch('api.views.search', wraps=search) as ranked:
+            for query in ['Django', ' django ', 'the DJANGO']:
+                response = self.client.get('/api/blog/search/', {'q': query})
+                self.assertEqual(response.data['count'], 1)
+                self.assertEqual(response.data['query'], query)
+        self.assertEqual(ranked.call_count, 1)
+        self.assertEqual(popular_queries(), ['django'])
+        
+        response = self.client.get('/api/blog/search/', {'q': 'the'})
+        self.assertEqual(response.data['count'], 0)
+    
+    def test_popular_queries(self):
+        """Test that queries are ranked by searches, without warm-up requests"""
+        for query in ['django', 'caching', 'Caching', 'CACHING', 'django']:
+            self.client.get('/api/blog/search/', {'q': query})
+        warm_url('/api/blog/search/?q=content', 'testserver')
+        self.assertEqual(popular_queries(), ['caching', 'django'])
+        self.assertEqual(popular_queries(limit=1), ['caching'])
+    
+    def test_popular_queries_are_refreshed_after_blog_changes(self):
+        """Test that the most searched queries are rebuilt under the new blog version"""
+        self.client.get('/api/blog/search/', {'q': 'django'})
+        BlogPost.objects.create(
+            title="Django signals", slug="signals", excerpt="Excerpt",
+            content="Content " * 50, author=self.user, status="published"
+        )
+        key = create_cache_key('blog', 'search', 'public', q='django')
+        self.assertIsNone(cache.get(key))
+        
+        self.assertEqual(refresh_popular_searches(), 1)
+        self.assertEqual(cache.get(key)['value']['count'], 2)
+        with patch('api.views.search', wraps=search) as ranked:
+            response = self.client.get('/api/blog/search/', {'q': 'Django'})
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(ranked.call_count, 0)
+        self.assertEqual(popular_queries(), ['django'])
+
+
+class SpellingTestCase(APITestCase):
+    """Test cases for did-you-mean spelling correction"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        BlogPost.objects.create(
+            title="Caching in Django", slug="caching", excerpt="Excerpt",
+            content="Redis keeps responses warm. " * 5, author=self.user, status="published"
+        )
+        Project.objects.create(
+            title="Performance dashboard", slug="dashboard", description="Charts",
+            short_description="Short", status="published"
+        )
+    
+    def test_edit_distance(self):
+        """Test the bounded optimal string alignment distance"""
+        self.assertEqual(edit_distance('caching', 'cahcing'), 1)
+        self.assertEqual(edit_distance('django', 'djnaog'), 2)
+        self.assertIsNone(edit_distance('django', 'python'))
+        self.assertEqual(len(deletes('performance')), 29)
+    
+    def test_corrections(self):
+        """Test that unknown words are corrected to the closest frequent term"""
+        self.assertEqual(correct_query('The cahcing of DJANOG'), 'caching django')
+        self.assertEqual(correct_query('perfromance'), 'performance')
+        self.assertIsNone(correct_query('django caching'))
+        self.assertIsNone(correct_query('zzzzzz'))
+    
+    def test_vocabulary_follows_content(self):
+        """Test that content changes update a copy of the index without a rebuild"""
+        index = get_spelling_index()
+        post = BlogPost.objects.create(
+            title="Kubernetes notes", slug="kubernetes", excerpt="Excerpt",
+            content="Content", author=self.user, status="published"
+        )
+        self.assertEqual(correct_query('kuberentes'), 'kubernetes')
+        updated = get_spelling_index()
+        post.status = 'draft'
+        post.save()
+        with self.assertNumQueries(0):
+            self.assertIsNone(correct_query('kuberentes'))
+        
+        # Lookups holding a previous index keep a consistent one
+        self.assertIsNone(index.correct('kuberentes'))
+        self.assertEqual(updated.correct('kuberentes'), 'kubernetes')
+        self.assertEqual(updated.frequencies['kubernetes'], 1)
+    
+    def test_search_suggests_and_autocorrects(self):
+        """Test the suggestion on empty results and the optional rerun"""
+        response = self.client.get('/api/blog/search/', {'q': 'cahcing'})
+        self.assertEqual(response.data['count'], 0)
+        self.assertEqual(response.data['suggestion'], 'caching')
+        
+        response = self.client.get('/api/blog/search/', {'q': 'cahcing', 'autocorrect': 'true'})
+        self.assertEqual([post['slug'] for post in response.data['results']], ['caching'])
+        self.assertTrue(response.data['autocorrected'])
+        
+        response = self.client.get('/api/blog/search/', {'q': 'caching'})
+        self.assertIsNone(response.data['suggestion'])
+        
+        response = self.client.get('/api/search/', {'q': 'dashbaord'})
+        self.assertEqual(response.data['suggestion'], 'dashboard')
+
+
+class UnifiedSearchTestCase(APITestCase):
+    """Test cases for the cross-content search endpoint"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        user = User.objects.create_user(username='author', password='testpass123')
+        Project.objects.create(
+            title="Django REST API", slug="django-rest-api", description="An API.",
+            short_description="Backend", technologies_used="Django", status="published"
+        )
+        Project.objects.create(
+            title="Django draft", slug="django-draft", description="Draft",
+            short_description="Short", status="draft"
+        )
+        BlogPost.objects.create(
+            title="Caching in Django", slug="caching", excerpt="Excerpt",
+            content="Content " * 50, author=user, status="published"
+        )
+        self.experience = Experience.objects.create(
+            title="Backend Engineer", company="Acme", start_date="2023"
+        )
+        ExperienceBullet.objects.create(experience=self.experience, text="Built Django services")
+        Certification.objects.create(
+            name="Django Developer", issuing_organization="Django Software Foundation",
+            issue_date="2024", is_active=False
+        )
+        section = CustomSection.objects.create(title="Awards", slug="awards")
+        CustomSectionItem.objects.create(section=section, title="Community award", description="For Django talks")
+    
+    def test_hits_are_typed_ranked_and_visible_only(self):
+        """Test that one request returns ranked hits of every visible type"""
+        response = self.client.get('/api/search/', {'q': 'DJANGO'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['query'], 'DJANGO')
+        hits = response.data['results']
+        self.assertEqual(
+            sorted((hit['type'], hit['title']) for hit in hits),
+            [('experience', 'Backend Engineer'), ('post', 'Caching in Django'),
+             ('project', 'Django REST API'), ('section_item', 'Community award')]
+        )
+        scores = [hit['score'] for hit in hits]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(0 < score <= 1 for score in scores))
+        experience = next(hit for hit in hits if hit['type'] == 'experience')
+        self.assertEqual(experience['snippet'], 'Built <mark>Django</mark> services')
+        item = next(hit for hit in hits if hit['type'] == 'section_item')
+        self.assertEqual((item['subtitle'], item['slug']), ('Awards', 'awards'))
+    
+    def test_type_filter_and_pagination(self):
+        """Test ?type= and page-number pagination of the merged hits"""
+        response = self.client.get('/api/search/', {'q': 'django', 'type': 'project,post,bogus'})
+        self.assertEqual({hit['type'] for hit in response.data['results']}, {'project', 'post'})
+        
+        response = self.client.get('/api/search/', {'q': 'django', 'page_size': 3})
+        self.assertEqual(response.data['count'], 4)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNotNone(response.data['next'])
+        
+        response = self.client.get('/api/search/', {'q': 'the'})
+        self.assertEqual(response.data['count'], 0)
+    
+    def test_related_changes_reindex(self):
+        """Test that bullet changes are searchable at once"""
+        self.assertEqual(self.client.get('/api/search/', {'q': 'kubernetes'}).data['count'], 0)
+        ExperienceBullet.objects.create(experience=self.experience, text="Ran Kubernetes clusters")
+        response = self.client.get('/api/search/', {'q': 'kubernetes'})
+        self.assertEqual([hit['title'] for hit in response.data['results']], ['Backend Engineer'])
+    
+    @override_settings(SEARCH_BACKEND='contains')
+    def test_unranked_backend(self):
+        """Test that backends without scores rank by position"""
+        response = self.client.get('/api/search/', {'q': 'django', 'type': 'project'})
+        self.assertEqual([hit['score'] for hit in response.data['results']], [1.0])
+    
+    def test_highlight(self):
+        """Test that snippets are escaped, tag-free and centered on the match"""
+        self.assertEqual(
+            highlight("<p>Use <b>Django</b> &amp; <i>DRF</i></p>", ['django']),
+            'Use <mark>Django</mark> &amp; DRF'
+        )
+        self.assertIsNone(highlight("Nothing here", ['django']))
+        snippet = highlight("word " * 100 + "Café caching", ['cafe', 'cach'], length=40)
+        self.assertTrue(snippet.startswith('…'))
+        self.assertTrue(snippet.endswith('<mark>Café</mark> <mark>caching</mark>'))
+
+
+class CursorPaginationTestCase(APITestCase):
+    """Test cases for opt-in signed cursor pagination"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        user = User.objects.create_user(username='author', password='testpass123')
+        # Same-second timestamps exercise the primary key tie-breaker
+        for i in range(25):
+            BlogPost.objects.create(
+                title=f"Post {i}", slug=f"post-{i}", excerpt="Excerpt",
+                content="Content", author=user, status="published"
+            )
+        for i in range(7):
+            Project.objects.create(
+                title=f"Project {i}", slug=f"project-{i}", description="Description",
+                short_description="Short", status="published",
+                is_featured=i % 3 == 0, order=i % 2
+            )
+    
+    def walk(self, url, params):
+        """Follow next links from the first cursor page, collecting slugs"""
+        slugs = []
+        response = self.client.get(url, {**params, 'cursor': ''})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            slugs.extend(item['slug'] for item in response.data['results'])
+            if not response.data['next']:
+                return slugs
+            response = self.client.get(response.data['next'])
+    
+    def test_cursor_pages_match_page_numbers(self):
+        """Test that cursor pages list every row once, in the list ordering"""
+        expected = [
+            item['slug'] for page in (1, 2, 3)
+            for item in self.client.get('/api/blog/', {'page': page}).data['results']
+        ]
+        self.assertEqual(self.walk('/api/blog/', {'page_size': 10}), expected)
+        
+        expected = [item['slug'] for item in self.client.get('/api/projects/').data['results']]
+        self.assertEqual(self.walk('/api/projects/', {'page_size': 2}), expected)
+        self.assertEqual(
+            self.walk('/api/blog/', {'ordering': 'reading_time', 'page_size': 7}),
+            list(BlogPost.objects.order_by('reading_time', 'pk').values_list('slug', flat=True))
+        )
+    
+    def test_previous_link(self):
+        """Test that the previous link of the second page returns the first"""
+        first = self.client.get('/api/blog/', {'cursor': ''})
+        self.assertIsNone(first.data['previous'])
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNotNone(back.data['next'])
+    
+    def test_deep_pages_seek_without_count_or_offset(self):
+        """Test that a deep page runs the same queries, none of them COUNT or OFFSET"""
+        response = self.client.get('/api/blog/', {'cursor': '', 'page_size': 5})
+        for _ in range(3):
+            response = self.client.get(response.data['next'])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 5)
+        sql = ' '.join(query['sql'] for query in queries.captured_queries).upper()
+        self.assertNotIn('COUNT(', sql)
+        self.assertNotIn('OFFSET', sql)
+    
+    def test_invalid_cursors(self):
+        """Test that forged cursors and cursors of another ordering are rejected"""
+        next_url = self.client.get('/api/blog/', {'cursor': ''}).data['next']
+        cursor = next_url.split('cursor=')[1]
+        response = self.client.get('/api/blog/', {'cursor': cursor[:-2] + 'xx'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get('/api/blog/', {'cursor': cursor, 'ordering': 'views_count'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        
+        response = self.client.get('/api/blog/', {'cursor': '', 'search': 'post'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        # Unranked project search keeps the list ordering
+        response = self.client.get('/api/projects/', {'cursor': '', 'search': 'project'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CachedCountTestCase(APITestCase):
+    """Test cases for cached and estimated pagination counts"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        self.user = User.objects.create_user(username='author', password='testpass123')
+        for i in range(12):
+            BlogPost.objects.create(
+                title=f"Post {i}", slug=f"post-{i}", excerpt="Excerpt",
+                content="Content", author=self.user, status="published"
+            )
+        for i in range(15):
+            ContactSubmission.objects.create(
+                name=f"Sender {i}", email=f"sender{i}@example.com", subject="Hello",
+                message="Message", status='new' if i % 3 else 'read'
+            )
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'adminpass123')
+    
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, sum('COUNT(' in query['sql'].upper() for query in queries.captured_queries)
+    
+    def test_counts_are_shared_across_pages_and_invalidated(self):
+        """Test that pages of one filter set count once per content version"""
+        response, counts = self.count_queries('/api/blog/', {'page': 1})
+        self.assertEqual((response.data['count'], counts), (12, 1))
+        response, counts = self.count_queries('/api/blog/', {'page': 2})
+        self.assertEqual((response.data['count'], counts), (12, 0))
+        
+        BlogPost.objects.create(
+            title="Post 12", slug="post-12", excerpt="Excerpt",
+            content="Content", author=self.user, status="published"
+        )
+        response, counts = self.count_queries('/api/blog/', {'page': 2})
+        self.assertEqual((response.data['count'], counts), (13, 1))
+    
+    def test_staff_contact_list(self):
+        """Test the staff-only contact list with cached counts"""
+        response = self.client.get('/api/contact/')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        
+        self.client.force_authenticate(self.admin)
+        response, counts = self.count_queries('/api/contact/', {'status': 'read'})
+        self.assertEqual((response.data['count'], counts), (5, 1))
+        self.assertFalse(response.data['count_estimated'])
+        self.assertEqual(response.data['results'][0]['status'], 'read')
+        response, counts = self.count_queries('/api/contact/', {'status': 'read', 'page_size': 2, 'page': 2})
+        self.assertEqual((response.data['count'], counts), (5, 0))
+        
+        self.client.post('/api/contact/', {
+            'name': 'New sender', 'email': 'new@example.com', 'subject': 'Hi', 'message': 'Hello there'
+        })
+        response, counts = self.count_queries('/api/contact/', {})
+        self.assertEqual((response.data['count'], counts), (16, 1))
+    
+    def test_low_estimate_does_not_hide_pages(self):
+        """Test that pages past an underestimated count are still served"""
+        self.client.force_authenticate(self.admin)
+        with patch.object(EstimatedCountPaginator, 'estimate', return_value=4):
+            response = self.client.get('/api/contact/', {'page_size': 5, 'page': 2})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(len(response.data['results']), 5)
+            self.assertTrue(response.data['count_estimated'])
+            self.assertEqual(response.data['count'], 11)
+            self.assertIsNotNone(response.data['next'])
+            
+            # The last page makes the count exact
+            response = self.client.get('/api/contact/', {'page_size': 5, 'page': 3})
+            self.assertEqual(len(response.data['results']), 5)
+            self.assertEqual((response.data['count'], response.data['total_pages']), (15, 3))
+            self.assertIsNone(response.data['next'])
+            
+            response = self.client.get('/api/contact/', {'page_size': 5, 'page': 9})
+            self.assertEqual(response.data['results'], [])
+    
+    def test_admin_changelist(self):
+        """Test that the contact admin pages with the estimating paginator"""
+        request = RequestFactory().get('/admin/api/contactsubmission/', {'status__exact': 'read'})
+        request.user = self.admin
+        changelist = admin.site._registry[ContactSubmission].get_changelist_instance(request)
+        self.assertEqual(changelist.result_count, 5)
+        self.assertIsInstance(changelist.paginator, EstimatedCountPaginator)
+
+
 class ContactAPITestCase(APITestCase):
     """Test cases for Contact API"""
     
@@ -296,5 +1032,1194 @@ class ModelTestCase(TestCase):
         self.assertEqual(tag.slug, "machine-learning")
 
 
+class CacheInvalidationTestCase(APITestCase):
+    """Test cases for signal-driven cache versioning"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.tag = Tag.objects.create(name="Django", slug="django")
+        self.project = Project.objects.create(
+            title="Cached Project",
+            slug="cached-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="published",
+            is_featured=True
+        )
+    
+    def test_cache_key_embeds_version(self):
+        """Test that bumping a domain changes its cache keys"""
+        key = create_cache_key('projects', 'featured')
+        bump_cache_version('projects')
+        self.assertNotEqual(key, create_cache_key('projects', 'featured'))
+    
+    def test_save_invalidates_featured(self):
+        """Test that saving a project refreshes the featured endpoint"""
+        response = self.client.get('/api/projects/featured/')
+        self.assertEqual(response.data[0]['title'], 'Cached Project')
+        
+        self.project.title = "Renamed Project"
+        self.project.save()
+        
+        response = self.client.get('/api/projects/featured/')
+        self.assertEqual(response.data[0]['title'], 'Renamed Project')
+    
+    def test_delete_invalidates_cached_list(self):
+        """Test that deleting a project refreshes the cache_page list"""
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 1)
+        
+        self.project.delete()
+        
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 0)
+    
+    def test_tag_change_invalidates_portfolio(self):
+        """Test that m2m tag changes refresh the portfolio payload"""
+        response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.json()['projects'][0]['tags'], [])
+        
+        self.project.tags.add(self.tag)
+        
+        response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.json()['projects'][0]['tags'][0]['slug'], 'django')
+    
+    def test_save_invalidates_object_tags(self):
+        """Test that saving a model deletes the entries tagged with it"""
+        set_tagged('project-detail', 'cached', None, tags=[f'project:{self.project.pk}'])
+        set_tagged('other-detail', 'cached', None, tags=['project:0'])
+        self.project.save()
+        self.assertIsNone(cache.get('project-detail'))
+        self.assertEqual(cache.get('other-detail'), 'cached')
+    
+    def test_view_count_does_not_invalidate(self):
+        """Test that view count updates keep cached responses"""
+        version = get_cache_version('projects')
+        self.project.increment_views()
+        flush_view_counts()
+        self.assertEqual(get_cache_version('projects'), version)
+
+
+class CachedListTestCase(APITestCase):
+    """Test cases for list caching under canonical query strings"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='staff', password='pass')
+        Project.objects.create(
+            title="Published Project",
+            slug="published-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="published",
+            is_featured=True
+        )
+        Project.objects.create(
+            title="Draft Project",
+            slug="draft-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="draft"
+        )
+    
+    def get_stats(self):
+        return list_cache_stats().get('project', {'hits': 0, 'misses': 0})
+    
+    def test_equivalent_queries_share_entry(self):
+        """Test that reordered, defaulted and unknown params hit one entry"""
+        before = self.get_stats()
+        self.client.get('/api/projects/?is_featured=true&page_size=10')
+        self.client.get('/api/projects/?page=1&is_featured=True&utm_source=x')
+        response = self.client.get('/api/projects/?search=&is_featured=TRUE')
+        after = self.get_stats()
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(after['misses'] - before['misses'], 1)
+        self.assertEqual(after['hits'] - before['hits'], 2)
+    
+    def test_staff_and_public_partitioned(self):
+        """Test that drafts cached for staff are never served publicly"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 2)
+        
+        self.client.force_authenticate(user=None)
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.data['count'], 1)
+    
+    def test_pagination_links_are_canonical(self):
+        """Test that cached pagination links drop noise params"""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/projects/?page_size=1&utm_source=x')
+        self.assertIn('page=2', response.data['next'])
+        self.assertNotIn('utm_source', response.data['next'])
+    
+    def test_canonical_query(self):
+        """Test the canonical form of a list query string"""
+        view = ProjectViewSet(action_map={'get': 'list'})
+        view.request = view.initialize_request(
+            RequestFactory().get('/api/projects/', {
+                'search': '  Django   REST ', 'ordering': '-is_featured,order,-created_at',
+                'page': '2', 'is_featured': 'False', 'foo': 'bar'
+            })
+        )
+        view.format_kwarg = None
+        self.assertEqual(
+            view.get_canonical_query(), 'is_featured=false&page=2&search=django+rest'
+        )
+
+
+class CacheWarmupTestCase(APITestCase):
+    """Test cases for the cache warm-up"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.project = Project.objects.create(
+            title="Warm Project",
+            slug="warm-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="published"
+        )
+        Project.objects.create(
+            title="Draft Project",
+            slug="draft-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="draft"
+        )
+    
+    def test_urls_enumerated_from_router(self):
+        """Test that cached lists, actions, details and plain views are covered"""
+        urls = dict(get_warmup_urls(search_terms=['django rest']))
+        
+        self.assertTrue(urls['/api/projects/'])
+        self.assertIn('/api/projects/featured/', urls)
+        self.assertIn('/api/projects/warm-project/', urls)
+        self.assertNotIn('/api/projects/draft-project/', urls)
+        self.assertIn('/api/blog/search/?q=django+rest', urls)
+        self.assertIn('/api/portfolio/', urls)
+        self.assertNotIn('/api/contact/', urls)
+    
+    def test_warm_url_populates_cache(self):
+        """Test that a warmed list is served from the cache afterwards"""
+        results = warm_url('/api/projects/', 'testserver')
+        self.assertEqual(results[0]['status'], 200)
+        
+        before = list_cache_stats()['project']
+        self.client.get('/api/projects/')
+        self.assertEqual(list_cache_stats()['project']['hits'], before['hits'] + 1)
+    
+    def test_warm_detail_does_not_count_view(self):
+        """Test that warming a detail page leaves the view count alone"""
+        warm_url('/api/projects/warm-project/', 'testserver')
+        self.project.refresh_from_db()
+        self.assertEqual(self.project.views_count, 0)
+    
+    def test_warm_cache_command(self):
+        """Test that the command reports per-URL build times"""
+        out = StringIO()
+        with patch('api.management.commands.warm_cache.warm_cache') as warm_cache:
+            warm_cache.return_value = [
+                {'url': '/api/projects/', 'status': 200, 'seconds': 0.0123}
+            ]
+            call_command('warm_cache', '--host', 'example.com', stdout=out)
+        
+        self.assertEqual(warm_cache.call_args.kwargs['host'], 'example.com')
+        self.assertIn('12.3 ms  /api/projects/', out.getvalue())
+        self.assertIn('Warmed 1/1 URLs', out.getvalue())
+
+
+class ViewCounterTestCase(APITestCase):
+    """Test cases for write-behind view counters"""
+    
+    def setUp(self):
+        """Set up test data"""
+        flush_view_counts()
+        self.projects = [
+            Project.objects.create(
+                title=f"Project {i}",
+                slug=f"project-{i}",
+                description="Description",
+                short_description="Short description",
+                technologies_used="Django",
+                status="published"
+            )
+            for i in range(2)
+        ]
+    
+    def test_retrieve_buffers_views(self):
+        """Test that detail requests do not write until the flush"""
+        for _ in range(3):
+            self.client.get('/api/projects/project-0/')
+        
+        self.projects[0].refresh_from_db()
+        self.assertEqual(self.projects[0].views_count, 0)
+        
+        flush_view_counts()
+        self.projects[0].refresh_from_db()
+        self.assertEqual(self.projects[0].views_count, 3)
+    
+    def test_flush_is_one_update_per_model(self):
+        """Test that all buffered hits of a model are applied in one query"""
+        record_view(Project, self.projects[0].pk, 2)
+        record_view(Project, self.projects[1].pk)
+        
+        # The UPDATE, and reading back the totals for the cache
+        with self.assertNumQueries(2):
+            self.assertEqual(flush_view_counts(), 2)
+        self.assertEqual(
+            list(Project.objects.order_by('slug').values_list('views_count', flat=True)),
+            [2, 1]
+        )
+        self.assertEqual(flush_view_counts(), 0)
+    
+    def test_concurrent_hits_are_not_lost(self):
+        """Test that hits recorded from many threads all reach the database"""
+        def hit():
+            for _ in range(50):
+                self.projects[1].increment_views()
+        
+        threads = [threading.Thread(target=hit) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        flush_view_counts()
+        self.projects[1].refresh_from_db()
+        self.assertEqual(self.projects[1].views_count, 200)
+    
+    @override_settings(BACKGROUND_FLUSH=True, VIEW_COUNT_FLUSH_INTERVAL=0)
+    def test_zero_interval_starts_no_flusher(self):
+        """Test that an interval of 0 leaves flushing to explicit calls"""
+        record_view(Project, self.projects[0].pk)
+    
+        self.assertNotIn('flush_view_counts', [thread.name for thread in threading.enumerate()])
+        self.assertEqual(flush_view_counts(), 1)
+    
+    def test_test_runner_starts_no_flusher(self):
+        """Test that the test runner disables background flushes"""
+        self.assertFalse(settings.BACKGROUND_FLUSH)
+        self.assertGreater(settings.VIEW_COUNT_FLUSH_INTERVAL, 0)
+        record_view(Project, self.projects[0].pk)
+        
+        self.assertNotIn('flush_view_counts', [thread.name for thread in threading.enumerate()])
+        self.assertEqual(flush_view_counts(), 1)
+
+
+class AnalyticsTestCase(APITestCase):
+    """Test cases for batched analytics ingestion and rollups"""
+    
+    def setUp(self):
+        """Set up test data"""
+        flush_analytics()
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'password')
+    
+    def test_batch_is_buffered_without_queries(self):
+        """Test that a beacon batch does not touch the database"""
+        events = [
+            {'kind': 'page', 'name': '/?utm_source=x'},
+            {'kind': 'section', 'name': 'projects'},
+            {'kind': 'section', 'name': 'projects'},
+        ]
+        with self.assertNumQueries(0):
+            response = self.client.post('/api/analytics/events/', events, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(AnalyticsDaily.objects.exists())
+        
+        self.assertEqual(flush_analytics(), 3)
+        self.assertEqual(
+            dict(AnalyticsDaily.objects.values_list('name', 'count')),
+            {'/': 1, 'projects': 2}
+        )
+        self.assertEqual(AnalyticsHourly.objects.get(name='projects').count, 2)
+    
+    def test_beacon_text_plain_body(self):
+        """Test that sendBeacon string bodies (text/plain) are accepted"""
+        response = self.client.post(
+            '/api/analytics/events/',
+            json.dumps({'events': [{'kind': 'section', 'name': 'blog'}]}),
+            content_type='text/plain;charset=UTF-8'
+        )
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+    
+    def test_invalid_batches_rejected(self):
+        """Test that oversized or malformed batches are rejected"""
+        events = [{'kind': 'page', 'name': '/'}] * (MAX_EVENTS_PER_BATCH + 1)
+        response = self.client.post('/api/analytics/events/', events, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.post('/api/analytics/events/', [{'kind': 'click', 'name': '/'}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(flush_analytics(), 0)
+    
+    def test_flushes_add_to_existing_rollups(self):
+        """Test that later flushes increment the same rollup rows"""
+        now = time.time()
+        buffer_events([('page', '/')] * 2, now=now)
+        flush_analytics()
+        buffer_events([('page', '/')] * 3 + [('page', '/blog')], now=now)
+        flush_analytics()
+        
+        self.assertEqual(AnalyticsHourly.objects.get(name='/').count, 5)
+        self.assertEqual(AnalyticsDaily.objects.get(name='/').count, 5)
+        self.assertEqual(AnalyticsDaily.objects.get(name='/blog').count, 1)
+    
+    def test_read_api_is_staff_only(self):
+        """Test the rollup read API"""
+        buffer_events([('section', 'projects')] * 4)
+        flush_analytics()
+        
+        response = self.client.get('/api/analytics/')
+        self.assertIn(response.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        
+        self.client.force_authenticate(self.admin)
+        response = self.client.get('/api/analytics/', {'granularity': 'hour', 'kind': 'section'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['totals'], [{'kind': 'section', 'name': 'projects', 'total': 4}])
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class UniqueVisitorTestCase(APITestCase):
+    """Test cases for HyperLogLog unique-visitor estimates"""
+    
+    def setUp(self):
+        """Set up test data"""
+        flush_view_counts()
+        flush_visitor_sketches()
+        self.project = Project.objects.create(
+            title="Project",
+            slug="project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="published"
+        )
+    
+    def test_estimate_and_merge(self):
+        """Test that sketches estimate distinct items and merge as a union"""
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(5000):
+            first.add(f"visitor-{i}")
+            first.add(f"visitor-{i}")
+            second.add(f"visitor-{i + 2500}")
+        
+        self.assertEqual(HyperLogLog().count(), 0)
+        self.assertAlmostEqual(first.count(), 5000, delta=150)
+        self.assertAlmostEqual(first.merge(second).count(), 7500, delta=225)
+        self.assertEqual(HyperLogLog.from_bytes(first.to_bytes()).registers, first.registers)
+    
+    def test_redis_encodings(self):
+        """Test decoding of Redis dense and sparse HyperLogLog values"""
+        sketch = HyperLogLog()
+        for i in range(100):
+            sketch.add(str(i))
+        
+        packed = 0
+        for index, value in enumerate(sketch.registers):
+            packed |= value << (index * 6)
+        dense = b'HYLL\x00' + bytes(11) + packed.to_bytes(12288, 'little')
+        self.assertEqual(HyperLogLog.from_redis(dense).registers, sketch.registers)
+        
+        # XZERO run of 16000, VAL 3 x2, ZERO run of 64 x5, XZERO run of 62
+        sparse = b'HYLL\x01' + bytes(11) + bytes([
+            0x40 | (15999 >> 8), 15999 & 0xff,
+            0x80 | (2 << 2) | 1,
+            *[0x3f] * 5,
+            0x40, 61,
+        ])
+        registers = HyperLogLog.from_redis(sparse).registers
+        self.assertEqual(registers[16000:16002], bytearray([3, 3]))
+        self.assertEqual(sum(registers), 6)
+        
+        with self.assertRaises(ValueError):
+            HyperLogLog.from_redis(b'not a sketch')
+    
+    def test_detail_views_estimate_unique_visitors(self):
+        """Test that reloads and bots do not count as unique visitors"""
+        for agent in ['Firefox', 'Firefox', 'Chrome', 'Googlebot/2.1']:
+            self.client.get('/api/projects/project/', HTTP_USER_AGENT=agent)
+        self.client.get('/api/projects/project/', HTTP_USER_AGENT='Firefox', REMOTE_ADDR='10.0.0.2')
+        
+        self.assertEqual(flush_visitor_sketches(), 1)
+        flush_view_counts()
+        response = self.client.get('/api/projects/project/', HTTP_USER_AGENT='Firefox')
+        self.assertEqual(response.data['views_count'], 5)
+        self.assertEqual(response.data['unique_visitors'], 3)
+        self.assertEqual(VisitorSketch.objects.get(date__isnull=True).estimate, 3)
+    
+    def test_windows_merge_day_sketches(self):
+        """Test unique visitors over date windows"""
+        today = timezone.localdate()
+        yesterday = today - timezone.timedelta(days=1)
+        with patch('django.utils.timezone.localdate', return_value=yesterday):
+            for visitor in ['a', 'b']:
+                record_visitor(Project, self.project.pk, visitor)
+        for visitor in ['b', 'c']:
+            record_visitor(Project, self.project.pk, visitor)
+        
+        # SELECT and bulk INSERT, inside a savepoint
+        with self.assertNumQueries(4):
+            flush_visitor_sketches()
+        self.assertEqual(unique_visitors(self.project), 3)
+        self.assertEqual(unique_visitors(self.project, start=today), 2)
+        self.assertEqual(unique_visitors(self.project, end=yesterday), 2)
+        self.assertEqual(unique_visitors(self.project, start=yesterday, end=today), 3)
+        
+        # Later flushes merge into the stored sketches
+        record_visitor(Project, self.project.pk, 'd')
+        flush_visitor_sketches()
+        self.assertEqual(unique_visitors(self.project), 4)
+        self.assertEqual(VisitorSketch.objects.count(), 3)
+    
+    def test_serializer_reads_annotated_estimate(self):
+        """Test that detail serializers use the annotated estimate instead of a query"""
+        for visitor in ['a', 'b']:
+            record_visitor(Project, self.project.pk, visitor)
+        flush_visitor_sketches()
+        
+        project = Project.objects.prefetch_related('tags').annotate(
+            unique_visitors_estimate=VisitorSketch.all_time_subquery(Project)
+        ).get(pk=self.project.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(ProjectDetailSerializer(project).data['unique_visitors'], 2)
+        
+        # Without the annotation it falls back to one query
+        project = Project.objects.prefetch_related('tags').get(pk=self.project.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(ProjectDetailSerializer(project).data['unique_visitors'], 2)
+
+
+class CachedDetailTestCase(APITestCase):
+    """Test cases for cached project and blog detail responses"""
+    
+    def setUp(self):
+        """Set up test data"""
+        flush_view_counts()
+        self.user = User.objects.create_user(username='staff', password='pass')
+        self.project = Project.objects.create(
+            title="Detail Project",
+            slug="detail-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="published"
+        )
+    
+    def test_detail_served_from_cache_and_counted(self):
+        """Test that repeated detail requests skip the database but count"""
+        self.client.get('/api/projects/detail-project/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/projects/detail-project/')
+        self.assertEqual(response.data['title'], 'Detail Project')
+        
+        flush_view_counts()
+        response = self.client.get('/api/projects/detail-project/')
+        self.assertEqual(response.data['views_count'], 2)
+    
+    def test_flush_keeps_cached_responses(self):
+        """Test that flushed view counts are shown without rebuilding cached responses"""
+        self.client.get('/api/projects/detail-project/')
+        self.client.get('/api/projects/')
+        flush_view_counts()
+        
+        with self.assertNumQueries(0):
+            detail = self.client.get('/api/projects/detail-project/')
+        with self.assertNumQueries(0):
+            listed = self.client.get('/api/projects/')
+        self.assertEqual(detail.data['views_count'], 1)
+        self.assertEqual(listed.data['results'][0]['views_count'], 1)
+        self.assertEqual(detail.data['title'], 'Detail Project')
+        
+        flush_view_counts()
+        response = self.client.get('/api/projects/batch/', {'slugs': 'detail-project'})
+        self.assertEqual(response.data['results'][0]['views_count'], 2)
+    
+    def test_save_invalidates_detail(self):
+        """Test that saving the object refreshes its cached detail"""
+        self.client.get('/api/projects/detail-project/')
+        self.project.title = "Renamed Project"
+        self.project.save()
+        
+        response = self.client.get('/api/projects/detail-project/')
+        self.assertEqual(response.data['title'], 'Renamed Project')
+    
+    def test_draft_detail_not_leaked(self):
+        """Test that a staff-cached draft is not served publicly"""
+        BlogPost.objects.create(
+            title="Draft Post", slug="draft-post", excerpt="Excerpt",
+            content="Content", author=self.user, status="draft"
+        )
+        self.client.force_authenticate(user=self.user)
+        self.assertEqual(self.client.get('/api/blog/draft-post/').status_code, 200)
+        
+        self.client.force_authenticate(user=None)
+        self.assertEqual(self.client.get('/api/blog/draft-post/').status_code, 404)
+
+
+class PortfolioSnapshotTestCase(APITestCase):
+    """Test cases for the materialized portfolio snapshot"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        Profile.objects.create(name="Test Person")
+        self.project = Project.objects.create(
+            title="Snapshot Project",
+            slug="snapshot-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django, Python",
+            status="published"
+        )
+    
+    def test_snapshot_matches_serializers(self):
+        """Test that the snapshot body is what DRF would render"""
+        response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        
+        request = response.wsgi_request
+        expected = JSONRenderer().render(build_portfolio_data(request))
+        self.assertEqual(response.content, expected)
+    
+    def test_read_path_runs_no_queries(self):
+        """Test that a built snapshot is served without touching the database"""
+        self.client.get('/api/portfolio/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.json()['projects'][0]['title'], 'Snapshot Project')
+    
+    def test_snapshot_rebuilt_on_commit(self):
+        """Test that a content change rebuilds the snapshot after commit"""
+        self.client.get('/api/portfolio/')
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.title = "Rebuilt Project"
+            self.project.save()
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/portfolio/')
+        self.assertEqual(response.json()['projects'][0]['title'], 'Rebuilt Project')
+
+
+class ConditionalGetTestCase(APITestCase):
+    """Test cases for ETag / Last-Modified support"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        self.project = Project.objects.create(
+            title="Conditional Project",
+            slug="conditional-project",
+            description="Description",
+            short_description="Short description",
+            technologies_used="Django",
+            status="published"
+        )
+    
+    def test_validators_are_set(self):
+        """Test that read responses carry ETag and Last-Modified"""
+        response = self.client.get('/api/projects/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', response)
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+    
+    def test_if_none_match_returns_304_without_queries(self):
+        """Test that a matching ETag short-circuits before the view"""
+        response = self.client.get('/api/portfolio/')
+        etag = response['ETag']
+        
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/portfolio/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+    
+    def test_if_modified_since_returns_304(self):
+        """Test that an up-to-date If-Modified-Since short-circuits"""
+        response = self.client.get('/api/projects/featured/')
+        last_modified = response['Last-Modified']
+        
+        response = self.client.get(
+            '/api/projects/featured/', HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+    
+    def test_content_change_invalidates_etag(self):
+        """Test that a stale ETag gets the new content"""
+        response = self.client.get('/api/projects/')
+        etag = response['ETag']
+        
+        self.project.title = "Changed Project"
+        self.project.save()
+        
+        response = self.client.get('/api/projects/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class PrecompressedResponseTestCase(APITestCase):
+    """Test cases for pre-compressed cached response variants"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.client = APIClient()
+        for i in range(3):
+            Project.objects.create(
+                title=f"Project {i}",
+                slug=f"project-{i}",
+                description="Description " * 20,
+                short_description="Short description",
+                technologies_used="Django",
+                status="published"
+            )
+    
+    def test_gzip_variant_served(self):
+        """Test that gzip clients get the stored variant, compressed once"""
+        identity = self.client.get('/api/portfolio/')
+        compressed = self.client.get('/api/portfolio/', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        
+        self.assertNotIn('Content-Encoding', identity)
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(compressed.content), identity.content)
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertEqual(compressed['ETag'], f"W/{identity['ETag']}")
+    
+    def test_gzip_variant_revalidates(self):
+        """Test that both variants answer If-None-Match with 304"""
+        etag = self.client.get('/api/projects/')['ETag']
+        response = self.client.get(
+            '/api/projects/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        
+        response = self.client.get('/api/projects/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(json.loads(gzip.decompress(response.content))['count'], 3)
+    
+    def test_gzip_refused(self):
+        """Test that an explicit q=0 keeps the identity body"""
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0, br')
+        self.assertFalse(accepts_gzip(request))
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0.5')
+        self.assertTrue(accepts_gzip(request))
+
+
+@override_settings(CACHES={
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'two-tier-shared',
+    },
+})
+class TwoTierCacheTestCase(TestCase):
+    """Test cases for the two-tier cache backend"""
+    
+    def setUp(self):
+        """Set up two workers sharing one cache"""
+        caches['shared'].clear()
+        params = {'OPTIONS': {'SHARED_CACHE': 'shared', 'MAX_ENTRIES': 10}}
+        self.worker1 = TwoTierCache(f'{self._testMethodName}-worker1', params)
+        self.worker2 = TwoTierCache(f'{self._testMethodName}-worker2', params)
+    
+    def test_tiers_and_counters(self):
+        """Test that reads fall through to the shared tier once"""
+        self.worker1.set('key', {'value': 1})
+        
+        self.assertEqual(self.worker2.get('key'), {'value': 1})
+        self.assertEqual(self.worker2.get('key'), {'value': 1})
+        self.assertIsNone(self.worker2.get('missing'))
+        
+        stats = self.worker2.stats()
+        self.assertEqual(stats['local_hits'], 1)
+        self.assertEqual(stats['shared_hits'], 1)
+        self.assertEqual(stats['shared_misses'], 1)
+    
+    def test_invalidation_message_drops_local_copy(self):
+        """Test that an invalidation from another worker is honoured"""
+        self.worker1.set('key', 'old')
+        self.worker2.get('key')
+        self.worker1.set('key', 'new')
+        
+        self.worker2._handle_invalidation(json.dumps({
+            'sender': 'worker1', 'keys': [self.worker2.make_key('key')]
+        }))
+        self.assertEqual(self.worker2.get('key'), 'new')
+    
+    def test_invalidation_during_read_skips_local_fill(self):
+        """Test that a value replaced while it was being read is not kept locally"""
+        self.worker1.set('key', 'old')
+        shared = caches['shared']
+        read = shared.get
+        
+        def slow_read(*args, **kwargs):
+            value = read(*args, **kwargs)
+            self.worker1.set('key', 'new')
+            self.worker2._handle_invalidation(json.dumps({
+                'sender': 'worker1', 'keys': [self.worker2.make_key('key')]
+            }))
+            return value
+        
+        with patch.object(shared, 'get', slow_read):
+            self.assertEqual(self.worker2.get('key'), 'old')
+        self.assertEqual(self.worker2.stats()['local_entries'], 0)
+        self.assertEqual(self.worker2.get('key'), 'new')
+    
+    def test_version_keys_stay_shared(self):
+        """Test that content version keys are never kept in the local tier"""
+        self.worker1.set('cache_version:blog', 1)
+        self.assertEqual(self.worker2.get('cache_version:blog'), 1)
+        self.assertEqual(self.worker1.incr('cache_version:blog'), 2)
+        
+        # No invalidation message needed
+        self.assertEqual(self.worker2.get('cache_version:blog'), 2)
+        self.assertEqual(self.worker1.get_many(['cache_version:blog']), {'cache_version:blog': 2})
+        self.assertEqual(self.worker1.stats()['local_entries'], 0)
+        self.assertEqual(self.worker2.stats()['local_entries'], 0)
+    
+    def test_local_tier_is_bounded(self):
+        """Test that the local LRU evicts by entry count and size"""
+        for i in range(20):
+            self.worker1.set(f'key{i}', i)
+        self.assertEqual(self.worker1.stats()['local_entries'], 10)
+        
+        lru = LocalLRUCache(max_entries=100, max_bytes=1000)
+        lru.set('a', b'x' * 600, None)
+        lru.set('b', b'x' * 600, None)
+        self.assertIsNone(lru.get('a'))
+        self.assertEqual(lru.size, 600)
+    
+    def test_local_only_incr_and_add(self):
+        """Test the locmem-only fallback without a shared tier"""
+        local = TwoTierCache(self._testMethodName, {})
+        self.assertTrue(local.add('counter', 1))
+        self.assertFalse(local.add('counter', 5))
+        self.assertEqual(local.incr('counter'), 2)
+        with self.assertRaises(ValueError):
+            local.incr('missing')
+    
+    def test_delete_tags(self):
+        """Test that deleting a tag removes exactly its keys in every tier"""
+        self.worker1.set('project-list:1', 'page 1', tags=['project-list'])
+        self.worker1.set('project:42', 'detail', tags=['project:42', 'project-list'])
+        self.worker1.set('blog-list:1', 'blog page')
+        self.worker2.get('project-list:1')
+        
+        self.assertEqual(self.worker1.delete_tags(['project-list']), 2)
+        self.assertIsNone(self.worker1.get('project:42'))
+        self.assertIsNone(caches['shared'].get('project-list:1'))
+        self.assertEqual(self.worker1.get('blog-list:1'), 'blog page')
+        self.assertEqual(self.worker1.delete_tags(['project-list']), 0)
+    
+    def test_delete_tags_local_only(self):
+        """Test the in-process tag index without a shared tier"""
+        local = TwoTierCache(self._testMethodName, {})
+        local.set('a', 1, tags=['tag:django'])
+        local.set('b', 2, tags=['tag:python'])
+        
+        local.delete_tags(['tag:django'])
+        self.assertIsNone(local.get('a'))
+        self.assertEqual(local.get('b'), 2)
+
+
+class CacheSerializerTestCase(TestCase):
+    """Test cases for the compressed JSON cache serializer"""
+    
+    def setUp(self):
+        """Set up the serializer and compressor"""
+        self.serializer = JSONSerializer({})
+        self.compressor = ZlibCompressor({'COMPRESS_MIN_LENGTH': 100})
+    
+    def roundtrip(self, value):
+        stored = self.compressor.compress(self.serializer.dumps(value))
+        try:
+            stored = self.compressor.decompress(stored)
+        except CompressorError:
+            pass
+        return self.serializer.loads(stored)
+    
+    def test_json_roundtrip(self):
+        """Test that payloads, bytes and datetimes survive as JSON"""
+        built_at = timezone.now()
+        value = {
+            'value': {'body': b'{"title":"caf\xc3\xa9"}', 'etag': 'abc', 'built_at': built_at},
+            'fresh_until': 1700000000.5,
+            'raw': b'\xff\x00',
+        }
+        self.assertEqual(self.roundtrip(value), value)
+        self.assertEqual(self.serializer.dumps(['a'])[:1], b'[')
+    
+    def test_pickle_fallback(self):
+        """Test that values JSON cannot represent exactly are pickled"""
+        for value in [(1, 2), {1: 'a'}, {'a', 'b'}]:
+            self.assertEqual(self.serializer.dumps(value)[:1], b'\x80')
+            self.assertEqual(self.roundtrip(value), value)
+    
+    def test_compression_threshold(self):
+        """Test that only values above the threshold are compressed"""
+        small = self.serializer.dumps({'count': 1})
+        large = self.serializer.dumps({'results': ['lorem ipsum'] * 100})
+        
+        self.assertEqual(self.compressor.compress(small), small)
+        self.assertLess(len(self.compressor.compress(large)), len(large) // 5)
+        self.assertEqual(self.roundtrip({'results': ['lorem ipsum'] * 100}),
+                         {'results': ['lorem ipsum'] * 100})
+
+
+class GetOrBuildTestCase(TestCase):
+    """Test cases for single-flight / stale-while-revalidate caching"""
+    
+    def setUp(self):
+        """Set up a unique key per test"""
+        self.key = create_cache_key('tests', self._testMethodName)
+        self.calls = 0
+    
+    def build(self):
+        self.calls += 1
+        return f'value-{self.calls}'
+    
+    def make_stale(self, value):
+        set_built(self.key, value, timeout=60)
+        entry = cache.get(self.key)
+        entry['fresh_until'] = 0
+        cache.set(self.key, entry, 60)
+    
+    def test_builds_once_while_fresh(self):
+        """Test that a fresh value is not rebuilt"""
+        self.assertEqual(get_or_build(self.key, self.build, 60), 'value-1')
+        self.assertEqual(get_or_build(self.key, self.build, 60), 'value-1')
+        self.assertEqual(self.calls, 1)
+    
+    def test_stale_value_served_while_locked(self):
+        """Test that other callers get the stale value during a rebuild"""
+        self.make_stale('stale')
+        cache.add(f'{self.key}:lock', True, 30)
+        
+        self.assertEqual(get_or_build(self.key, self.build, 60), 'stale')
+        self.assertEqual(self.calls, 0)
+    
+    def test_stale_value_rebuilt_by_lock_holder(self):
+        """Test that a stale value is refreshed when nobody else is building"""
+        self.make_stale('stale')
+        self.assertEqual(get_or_build(self.key, self.build, 60), 'value-1')
+        self.assertEqual(get_or_build(self.key, self.build, 60), 'value-1')
+    
+    def test_concurrent_misses_build_once(self):
+        """Test that simultaneous misses coalesce into a single build"""
+        def slow_build():
+            time.sleep(0.2)
+            return self.build()
+        
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(get_or_build(self.key, slow_build, 60))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['value-1'] * 5)
+
+
+class SparseFieldsetTestCase(APITestCase):
+    """Test cases for ?fields= and ?expand= output and query narrowing"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        user = User.objects.create_user(username='author', email='a@example.com', password='testpass123')
+        category = Category.objects.create(name='Tech')
+        tag = Tag.objects.create(name='Django')
+        for i in range(3):
+            project = Project.objects.create(
+                title=f"Project {i}", slug=f"project-{i}", description="Full description",
+                short_description="Short", technologies_used="Django, Vue", status="published"
+            )
+            project.tags.add(tag)
+            post = BlogPost.objects.create(
+                title=f"Post {i}", slug=f"post-{i}", excerpt="Excerpt", content="Long content",
+                author=user, category=category, status="published"
+            )
+            post.tags.add(tag)
+    
+    def test_fields_trim_output(self):
+        """Test that ?fields= keeps only the named fields, in declaration order"""
+        response = self.client.get('/api/projects/', {'fields': 'thumbnail,title,bogus'})
+        self.assertEqual(list(response.data['results'][0]), ['title', 'thumbnail'])
+        
+        response = self.client.get('/api/blog/post-1/', {'fields': 'title, excerpt'})
+        self.assertEqual(response.data, {'title': 'Post 1', 'excerpt': 'Excerpt'})
+    
+    def test_expand_adds_opt_in_fields(self):
+        """Test that expandable fields are only returned when asked for"""
+        default = self.client.get('/api/projects/').data['results'][0]
+        self.assertNotIn('description', default)
+        self.assertIn('tags', default)
+        expanded = self.client.get('/api/projects/', {'expand': 'description'}).data['results'][0]
+        self.assertEqual(expanded['description'], 'Full description')
+        self.assertEqual(set(expanded) - set(default), {'description'})
+        
+        post = self.client.get('/api/blog/', {'fields': 'slug,content'}).data['results'][0]
+        self.assertEqual(set(post), {'slug', 'content'})
+    
+    def test_narrow_request_issues_narrower_sql(self):
+        """Test that unselected columns, joins and prefetches are skipped"""
+        with CaptureQueriesContext(connection) as full:
+            self.client.get('/api/blog/')
+        sql = ' '.join(query['sql'] for query in full.captured_queries)
+        self.assertIn('auth_user', sql)
+        self.assertIn('api_tag', sql)
+        
+        with CaptureQueriesContext(connection) as narrow:
+            response = self.client.get('/api/blog/', {'fields': 'title,slug'})
+        self.assertEqual(len(response.data['results']), 3)
+        sql = ' '.join(query['sql'] for query in narrow.captured_queries)
+        self.assertNotIn('auth_user', sql)
+        self.assertNotIn('api_tag', sql)
+        self.assertNotIn('"content"', sql)
+        self.assertLess(len(narrow), len(full))
+    
+    def test_fieldsets_cached_separately(self):
+        """Test that list and detail cache entries are keyed by fieldset"""
+        self.assertEqual(list(self.client.get('/api/projects/project-1/', {'fields': 'slug'}).data), ['slug'])
+        self.assertIn('description', self.client.get('/api/projects/project-1/').data)
+        
+        self.client.get('/api/blog/', {'fields': 'slug,title'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/blog/', {'fields': 'title, slug,title'})
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(set(response.data['results'][0]), {'slug', 'title'})
+        self.assertIn('tags', self.client.get('/api/blog/').data['results'][0])
+    
+    def test_cursor_pages_with_fieldset(self):
+        """Test that cursor pagination reads its ordering values without extra queries"""
+        response = self.client.get('/api/blog/', {'fields': 'slug', 'cursor': '', 'page_size': 2})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(response.data['next'])
+        self.assertEqual([set(item) for item in response.data['results']], [{'slug'}])
+        self.assertEqual(len(queries), 1)
+    
+    def test_portfolio_project_fieldset(self):
+        """Test that ?fields= selects the portfolio project fields"""
+        projects = self.client.get('/api/portfolio/', {'fields': 'slug,featured_image'}).data['projects']
+        self.assertEqual(len(projects), 3)
+        self.assertEqual(set(projects[0]), {'slug', 'featured_image'})
+        self.assertIn('profile', self.client.get('/api/portfolio/', {'fields': 'slug'}).data)
+        self.assertIn('bullets', self.client.get('/api/portfolio/').data['projects'][0])
+    
+    def test_unknown_names_share_the_default_entries(self):
+        """Test that unknown field names neither add cache entries nor rebuild the portfolio"""
+        self.client.get('/api/projects/')
+        self.client.get('/api/projects/project-1/')
+        self.client.get('/api/portfolio/')
+        for url, params in [
+            ('/api/projects/', {'fields': 'nope', 'expand': 'title'}),
+            ('/api/projects/project-1/', {'fields': 'x,y'}),
+            ('/api/portfolio/', {'fields': 'bogus', 'expand': 'bogus'}),
+        ]:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, params)
+            self.assertEqual(len(queries), 0, url)
+        self.assertIn('bullets', response.data['projects'][0])
+        
+        # Both are the ?fields=slug entry
+        self.client.get('/api/projects/', {'fields': 'slug,nope'})
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/', {'fields': 'slug,other'})
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(set(response.data['results'][0]), {'slug'})
+
+
+class BatchDetailTestCase(APITestCase):
+    """Test cases for batch detail retrieval by slug list"""
+    
+    def setUp(self):
+        """Set up test data"""
+        cache.clear()
+        tag = Tag.objects.create(name='Django')
+        for i in range(4):
+            project = Project.objects.create(
+                title=f"Project {i}", slug=f"project-{i}", description="Description",
+                short_description="Short", status="published" if i < 3 else "draft"
+            )
+            project.tags.add(tag)
+    
+    def test_batch_preserves_order_and_reports_missing(self):
+        """Test that details come back in the requested order, unknown slugs apart"""
+        response = self.client.get('/api/projects/batch/', {'slugs': 'project-2,nope,project-0,project-3'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['slug'] for item in response.data['results']], ['project-2', 'project-0'])
+        # Drafts are as invisible as in retrieve
+        self.assertEqual(response.data['missing'], ['nope', 'project-3'])
+        self.assertEqual(
+            response.data['results'][0],
+            self.client.get('/api/projects/project-2/').data
+        )
+    
+    def test_batch_uses_one_query_and_detail_cache(self):
+        """Test that uncached details share one query and cached ones none"""
+        self.client.get('/api/projects/project-1/')
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/projects/batch/', {'slugs': 'project-0,project-1,project-2'})
+        self.assertEqual(len(response.data['results']), 3)
+        # One project query however many details were not cached
+        project_queries = [q for q in queries.captured_queries if 'FROM "api_project"' in q['sql']]
+        self.assertEqual(len(project_queries), 1)
+        self.assertNotIn("'project-1'", project_queries[0]['sql'])
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/projects/batch/', {'slugs': 'project-2,project-0'})
+            self.client.get('/api/projects/project-0/')
+        self.assertEqual(len(queries), 0)
+    
+    def test_cold_batch_cost_is_flat(self):
+        """Test that a cold batch costs the same queries for one slug or many"""
+        record_visitor(Project, Project.objects.get(slug='project-2').pk, 'visitor')
+        flush_visitor_sketches()
+        
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/projects/batch/', {'slugs': 'project-0'})
+        cache.clear()
+        with self.assertNumQueries(len(queries)):
+            response = self.client.get('/api/projects/batch/', {'slugs': 'project-0,project-1,project-2'})
+        self.assertEqual(
+            [item['unique_visitors'] for item in response.data['results']], [0, 0, 1]
+        )
+    
+    def test_batch_counts_views(self):
+        """Test that every returned object counts a view"""
+        with patch('api.mixins.record_view') as record:
+            self.client.get('/api/projects/batch/', {'slugs': 'project-0,project-1'})
+        self.assertEqual(record.call_count, 2)
+    
+    def test_batch_size_capped(self):
+        """Test that empty and oversized batches are rejected"""
+        self.assertEqual(self.client.get('/api/blog/batch/').status_code, status.HTTP_400_BAD_REQUEST)
+        slugs = ','.join(f"post-{i}" for i in range(MAX_BATCH_SIZE + 1))
+        response = self.client.get('/api/blog/batch/', {'slugs': slugs})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CompiledSerializerTestCase(APITestCase):
+    """Test cases for the compiled read path against the DRF serializers"""
+    
+    def setUp(self):
+        """Set up test data covering nulls, choices, files and nested rows"""
+        cache.clear()
+        user = User.objects.create_user(username='author', email='a@example.com', password='testpass123')
+        category = Category.objects.create(name='Tech')
+        django_tag, vue_tag = Tag.objects.create(name='Django'), Tag.objects.create(name='Vue')
+        for i in range(3):
+            project = Project.objects.create(
+                title=f"Project {i}", slug=f"project-{i}", description="Description",
+                short_description="Short", technologies_used="Django, , Vue",
+                status="published", is_featured=i == 1, order=i
+            )
+            project.tags.add(django_tag, *([vue_tag] if i else []))
+            ProjectBullet.objects.create(project=project, text=f"Bullet {i}", order=1)
+            post = BlogPost.objects.create(
+                title=f"Post {i}", slug=f"post-{i}", excerpt="Excerpt", content="Content",
+                author=user, category=category if i else None, status="published"
+            )
+            post.tags.add(vue_tag)
+        # Files are set without save(), which would render a thumbnail
+        Project.objects.filter(slug='project-1').update(
+            image='projects/one.png', thumbnail='projects/thumbnails/one.png'
+        )
+        BlogPost.objects.filter(slug='post-2').update(featured_image='blog/two.png')
+        
+        group = SkillGroup.objects.create(title='Backend', order=1)
+        SkillItem.objects.create(group=group, name='Django', proficiency=90)
+        SkillItem.objects.create(group=group, name='Python', proficiency=95, order=1)
+        SkillGroup.objects.create(title='Empty')
+        for date in ('Depuis 2025', '2021–2025', '2019-2021', ''):
+            Education.objects.create(date=date, title='Degree', subtitle='School')
+        experience = Experience.objects.create(
+            title='Engineer', company='Acme', start_date='2023', end_date='2024-05-01'
+        )
+        ExperienceBullet.objects.create(experience=experience, text='Shipped')
+        Experience.objects.create(title='Lead', company='Acme', start_date='2024-01-01', is_current=True)
+        Certification.objects.create(name='Cert', issuing_organization='Org', issue_date='2024')
+        Certification.objects.create(
+            name='Cert 2', issuing_organization='Org', issue_date='2024-02-01', expiry_date='2026'
+        )
+        proficiency = Language._meta.get_field('proficiency').choices[0][0]
+        Language.objects.create(name='French', proficiency=proficiency)
+        Interest.objects.create(name='Chess')
+        section = CustomSection.objects.create(title='Talks', slug='talks')
+        CustomSectionItem.objects.create(section=section, title='Talk', date='2024')
+        CustomSectionItem.objects.create(section=section, title='Hidden', is_active=False)
+        
+        self.request = RequestFactory().get('/api/projects/')
+    
+    def assertParity(self, serializer_class, queryset, context=None):
+        """Assert that both paths render to the same bytes"""
+        context = context or {}
+        expected = JSONRenderer().render(serializer_class(queryset, many=True, context=context).data)
+        compiled = compile_serializer(serializer_class, context).serialize_queryset(queryset)
+        self.assertEqual(JSONRenderer().render(compiled), expected)
+    
+    def test_list_serializers_parity(self):
+        """Test parity of the project and blog list serializers"""
+        context = {'request': self.request}
+        self.assertParity(ProjectListSerializer, Project.objects.all(), context)
+        self.assertParity(ProjectListSerializer, Project.objects.all())
+        self.assertParity(BlogPostListSerializer, BlogPost.objects.all(), context)
+        self.assertParity(
+            BlogPostListSerializer, BlogPost.objects.all(),
+            {**context, 'fields': ['slug', 'category_name'], 'expand': ['content']}
+        )
+    
+    def test_portfolio_serializers_parity(self):
+        """Test parity of every serializer the portfolio compiles"""
+        self.assertParity(PortfolioProjectSerializer, Project.objects.all(), {'request': self.request})
+        self.assertParity(PortfolioProjectSerializer, Project.objects.all())
+        self.assertParity(SkillGroupSerializer, SkillGroup.objects.all())
+        self.assertParity(EducationSerializer, Education.objects.all())
+        self.assertParity(ExperienceSerializer, Experience.objects.all())
+        self.assertParity(CertificationSerializer, Certification.objects.all())
+        self.assertParity(LanguageSerializer, Language.objects.all())
+        self.assertParity(InterestSerializer, Interest.objects.all())
+        self.assertParity(CustomSectionSerializer, CustomSection.objects.all())
+    
+    def test_unsupported_fields_keep_drf_path(self):
+        """Test that serializers reading unknown attributes are not compiled"""
+        with self.assertRaises(NotCompilable):
+            compile_serializer(BlogPostDetailSerializer)
+        with self.assertRaises(NotCompilable):
+            compile_serializer(ProfileSerializer)
+    
+    def test_list_endpoints_use_compiled_rows(self):
+        """Test that list pages load rows once, with one query per nested relation"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/blog/', {'cursor': '', 'page_size': 2})
+        # Page rows (joined to author and category), then the tags
+        self.assertEqual(len(queries), 2)
+        self.assertIn('api_category', queries.captured_queries[0]['sql'])
+        self.assertEqual([item['slug'] for item in response.data['results']], ['post-2', 'post-1'])
+        self.assertNotIn('category_name', self.client.get(response.data['next']).data['results'][0])
+        
+        detail = self.client.get('/api/projects/project-1/').data
+        item = self.client.get('/api/projects/').data['results'][0]
+        self.assertEqual(item['slug'], 'project-1')
+        self.assertEqual(item['thumbnail'], detail['thumbnail'])
+        self.assertEqual(item['tags'], detail['tags'])
+
+
 # Run tests with: python manage.py test
 # Or with pytest: pytest
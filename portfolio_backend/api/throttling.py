@@ -0,0 +1,27 @@
+"""
+Request throttles for the API app
+"""
+from rest_framework import throttling
+
+from .warmup import is_warming
+
+
+class WarmupExemptMixin:
+    """Never throttle the in-process cache warm-up requests"""
+
+    def allow_request(self, request, view):
+        if is_warming():
+            return True
+        return super().allow_request(request, view)
+
+
+class AnonRateThrottle(WarmupExemptMixin, throttling.AnonRateThrottle):
+    pass
+
+
+class UserRateThrottle(WarmupExemptMixin, throttling.UserRateThrottle):
+    pass
+
+
+class ScopedRateThrottle(WarmupExemptMixin, throttling.ScopedRateThrottle):
+    pass
@@ -0,0 +1,186 @@
+"""
+Search across all portfolio content in one request
+
+/api/search/?q= ranks the visible instances of every searchable model
+(SEARCH_FIELDS: projects, blog posts, experiences, certifications, custom
+sections and their items) through the active search backend, one indexed
+query per type. Backend scores are only comparable within a type, so each
+type's scores are divided by its best one before the hits are merged: the
+best match of every type scores 1.0, and the others keep their relative
+distance to it.
+
+The merged hits of a normalized query are cached under the 'search' cache
+domain, which every searchable model bumps, and paginated from there.
+"""
+import html
+import re
+import unicodedata
+
+from django.conf import settings
+from django.utils.html import escape, strip_tags
+
+from .models import BlogPost, Certification, CustomSection, CustomSectionItem, Experience, Project
+from .search_backends import field_values, related_fields, search
+from .search_cache import normalize_query
+from .utils import create_cache_key, get_or_build
+
+
+# Hit type of each searchable model, in tie-break order
+SEARCH_TYPES = {
+    'project': Project,
+    'post': BlogPost,
+    'experience': Experience,
+    'certification': Certification,
+    'section': CustomSection,
+    'section_item': CustomSectionItem,
+}
+
+# Best matches ranked per type
+MAX_HITS_PER_TYPE = 20
+SNIPPET_LENGTH = 160
+
+_word_re = re.compile(r'\w+')
+
+
+def visible_queryset(model):
+    """Instances of a searchable model shown to visitors"""
+    if model in (Project, BlogPost):
+        return model.objects.filter(status='published')
+    if model is CustomSectionItem:
+        return model.objects.filter(is_active=True, section__is_active=True)
+    return model.objects.filter(is_active=True)
+
+
+def _fold(word):
+    word = unicodedata.normalize('NFKD', word.lower())
+    return ''.join(char for char in word if not unicodedata.combining(char))
+
+
+def highlight(text, terms, length=SNIPPET_LENGTH):
+    """
+    Escaped excerpt of a text around its first match, matches in <mark>
+
+    Words match a term when their folded form starts with it, so 'caching'
+    is highlighted for 'cach'. HTML in the text is stripped first.
+
+    Returns:
+        HTML snippet, or None if no word matches
+    """
+    text = ' '.join(html.unescape(strip_tags(text)).split())
+    matches = [
+        match for match in _word_re.finditer(text)
+        if any(_fold(match.group()).startswith(term) for term in terms)
+    ]
+    if not matches:
+        return None
+
+    start = max(0, matches[0].start() - length // 4)
+    if start > 0:
+        # Start at a word boundary
+        space = text.rfind(' ', 0, start + 1)
+        start = space + 1 if space >= 0 else 0
+    end = min(len(text), start + length)
+
+    parts = ['…' if start > 0 else '']
+    position = start
+    for match in matches:
+        if match.end() > end:
+            break
+        if match.start() < position:
+            continue
+        parts.append(escape(text[position:match.start()]))
+        parts.append(f"<mark>{escape(match.group())}</mark>")
+        position = match.end()
+    parts.append(escape(text[position:end]))
+    parts.append('…' if end < len(text) else '')
+    return ''.join(parts)
+
+
+def _snippet(instance, terms):
+    """Highlighted excerpt of the first matching field, the title last"""
+    values = field_values(instance)
+    for value in values[1:] + values[:1]:
+        snippet = highlight(value, terms)
+        if snippet:
+            return snippet
+    return ''
+
+
+def _describe(kind, instance):
+    """Title, subtitle and slug of a hit"""
+    if kind == 'project':
+        return instance.title, instance.short_description, instance.slug
+    if kind == 'post':
+        return instance.title, instance.excerpt, instance.slug
+    if kind == 'experience':
+        return instance.title, instance.company, None
+    if kind == 'certification':
+        return instance.name, instance.issuing_organization, None
+    if kind == 'section':
+        return instance.title, '', instance.slug
+    return instance.title, instance.subtitle or instance.section.title, instance.section.slug
+
+
+def _type_hits(kind, query, terms):
+    """Ranked hits of one type, scores normalized to the best one"""
+    model = SEARCH_TYPES[kind]
+    queryset = visible_queryset(model)
+    ranked = search(model, query, queryset, limit=MAX_HITS_PER_TYPE)
+    if not ranked:
+        return []
+
+    if model is CustomSectionItem:
+        queryset = queryset.select_related('section')
+    instances = queryset.prefetch_related(*related_fields(model)).in_bulk([pk for pk, _ in ranked])
+    best = max(score for _, score in ranked)
+
+    hits = []
+    for position, (pk, score) in enumerate(ranked):
+        instance = instances.get(pk)
+        if instance is None:
+            continue
+        title, subtitle, slug = _describe(kind, instance)
+        hits.append({
+            'type': kind,
+            'id': pk,
+            'title': title,
+            'subtitle': subtitle,
+            'slug': slug,
+            # Unranked backends ('contains') score 0: fall back to the position
+            'score': round(score / best if best > 0 else 1 / (position + 1), 4),
+            'snippet': _snippet(instance, terms),
+        })
+    return hits
+
+
+def build_search_hits(query, types):
+    """Hits of every type for a normalized query, best first"""
+    terms = query.split()
+    hits = [hit for kind in types for hit in _type_hits(kind, query, terms)]
+    order = list(SEARCH_TYPES)
+    # Stable sort: equal scores keep the type order, then each type's ranking
+    hits.sort(key=lambda hit: (-hit['score'], order.index(hit['type'])))
+    return hits
+
+
+def search_everything(query, types=None):
+    """
+    Ranked hits across content types, cached per normalized query
+
+    Args:
+        query: Search text as typed
+        types: Hit types to search (keys of SEARCH_TYPES), default all
+
+    Returns:
+        List of hit dicts with 'type', 'id', 'title', 'subtitle', 'slug',
+        'score' (0-1) and 'snippet' (HTML with <mark>ed matches)
+    """
+    normalized = normalize_query(query)
+    types = [kind for kind in SEARCH_TYPES if types is None or kind in types]
+    if not normalized or not types:
+        return []
+
+    key = create_cache_key('search', 'all', q=normalized, types=','.join(types))
+    return get_or_build(
+        key, lambda: build_search_hits(normalized, types), settings.API_CACHE_TIMEOUT
+    )
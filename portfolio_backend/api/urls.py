@@ -8,7 +8,10 @@ from .views import (
     TagViewSet,
     SubscriberViewSet,
     HealthCheckViewSet,
+    AnalyticsViewSet,
     PortfolioView,
+    SuggestView,
+    SearchView,
     ProfileView,
     SkillsView,
     EducationView,
@@ -25,11 +28,14 @@ router.register(r'categories', CategoryViewSet, basename='category')
 router.register(r'tags', TagViewSet, basename='tag')
 router.register(r'subscribe', SubscriberViewSet, basename='subscriber')
 router.register(r'health', HealthCheckViewSet, basename='health')
+router.register(r'analytics', AnalyticsViewSet, basename='analytics')
 
 urlpatterns = [
     path('', include(router.urls)),
     # Portfolio content endpoints
     path('portfolio/', PortfolioView.as_view(), name='portfolio'),
+    path('suggest/', SuggestView.as_view(), name='suggest'),
+    path('search/', SearchView.as_view(), name='search'),
     path('profile/', ProfileView.as_view(), name='profile'),
     path('skills/', SkillsView.as_view(), name='skills'),
     path('education/', EducationView.as_view(), name='education'),
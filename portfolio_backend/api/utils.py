@@ -5,8 +5,12 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.core.cache import cache
 from PIL import Image
+import copy
 import os
 import hashlib
+import random
+import threading
+import time
 
 
 def get_client_ip(request):
@@ -128,14 +132,101 @@ def optimize_image(image_path, max_size=(1920, 1080), quality=85):
         return False
 
 
+def _cache_version_key(domain):
+    return f"cache_version:{domain}"
+
+
+def _cache_changed_key(domain):
+    return f"cache_changed:{domain}"
+
+
+def _initial_cache_version():
+    # Seed missing versions from the clock so an evicted version key can never
+    # fall back to a number whose entries are still sitting in the cache.
+    return int(time.time() * 1000)
+
+
+def get_cache_versions(*domains):
+    """
+    Get the current cache version of each content domain
+    
+    Returns:
+        Dict mapping domain name to its integer version
+    """
+    keys = {_cache_version_key(domain): domain for domain in domains}
+    versions = {}
+    
+    try:
+        found = cache.get_many(list(keys))
+        for key, domain in keys.items():
+            if key not in found:
+                cache.add(key, _initial_cache_version(), None)
+                found[key] = cache.get(key, _initial_cache_version())
+            versions[domain] = found[key]
+    except Exception:
+        # If cache fails, fall back to a fresh version so nothing stale is served
+        version = _initial_cache_version()
+        versions = {domain: version for domain in domains}
+    
+    return versions
+
+
+def get_cache_version(domain):
+    """Get the current cache version of a single content domain"""
+    return get_cache_versions(domain)[domain]
+
+
+def bump_cache_version(*domains):
+    """
+    Invalidate every cached entry of the given content domains
+    
+    Cache keys embed the domain version, so bumping it makes all existing
+    entries unreachable; they simply expire on their own. The bump time is
+    recorded too, since deletions leave no updated_at behind.
+    """
+    try:
+        now = int(time.time())
+        cache.set_many({_cache_changed_key(domain): now for domain in domains}, None)
+    except Exception as e:
+        print(f"Error recording cache change time: {e}")
+    
+    for domain in domains:
+        key = _cache_version_key(domain)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Version not initialised yet (or evicted)
+            cache.set(key, _initial_cache_version(), None)
+        except Exception as e:
+            print(f"Error bumping cache version for {domain}: {e}")
+
+
+def get_cache_changed_at(*domains):
+    """
+    Get the latest time any of the given content domains was invalidated
+    
+    Returns:
+        Unix timestamp, or None if no change was recorded
+    """
+    try:
+        changed = cache.get_many([_cache_changed_key(domain) for domain in domains])
+    except Exception:
+        return None
+    return max(changed.values(), default=None)
+
+
 def create_cache_key(prefix, *args, **kwargs):
     """
     Create a consistent cache key from prefix and arguments
     
+    The prefix names the content domain, and the key embeds its current
+    version so that content changes invalidate it (see bump_cache_version).
+    
     Example:
         create_cache_key('projects', 'list', page=1, status='published')
     """
-    parts = [str(prefix)]
+    version = get_cache_version(prefix)
+    parts = [str(prefix), f"v{version}"]
     parts.extend(str(arg) for arg in args)
     parts.extend(f"{k}={v}" for k, v in sorted(kwargs.items()))
     
@@ -144,25 +235,185 @@ def create_cache_key(prefix, *args, **kwargs):
     # Hash if key is too long
     if len(key_string) > 200:
         key_hash = hashlib.md5(key_string.encode()).hexdigest()
-        return f"{prefix}:{key_hash}"
+        return f"{prefix}:v{version}:{key_hash}"
     
     return key_string
 
 
-def invalidate_cache_pattern(pattern):
+# Striped per-process locks so threads of one worker coalesce before
+# contending for the shared cache lock
+_build_locks = [threading.Lock() for _ in range(64)]
+
+
+def _build_lock(key):
+    return _build_locks[hash(key) % len(_build_locks)]
+
+
+def set_built(key, value, timeout, stale_timeout=None, jitter=0.1, tags=None):
     """
-    Invalidate all cache keys matching a pattern
+    Store a value built for get_or_build
     
-    Note: This works with Redis backend. For other backends,
-    you might need to track keys separately.
+    The value is fresh for a jittered `timeout` (soft TTL), then served stale
+    for up to `stale_timeout` more (hard TTL) while it is being rebuilt.
+    Jitter keeps keys set together from expiring together. Tags allow
+    invalidating it with invalidate_cache_tags.
+    """
+    soft_ttl = timeout * random.uniform(1 - jitter, 1)
+    if stale_timeout is None:
+        stale_timeout = timeout
+    hard_ttl = soft_ttl + stale_timeout * random.uniform(1 - jitter, 1)
+    
+    entry = {'value': value, 'fresh_until': time.time() + soft_ttl}
+    set_tagged(key, entry, int(hard_ttl), tags)
+
+
+def get_or_build(key, build, timeout, stale_timeout=None, lock_timeout=30, tags=None):
+    """
+    Get a cached value, building it at most once across all workers
+    
+    When the value is stale, exactly one caller (holding the cache lock)
+    rebuilds it while everyone else keeps getting the stale value. When it
+    is missing, callers wait for the one building it instead of all hitting
+    the database at once (dogpile).
+    
+    The lock is a cache.add(), which is atomic in Redis and in the local
+    in-memory cache alike. `tags` may be a callable returning the tags of
+    the built value.
+    
+    Example:
+        data = get_or_build(
+            create_cache_key('projects', 'featured'),
+            lambda: ProjectListSerializer(featured, many=True).data,
+            timeout=60 * 60
+        )
+    """
+    entry = cache.get(key)
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry['value']
+    
+    lock_key = f"{key}:lock"
+    local_lock = _build_lock(key)
+    
+    def build_and_store(locked=True):
+        try:
+            value = build()
+            set_built(
+                key, value, timeout, stale_timeout,
+                tags=tags(value) if callable(tags) else tags
+            )
+            return value
+        finally:
+            if locked:
+                cache.delete(lock_key)
+    
+    if entry is not None:
+        # Stale: one caller refreshes, the rest serve the stale value
+        if not local_lock.acquire(blocking=False):
+            return entry['value']
+        try:
+            if not cache.add(lock_key, True, lock_timeout):
+                return entry['value']
+            return build_and_store()
+        finally:
+            local_lock.release()
+    
+    # Missing: wait for whoever is already building it
+    with local_lock:
+        deadline = time.time() + lock_timeout
+        while not cache.add(lock_key, True, lock_timeout):
+            entry = cache.get(key)
+            if entry is not None:
+                return entry['value']
+            if time.time() > deadline:
+                # The builder seems to have died; build without the lock
+                return build_and_store(locked=False)
+            time.sleep(0.05)
+        
+        entry = cache.get(key)
+        if entry is not None:
+            cache.delete(lock_key)
+            return entry['value']
+        return build_and_store()
+
+
+def set_tagged(key, value, timeout, tags=None):
+    """
+    Cache a value, attaching tags such as 'project:42' or 'blog-list'
+    
+    Tags are only tracked by backends supporting them (see
+    api/cache_backends.py); elsewhere this is a plain cache.set.
+    """
+    if tags and hasattr(cache, 'tag'):
+        cache.set(key, value, timeout, tags=tags)
+    else:
+        cache.set(key, value, timeout)
+
+
+def invalidate_cache_tags(*tags):
+    """
+    Delete every cache key attached to any of the given tags
+    
+    Membership is tracked per tag, so this deletes exactly those keys
+    without scanning the keyspace.
+    
+    Returns:
+        Number of keys invalidated, or None if the backend has no tags
     """
     try:
-        if hasattr(cache, 'delete_pattern'):
-            cache.delete_pattern(f"*{pattern}*")
-            return True
+        if hasattr(cache, 'delete_tags'):
+            return cache.delete_tags(tags)
     except Exception as e:
-        print(f"Error invalidating cache pattern: {e}")
-    return False
+        print(f"Error invalidating cache tags: {e}")
+    return None
+
+
+class VersionedIndex:
+    """
+    A worker's in-memory index of content, kept in step with a cache domain
+    
+    get() returns the index, rebuilt by build(version) once any worker has
+    bumped the domain version. refresh(update) bumps it and applies
+    update(index) to a copy that then replaces the index, so the worker
+    that made a change does not have to rebuild, and lookups running in
+    other threads never see a half-updated index. The index object needs a
+    `version` attribute, and copy.copy() of it must not share anything
+    update() changes.
+    """
+    
+    def __init__(self, domain, build):
+        self.domain = domain
+        self.build = build
+        self._index = None
+        self._lock = threading.Lock()
+    
+    def get(self):
+        version = get_cache_version(self.domain)
+        index = self._index
+        if index is not None and index.version == version:
+            return index
+        with self._lock:
+            # Read again: a refresh may have finished while we waited
+            version = get_cache_version(self.domain)
+            if self._index is None or self._index.version != version:
+                self._index = self.build(version)
+            return self._index
+    
+    def refresh(self, update):
+        with self._lock:
+            index = self._index
+            seen = index.version if index is not None else None
+            bump_cache_version(self.domain)
+            if index is None:
+                return
+            version = get_cache_version(self.domain)
+            
+            index = copy.copy(index)
+            update(index)
+            
+            # Keep the index only if no other worker changed content meanwhile
+            if version == seen + 1:
+                index.version = version
+            self._index = index
 
 
 def calculate_reading_time(text, words_per_minute=200):
@@ -1,10 +1,17 @@
+import datetime
+import json
+from functools import partial
+
 from rest_framework import viewsets, mixins, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
 from rest_framework.views import APIView
+from django.conf import settings
 from django.core.cache import cache
-from django.db.models import Q, Prefetch
+from django.db.models import Prefetch, Sum
+from django.utils import timezone
 from django.views.decorators.cache import cache_page
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
@@ -12,8 +19,8 @@ from django_filters.rest_framework import DjangoFilterBackend
 from .models import (
     Project, BlogPost, ContactSubmission, Category, Tag, Subscriber,
     Profile, Education, SkillGroup, SkillItem, ProjectBullet,
-    SocialLink, Experience, ExperienceBullet, Certification,
-    Language, Interest, CustomSection, CustomSectionItem
+    SocialLink, Experience, ExperienceBullet, CustomSectionItem,
+    AnalyticsHourly, AnalyticsDaily, VisitorSketch
 )
 from .serializers import (
     ProjectListSerializer,
@@ -21,6 +28,7 @@ from .serializers import (
     BlogPostListSerializer,
     BlogPostDetailSerializer,
     ContactSubmissionSerializer,
+    ContactSubmissionListSerializer,
     CategorySerializer,
     TagSerializer,
     SubscriberSerializer,
@@ -29,46 +37,75 @@ from .serializers import (
     SkillGroupSerializer,
     SocialLinkSerializer,
     ExperienceSerializer,
-    CertificationSerializer,
-    LanguageSerializer,
-    InterestSerializer,
-    CustomSectionSerializer,
-    PortfolioProjectSerializer,
-    PortfolioSerializer
+    PortfolioSerializer,
+    AnalyticsEventSerializer,
+    AnalyticsQuerySerializer
+)
+from .analytics import buffer_events, MAX_EVENTS_PER_BATCH
+from .parsers import BeaconJSONParser
+from .throttling import ScopedRateThrottle
+from .pagination import (
+    StandardResultsSetPagination, StandardOrCursorPagination, EstimatedCountPagination,
+    LargeResultsSetPagination
 )
-from .pagination import StandardResultsSetPagination, LargeResultsSetPagination
-from .filters import ProjectFilter, BlogPostFilter, ContactSubmissionFilter
+from .filters import ProjectFilter, BlogPostFilter, ContactSubmissionFilter, RankedSearchFilter
+from .decorators import versioned_cache_page, conditional_get
+from .mixins import (
+    CachedListMixin, CachedDetailMixin, CompiledListMixin, SparseFieldsetViewMixin,
+    list_cache_stats, parse_fieldset
+)
+from .responses import CachedJSONResponse
+from .search_backends import search
+from .search_cache import cached_search, normalize_query, record_query
+from .snapshots import get_portfolio_fieldset_payload, get_portfolio_snapshot
+from .spelling import correct_query
+from .suggest import suggest, MAX_RESULTS as MAX_SUGGESTIONS
+from .unified_search import SEARCH_TYPES, search_everything
+from .warmup import is_warming
 from .utils import (
     get_client_ip,
     get_user_agent,
     send_contact_email,
     send_welcome_email,
     create_cache_key,
+    get_or_build,
     check_rate_limit,
     RateLimitExceeded
 )
 
 
-class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
+# Cached responses are invalidated by content signals, not by expiry
+CACHE_TIMEOUT = settings.API_CACHE_TIMEOUT
+
+
+class ProjectViewSet(
+    SparseFieldsetViewMixin, CachedListMixin, CachedDetailMixin, CompiledListMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     ViewSet for viewing projects with optimization and caching
     
     Endpoints:
-    - GET /api/projects/ - List all published projects
+    - GET /api/projects/ - List all published projects (?cursor= for keyset pages)
     - GET /api/projects/{slug}/ - Get single project details
+    - ?fields=title,thumbnail&expand=description - Select the fields returned
     - GET /api/projects/featured/ - Get featured projects
+    - GET /api/projects/batch/?slugs=a,b,c - Get several project details at once
     """
     queryset = Project.objects.select_related().prefetch_related('tags')
-    pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = StandardOrCursorPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, RankedSearchFilter]
     filterset_class = ProjectFilter
-    search_fields = ['title', 'description', 'technologies_used']
+    # Substring matching, as project ?search= always did
+    search_backend = 'contains'
     ordering_fields = ['created_at', 'views_count', 'order']
     ordering = ['-is_featured', 'order', '-created_at']
     lookup_field = 'slug'
+    cache_domain = 'projects'
+    count_views = True
     
     def get_serializer_class(self):
-        if self.action == 'retrieve':
+        if self.action in ('retrieve', 'batch'):
             return ProjectDetailSerializer
         return ProjectListSerializer
     
@@ -80,81 +117,85 @@ class ProjectViewSet(viewsets.ReadOnlyModelViewSet):
         if not self.request.user.is_authenticated:
             queryset = queryset.filter(status='published')
         
+        # Load the unique visitor estimate with the object, not per object
+        if self.action in ('retrieve', 'batch'):
+            queryset = queryset.annotate(
+                unique_visitors_estimate=VisitorSketch.all_time_subquery(queryset.model)
+            )
+        
         return queryset
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(conditional_get('projects'))
     def list(self, request, *args, **kwargs):
         """List projects with caching"""
         return super().list(request, *args, **kwargs)
     
     def retrieve(self, request, *args, **kwargs):
-        """Get single project and increment view count"""
-        instance = self.get_object()
-        
-        # Increment view count (don't cache this)
-        instance.increment_views()
-        
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        """Get single project with caching and count the view"""
+        return super().retrieve(request, *args, **kwargs)
     
     @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """Get several projects by slug, cached per project"""
+        return self.batch_retrieve(request)
+    
+    @action(detail=False, methods=['get'])
+    @method_decorator(conditional_get('projects'))
     def featured(self, request):
         """Get featured projects"""
-        cache_key = create_cache_key('projects', 'featured')
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data)
-        
-        queryset = self.get_queryset().filter(is_featured=True)[:6]
-        serializer = self.get_serializer(queryset, many=True)
+        def build():
+            queryset = self.get_queryset().filter(is_featured=True)[:6]
+            return self.get_serializer(queryset, many=True).data
         
-        cache.set(cache_key, serializer.data, 60 * 30)  # Cache for 30 minutes
-        return Response(serializer.data)
+        cache_key = create_cache_key('projects', 'featured', self.get_visibility())
+        return Response(get_or_build(cache_key, build, CACHE_TIMEOUT))
     
     @action(detail=False, methods=['get'])
+    @method_decorator(conditional_get('projects'))
     def technologies(self, request):
         """Get list of all unique technologies used"""
-        cache_key = create_cache_key('projects', 'technologies')
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data)
-        
-        projects = self.get_queryset().filter(status='published')
-        all_techs = set()
-        
-        for project in projects:
-            techs = [tech.strip() for tech in project.technologies_used.split(',') if tech.strip()]
-            all_techs.update(techs)
-        
-        technologies = sorted(list(all_techs))
-        cache.set(cache_key, technologies, 60 * 60)  # Cache for 1 hour
+        def build():
+            projects = self.get_queryset().filter(status='published')
+            all_techs = set()
+            
+            for project in projects:
+                techs = [tech.strip() for tech in project.technologies_used.split(',') if tech.strip()]
+                all_techs.update(techs)
+            
+            return sorted(list(all_techs))
         
-        return Response(technologies)
+        cache_key = create_cache_key('projects', 'technologies')
+        return Response(get_or_build(cache_key, build, CACHE_TIMEOUT))
 
 
-class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
+class BlogPostViewSet(
+    SparseFieldsetViewMixin, CachedListMixin, CachedDetailMixin, CompiledListMixin,
+    viewsets.ReadOnlyModelViewSet
+):
     """
     ViewSet for viewing blog posts with optimization and caching
     
     Endpoints:
-    - GET /api/blog/ - List all published blog posts
+    - GET /api/blog/ - List all published blog posts (?cursor= for keyset pages)
     - GET /api/blog/{slug}/ - Get single blog post details
+    - ?fields=title,excerpt&expand=content - Select the fields returned
     - GET /api/blog/featured/ - Get featured blog posts
+    - GET /api/blog/batch/?slugs=a,b,c - Get several blog post details at once
     - GET /api/blog/search/?q=query - Search blog posts
     """
     queryset = BlogPost.objects.select_related('author', 'category').prefetch_related('tags')
-    pagination_class = StandardResultsSetPagination
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = StandardOrCursorPagination
+    # ?search= is ranked by BlogPostFilter, after the default ordering
+    filter_backends = [filters.OrderingFilter, DjangoFilterBackend]
     filterset_class = BlogPostFilter
-    search_fields = ['title', 'excerpt', 'content']
     ordering_fields = ['published_date', 'views_count', 'reading_time']
     ordering = ['-published_date']
     lookup_field = 'slug'
+    cache_domain = 'blog'
+    count_views = True
     
     def get_serializer_class(self):
-        if self.action == 'retrieve':
+        if self.action in ('retrieve', 'batch'):
             return BlogPostDetailSerializer
         return BlogPostListSerializer
     
@@ -166,71 +207,84 @@ class BlogPostViewSet(viewsets.ReadOnlyModelViewSet):
         if not self.request.user.is_authenticated:
             queryset = queryset.filter(status='published')
         
+        # Load the unique visitor estimate with the object, not per object
+        if self.action in ('retrieve', 'batch'):
+            queryset = queryset.annotate(
+                unique_visitors_estimate=VisitorSketch.all_time_subquery(queryset.model)
+            )
+        
         return queryset
     
-    @method_decorator(cache_page(60 * 10))  # Cache for 10 minutes
+    @method_decorator(conditional_get('blog'))
     def list(self, request, *args, **kwargs):
         """List blog posts with caching"""
         return super().list(request, *args, **kwargs)
     
     def retrieve(self, request, *args, **kwargs):
-        """Get single blog post and increment view count"""
-        instance = self.get_object()
-        
-        # Increment view count
-        instance.increment_views()
-        
-        serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        """Get single blog post with caching and count the view"""
+        return super().retrieve(request, *args, **kwargs)
+    
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """Get several blog posts by slug, cached per post"""
+        return self.batch_retrieve(request)
     
     @action(detail=False, methods=['get'])
+    @method_decorator(conditional_get('blog'))
     def featured(self, request):
         """Get featured blog posts"""
-        cache_key = create_cache_key('blog', 'featured')
-        cached_data = cache.get(cache_key)
+        def build():
+            queryset = self.get_queryset().filter(is_featured=True)[:6]
+            return self.get_serializer(queryset, many=True).data
         
-        if cached_data is not None:
-            return Response(cached_data)
-        
-        queryset = self.get_queryset().filter(is_featured=True)[:6]
-        serializer = self.get_serializer(queryset, many=True)
-        
-        cache.set(cache_key, serializer.data, 60 * 30)  # Cache for 30 minutes
-        return Response(serializer.data)
+        cache_key = create_cache_key('blog', 'featured', self.get_visibility())
+        return Response(get_or_build(cache_key, build, CACHE_TIMEOUT))
     
     @action(detail=False, methods=['get'])
+    @method_decorator(conditional_get('blog'))
     def search(self, request):
-        """Advanced search across blog posts"""
+        """Full-text search across blog posts, ranked by relevance"""
         query = request.query_params.get('q', '')
         
         if not query:
             return Response({'results': [], 'count': 0})
         
-        cache_key = create_cache_key('blog', 'search', q=query)
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data)
-        
-        queryset = self.get_queryset().filter(
-            Q(title__icontains=query) |
-            Q(excerpt__icontains=query) |
-            Q(content__icontains=query) |
-            Q(tags__name__icontains=query)
-        ).distinct()[:20]
-        
-        serializer = self.get_serializer(queryset, many=True)
-        result = {
-            'results': serializer.data,
-            'count': len(serializer.data),
-            'query': query
-        }
-        
-        cache.set(cache_key, result, 60 * 15)  # Cache for 15 minutes
-        return Response(result)
+        # Spelling variants of a query share one cache entry and popularity count
+        normalized = normalize_query(query)
+        if not normalized:
+            return Response({'results': [], 'count': 0, 'query': query})
+        if not is_warming():
+            record_query(normalized)
+        
+        def build(terms):
+            queryset = self.get_queryset()
+            ranked = [pk for pk, _ in search(BlogPost, terms, queryset, limit=20)]
+            posts = queryset.in_bulk(ranked)
+            
+            serializer = self.get_serializer([posts[pk] for pk in ranked if pk in posts], many=True)
+            return {
+                'results': serializer.data,
+                'count': len(serializer.data),
+            }
+        
+        visibility = self.get_visibility()
+        data = cached_search(visibility, normalized, partial(build, normalized), CACHE_TIMEOUT)
+        
+        # Did you mean: suggest a correction for misspelled queries, and
+        # search it instead with ?autocorrect=true
+        suggestion = None
+        if not data['count']:
+            suggestion = correct_query(normalized)
+            if suggestion and request.query_params.get('autocorrect', '').lower() in ('1', 'true'):
+                corrected = normalize_query(suggestion)
+                data = {
+                    **cached_search(visibility, corrected, partial(build, corrected), CACHE_TIMEOUT),
+                    'autocorrected': True,
+                }
+        return Response({**data, 'query': query, 'suggestion': suggestion})
 
 
-class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
+class CategoryViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing blog categories
     
@@ -242,17 +296,19 @@ class CategoryViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = CategorySerializer
     pagination_class = StandardResultsSetPagination
     lookup_field = 'slug'
+    cache_domain = 'categories'
     
-    @method_decorator(cache_page(60 * 30))  # Cache for 30 minutes
+    @method_decorator(conditional_get('categories'))
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
     
-    @method_decorator(cache_page(60 * 30))
+    @method_decorator(conditional_get('categories'))
+    @method_decorator(versioned_cache_page(CACHE_TIMEOUT, 'categories'))
     def retrieve(self, request, *args, **kwargs):
         return super().retrieve(request, *args, **kwargs)
 
 
-class TagViewSet(viewsets.ReadOnlyModelViewSet):
+class TagViewSet(CachedListMixin, viewsets.ReadOnlyModelViewSet):
     """
     ViewSet for viewing tags
     
@@ -264,22 +320,41 @@ class TagViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = TagSerializer
     pagination_class = LargeResultsSetPagination
     lookup_field = 'slug'
+    cache_domain = 'tags'
     
-    @method_decorator(cache_page(60 * 30))  # Cache for 30 minutes
+    @method_decorator(conditional_get('tags'))
     def list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
 
-class ContactSubmissionViewSet(mixins.CreateModelMixin, viewsets.GenericViewSet):
+class ContactSubmissionViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     ViewSet for creating contact submissions with rate limiting
     
     Endpoints:
     - POST /api/contact/ - Submit contact form
+    - GET /api/contact/ - List submissions (staff only, estimated counts)
     """
     queryset = ContactSubmission.objects.all()
     serializer_class = ContactSubmissionSerializer
     permission_classes = [AllowAny]
+    pagination_class = EstimatedCountPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = ContactSubmissionFilter
+    ordering_fields = ['submitted_at', 'status']
+    ordering = ['-submitted_at']
+    # Domain invalidating the cached counts (responses are not cached)
+    count_cache_domain = 'contact'
+    
+    def get_permissions(self):
+        if self.action == 'list':
+            return [IsAdminUser()]
+        return super().get_permissions()
+    
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return ContactSubmissionListSerializer
+        return ContactSubmissionSerializer
 
     def create(self, request, *args, **kwargs):
         """Handle contact form submission with rate limiting"""
@@ -396,85 +471,174 @@ class HealthCheckViewSet(viewsets.ViewSet):
             status_data['cache'] = f'error: {str(e)}'
             status_data['status'] = 'degraded'
         
+        # Per-tier hit/miss counters of this worker
+        if hasattr(cache, 'stats'):
+            status_data['cache_stats'] = cache.stats()
+        status_data['list_cache_stats'] = list_cache_stats()
+        
         return Response(status_data)
 
 
+class AnalyticsViewSet(viewsets.ViewSet):
+    """
+    Page and section view analytics
+
+    Endpoints:
+    - POST /api/analytics/events/ - Record a batch of view events (sendBeacon)
+    - GET /api/analytics/ - Hourly or daily view counts (staff only)
+    """
+    permission_classes = [IsAdminUser]
+    throttle_scope = 'analytics'
+
+    def list(self, request):
+        """
+        Return rolled-up view counts
+
+        Query parameters: granularity (day or hour), kind, name, and the
+        start/end dates (default: the last 30 days)
+        """
+        params = AnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        params = params.validated_data
+
+        end = params.get('end') or timezone.localdate()
+        start = params.get('start') or end - datetime.timedelta(days=29)
+        if params['granularity'] == 'hour':
+            bucket = 'hour'
+            rows = AnalyticsHourly.objects.filter(hour__date__range=(start, end))
+        else:
+            bucket = 'date'
+            rows = AnalyticsDaily.objects.filter(date__range=(start, end))
+
+        if params.get('kind'):
+            rows = rows.filter(kind=params['kind'])
+        if params.get('name'):
+            rows = rows.filter(name=params['name'])
+
+        totals = rows.values('kind', 'name').annotate(total=Sum('count')).order_by('-total', 'kind', 'name')
+        return Response({
+            'granularity': params['granularity'],
+            'start': start,
+            'end': end,
+            'totals': list(totals),
+            'results': list(rows.order_by(bucket, 'kind', 'name').values(bucket, 'kind', 'name', 'count')),
+        })
+
+    @action(
+        detail=False,
+        methods=['post'],
+        # Beacons carry no CSRF token, and the events are public anyway
+        authentication_classes=[],
+        permission_classes=[AllowAny],
+        parser_classes=[JSONParser, BeaconJSONParser],
+        throttle_classes=[ScopedRateThrottle],
+    )
+    def events(self, request):
+        """
+        Buffer a batch of view events
+
+        Accepts a list of {"kind": "page"|"section", "name": ...} objects, or
+        an object with such a list under "events". Nothing is written to the
+        database here; see api/analytics.py.
+        """
+        events = request.data
+        if isinstance(events, dict):
+            events = events.get('events')
+        if not isinstance(events, list) or not events:
+            return Response({'error': 'Expected a list of events.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(events) > MAX_EVENTS_PER_BATCH:
+            return Response(
+                {'error': f'At most {MAX_EVENTS_PER_BATCH} events per batch.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        serializer = AnalyticsEventSerializer(data=events, many=True)
+        serializer.is_valid(raise_exception=True)
+        buffer_events((event['kind'], event['name']) for event in serializer.validated_data)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
 class PortfolioView(APIView):
     """
     Main API endpoint that returns all portfolio content in a single request.
-    This is optimized for the frontend to load all data at once.
+    This is optimized for the frontend to load all data at once: the payload
+    is served from a snapshot rebuilt after each content change.
     
     Endpoints:
     - GET /api/portfolio/ - Get complete portfolio data
+    - GET /api/portfolio/?fields=title,slug,featured_image - Select the project fields
     """
     permission_classes = [AllowAny]
     
-    @method_decorator(cache_page(60 * 5))  # Cache for 5 minutes
+    @method_decorator(conditional_get('portfolio'))
     def get(self, request):
-        """Return all portfolio data"""
-        cache_key = create_cache_key('portfolio', 'full')
-        cached_data = cache.get(cache_key)
-        
-        if cached_data is not None:
-            return Response(cached_data)
+        """Return all portfolio data from the pre-encoded snapshot"""
+        fieldset = {
+            name: parse_fieldset(request.query_params.getlist(name))
+            for name in SparseFieldsetViewMixin.fieldset_params
+        }
+        if any(fieldset.values()):
+            snapshot = get_portfolio_fieldset_payload(request, fieldset)
+        else:
+            snapshot = get_portfolio_snapshot(request)
         
-        # Get or create profile
-        profile = Profile.objects.first()
+        if request.accepted_renderer.format == 'json':
+            return CachedJSONResponse.from_encoded(request, snapshot)
         
-        # Gather all portfolio data with optimized queries
-        data = {
-            'profile': ProfileSerializer(
-                profile, 
-                context={'request': request}
-            ).data if profile else None,
-            
-            'skills': SkillGroupSerializer(
-                SkillGroup.objects.prefetch_related('items'),
-                many=True
-            ).data,
-            
-            'education': EducationSerializer(
-                Education.objects.all(),
-                many=True
-            ).data,
-            
-            'experiences': ExperienceSerializer(
-                Experience.objects.filter(is_active=True).prefetch_related('bullets'),
-                many=True
-            ).data,
-            
-            'certifications': CertificationSerializer(
-                Certification.objects.filter(is_active=True),
-                many=True
-            ).data,
-            
-            'languages': LanguageSerializer(
-                Language.objects.filter(is_active=True),
-                many=True
-            ).data,
-            
-            'interests': InterestSerializer(
-                Interest.objects.filter(is_active=True),
-                many=True
-            ).data,
-            
-            'projects': PortfolioProjectSerializer(
-                Project.objects.filter(status='published')
-                    .prefetch_related('bullets', 'tags')
-                    .order_by('-is_featured', 'order', '-created_at'),
-                many=True,
-                context={'request': request}
-            ).data,
-            
-            'custom_sections': CustomSectionSerializer(
-                CustomSection.objects.filter(is_active=True)
-                    .prefetch_related('items'),
-                many=True
-            ).data,
-        }
+        # Browsable API needs the data itself
+        return Response(json.loads(snapshot['body']))
+
+
+class SuggestView(APIView):
+    """
+    Typeahead suggestions for projects, blog posts, tags and technologies,
+    answered from an in-memory prefix index (api/suggest.py)
+    
+    Endpoints:
+    - GET /api/suggest/?q=dja&limit=8 - Suggestions for a typed prefix
+    """
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'suggest'
+    
+    def get(self, request):
+        """Return the suggestions matching the start of a word"""
+        query = request.query_params.get('q', '').strip()
+        try:
+            limit = int(request.query_params.get('limit', 8))
+        except ValueError:
+            limit = 8
         
-        cache.set(cache_key, data, 60 * 5)  # Cache for 5 minutes
-        return Response(data)
+        results = suggest(query, min(limit, MAX_SUGGESTIONS)) if query else []
+        return Response({'query': query, 'results': results})
+
+
+class SearchView(APIView):
+    """
+    Search across projects, blog posts, experiences, certifications and
+    custom sections, merged by normalized relevance (api/unified_search.py)
+    
+    Endpoints:
+    - GET /api/search/?q=django&type=project,post&page=2 - Paginated typed hits
+    """
+    permission_classes = [AllowAny]
+    pagination_class = StandardResultsSetPagination
+    
+    @method_decorator(conditional_get('search'))
+    def get(self, request):
+        """Return one page of hits with highlighted snippets"""
+        query = request.query_params.get('q', '')
+        types = request.query_params.get('type')
+        if types:
+            types = {kind.strip() for kind in types.split(',')} & set(SEARCH_TYPES)
+        
+        hits = search_everything(query, types or None)
+        paginator = self.pagination_class()
+        page = paginator.paginate_queryset(hits, request, view=self)
+        response = paginator.get_paginated_response(page)
+        response.data['query'] = query
+        response.data['suggestion'] = None if hits else correct_query(query)
+        return response
 
 
 class ProfileView(APIView):
@@ -486,7 +650,8 @@ class ProfileView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @method_decorator(cache_page(60 * 10))  # Cache for 10 minutes
+    @method_decorator(conditional_get('profile'))
+    @method_decorator(versioned_cache_page(CACHE_TIMEOUT, 'profile'))
     def get(self, request):
         """Return profile data"""
         profile = Profile.objects.first()
@@ -506,7 +671,8 @@ class SkillsView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(conditional_get('skills'))
+    @method_decorator(versioned_cache_page(CACHE_TIMEOUT, 'skills'))
     def get(self, request):
         """Return skills data"""
         skills = SkillGroup.objects.prefetch_related('items').all()
@@ -523,7 +689,8 @@ class EducationView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(conditional_get('education'))
+    @method_decorator(versioned_cache_page(CACHE_TIMEOUT, 'education'))
     def get(self, request):
         """Return education data"""
         education = Education.objects.all()
@@ -540,7 +707,8 @@ class ExperienceView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(conditional_get('experience'))
+    @method_decorator(versioned_cache_page(CACHE_TIMEOUT, 'experience'))
     def get(self, request):
         """Return experience data"""
         experience = Experience.objects.filter(is_active=True).prefetch_related('bullets')
@@ -557,7 +725,8 @@ class SocialLinksView(APIView):
     """
     permission_classes = [AllowAny]
     
-    @method_decorator(cache_page(60 * 15))  # Cache for 15 minutes
+    @method_decorator(conditional_get('social_links'))
+    @method_decorator(versioned_cache_page(CACHE_TIMEOUT, 'social_links'))
     def get(self, request):
         """Return social links"""
         links = SocialLink.objects.filter(is_active=True)
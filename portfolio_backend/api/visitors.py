@@ -0,0 +1,202 @@
+"""
+Approximate unique visitors of projects and blog posts
+
+Each detail view adds an anonymous visitor id (a hash of the client IP and
+user agent; known bots are skipped) to a HyperLogLog sketch of the object
+for the day: a Redis PFADD key shared by all workers, or an in-process
+sketch without Redis. Every VISITOR_FLUSH_INTERVAL seconds the day sketches
+are merged into a stored VisitorSketch row per object and day, and into an
+all-time row whose estimate is what the API and admin show. Merging is a
+register-wise maximum, so re-merging a Redis sketch is harmless, and the
+unique visitors over any window are counted by merging its day sketches in
+constant memory (unique_visitors()).
+"""
+import hashlib
+import re
+import threading
+
+from django.apps import apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .counters import buffer_redis, start_flusher
+from .hyperloglog import HyperLogLog
+from .models import VisitorSketch
+from .utils import get_client_ip, get_user_agent, invalidate_cache_tags
+
+
+REDIS_KEY_PREFIX = 'portfolio:visitors:'
+REDIS_DIRTY_KEY = 'portfolio:visitors:dirty'
+# Day sketches only need to outlive the flush of the last visit of the day
+REDIS_SKETCH_TIMEOUT = 60 * 60 * 48
+
+BOT_USER_AGENTS = re.compile(
+    r'bot|crawl|spider|slurp|facebookexternalhit|preview|curl|wget|python-requests|'
+    r'httpx|aiohttp|go-http-client|headless|lighthouse|pingdom|uptime',
+    re.IGNORECASE
+)
+
+_sketches = {}  # (model label, pk, date) -> HyperLogLog
+_sketches_lock = threading.Lock()
+
+
+def visitor_id(request):
+    """Anonymous id of the visitor making a request, or None for bots"""
+    user_agent = get_user_agent(request)
+    if not user_agent or BOT_USER_AGENTS.search(user_agent):
+        return None
+    return hashlib.sha256(f"{get_client_ip(request)}|{user_agent}".encode()).digest()[:16]
+
+
+def record_visitor(model, pk, visitor):
+    """Add a visitor to today's sketch of a model instance"""
+    start_flusher(flush_visitor_sketches, settings.VISITOR_FLUSH_INTERVAL, _sketches.clear)
+    label = model._meta.label
+    day = timezone.localdate()
+
+    redis = buffer_redis()
+    if redis is not None:
+        key = f"{REDIS_KEY_PREFIX}{label}:{pk}:{day.isoformat()}"
+        try:
+            pipe = redis.pipeline()
+            pipe.pfadd(key, visitor)
+            pipe.expire(key, REDIS_SKETCH_TIMEOUT)
+            pipe.sadd(REDIS_DIRTY_KEY, key)
+            pipe.execute()
+            return
+        except Exception as e:
+            print(f"Error adding visitor to Redis sketch: {e}")
+
+    with _sketches_lock:
+        sketch = _sketches.setdefault((label, pk, day), HyperLogLog())
+        sketch.add(visitor)
+
+
+def _keep_sketches(sketches):
+    """Merge sketches back into the in-process buffer"""
+    with _sketches_lock:
+        for key, sketch in sketches.items():
+            if key in _sketches:
+                _sketches[key].merge(sketch)
+            else:
+                _sketches[key] = sketch
+
+
+def _take_sketches():
+    """Atomically take the day sketches changed since the last flush"""
+    with _sketches_lock:
+        taken = dict(_sketches)
+        _sketches.clear()
+
+    redis = buffer_redis()
+    if redis is not None:
+        try:
+            pipe = redis.pipeline()
+            pipe.smembers(REDIS_DIRTY_KEY)
+            pipe.delete(REDIS_DIRTY_KEY)
+            keys = sorted(key.decode() for key in pipe.execute()[0])
+            values = redis.mget(keys) if keys else []
+        except Exception as e:
+            print(f"Error reading visitor sketches from Redis: {e}")
+            keys, values = [], []
+
+        for key, value in zip(keys, values):
+            if value is None:
+                continue
+            label, pk, day = key[len(REDIS_KEY_PREFIX):].rsplit(':', 2)
+            key = (label, int(pk), parse_date(day))
+            sketch = HyperLogLog.from_redis(value)
+            if key in taken:
+                taken[key].merge(sketch)
+            else:
+                taken[key] = sketch
+
+    return taken
+
+
+def _store_sketches(sketches):
+    """Merge {(label, pk, date): sketch} into the stored day and all-time rows"""
+    totals = {}
+    for (label, pk, day), sketch in sketches.items():
+        totals.setdefault((label, pk, None), HyperLogLog()).merge(sketch)
+
+    rows = VisitorSketch.objects.select_for_update().filter(
+        Q(date__in={day for _, _, day in sketches}) | Q(date__isnull=True),
+        model__in={label for label, _, _ in totals},
+        object_id__in={pk for _, pk, _ in totals},
+    )
+    stored = {(row.model, row.object_id, row.date): row for row in rows}
+
+    now = timezone.now()
+    created = []
+    updated = []
+    for key, sketch in {**sketches, **totals}.items():
+        row = stored.get(key)
+        if row is None:
+            row = VisitorSketch(model=key[0], object_id=key[1], date=key[2])
+            created.append(row)
+        else:
+            sketch = HyperLogLog.from_bytes(row.registers).merge(sketch)
+            updated.append(row)
+        row.registers = sketch.to_bytes()
+        row.estimate = sketch.count()
+        row.updated_at = now
+
+    VisitorSketch.objects.bulk_create(created)
+    VisitorSketch.objects.bulk_update(updated, ['registers', 'estimate', 'updated_at'])
+
+
+def flush_visitor_sketches():
+    """
+    Merge the buffered day sketches into the stored ones
+
+    Cached detail responses of the objects are invalidated so they show the
+    new estimate.
+
+    Returns:
+        Number of day sketches merged
+    """
+    sketches = _take_sketches()
+    if not sketches:
+        return 0
+
+    try:
+        with transaction.atomic():
+            _store_sketches(sketches)
+    except Exception as e:
+        print(f"Error flushing visitor sketches: {e}")
+        # Keep them for the next flush
+        _keep_sketches(sketches)
+        return 0
+
+    invalidate_cache_tags(*{
+        f"{apps.get_model(label)._meta.model_name}:{pk}" for label, pk, _ in sketches
+    })
+    return len(sketches)
+
+
+def unique_visitors(obj, start=None, end=None):
+    """
+    Estimated unique visitors of a model instance
+
+    Without dates this is the stored all-time estimate; with them, the day
+    sketches from start to end (inclusive) are merged and counted.
+    """
+    if start is None and end is None:
+        return VisitorSketch.all_time_estimate(obj)
+
+    rows = VisitorSketch.objects.filter(
+        model=obj._meta.label, object_id=obj.pk, date__isnull=False
+    )
+    if start is not None:
+        rows = rows.filter(date__gte=start)
+    if end is not None:
+        rows = rows.filter(date__lte=end)
+
+    sketch = HyperLogLog()
+    for registers in rows.values_list('registers', flat=True).iterator():
+        sketch.merge(HyperLogLog.from_bytes(registers))
+    return sketch.count()
@@ -0,0 +1,175 @@
+"""
+Cache warm-up
+
+Renders the cacheable public endpoints in-process so the first visitors
+after a deploy or a cache flush do not pay the cold-path cost. Used by the
+`warm_cache` management command and the gunicorn boot hook.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import URLPattern, reverse
+
+from .models import Tag
+from .search_cache import normalize_query, popular_queries
+
+
+_local = threading.local()
+
+
+@contextmanager
+def warming():
+    """Mark requests rendered by the current thread as warm-up requests"""
+    _local.active = True
+    try:
+        yield
+    finally:
+        _local.active = False
+
+
+def is_warming():
+    """Whether the current thread is rendering a warm-up request"""
+    return getattr(_local, 'active', False)
+
+
+def get_default_host():
+    return (
+        settings.CACHE_WARMUP_HOST
+        or settings.RENDER_EXTERNAL_HOSTNAME
+        or settings.ALLOWED_HOSTS[0]
+    )
+
+
+def get_popular_search_terms(limit=5):
+    """
+    The most searched blog queries, topped up with the names of the tags
+    used by the most published blog posts
+    """
+    terms = popular_queries(limit)
+    if len(terms) < limit:
+        tags = (
+            Tag.objects.filter(blog_posts__status='published')
+            .annotate(posts=Count('blog_posts'))
+            .order_by('-posts', 'name')
+            .values_list('name', flat=True)[:limit]
+        )
+        terms += [tag for tag in tags if normalize_query(tag) not in terms][:limit - len(terms)]
+    return terms
+
+
+def get_warmup_urls(search_terms=None):
+    """
+    Enumerate the cacheable public URLs from api/urls.py
+
+    Covers the list, detail and GET extra actions of every cached viewset
+    (searches once per term, batches not at all) and every named plain view.
+
+    Returns:
+        List of (url, follow_pages) tuples; list URLs are paginated
+    """
+    from . import urls
+
+    if search_terms is None:
+        search_terms = settings.CACHE_WARMUP_SEARCH_TERMS or get_popular_search_terms()
+
+    targets = []
+    for prefix, viewset, basename in urls.router.registry:
+        if getattr(viewset, 'cache_domain', None) is None:
+            continue
+
+        targets.append((reverse(f'{basename}-list'), True))
+
+        for action in viewset.get_extra_actions():
+            if action.detail or 'get' not in action.mapping:
+                continue
+            if action.url_name == 'batch':
+                # Served from the detail entries warmed below
+                continue
+            url = reverse(f'{basename}-{action.url_name}')
+            if action.url_name == 'search':
+                targets.extend(
+                    (f"{url}?{urlencode({'q': term})}", False) for term in search_terms
+                )
+            else:
+                targets.append((url, False))
+
+        model = viewset.queryset.model
+        objects = model.objects.all()
+        if any(field.name == 'status' for field in model._meta.fields):
+            objects = objects.filter(status='published')
+        for slug in objects.values_list(viewset.lookup_field, flat=True):
+            targets.append((reverse(f'{basename}-detail', args=[slug]), False))
+
+    for pattern in urls.urlpatterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            targets.append((reverse(pattern.name), False))
+
+    return targets
+
+
+def warm_url(url, host, secure=False, max_pages=1):
+    """
+    Render a URL (and up to max_pages of its pagination) as an anonymous visitor
+
+    Returns:
+        List of dicts with 'url', 'status' and 'seconds' per rendered page
+    """
+    client = Client(raise_request_exception=False)
+    extra = {'HTTP_HOST': host}
+    if secure:
+        extra['HTTP_X_FORWARDED_PROTO'] = 'https'
+
+    results = []
+    with warming():
+        while url and len(results) < max_pages:
+            start = time.perf_counter()
+            response = client.get(url, secure=secure, **extra)
+            results.append({
+                'url': url,
+                'status': response.status_code,
+                'seconds': time.perf_counter() - start,
+            })
+
+            url = None
+            if response.status_code == 200 and max_pages > 1:
+                data = response.json()
+                if isinstance(data, dict) and data.get('next'):
+                    url = data['next']
+
+    return results
+
+
+def _warm_url_in_thread(*args):
+    try:
+        return warm_url(*args)
+    finally:
+        # Pool threads open their own connections
+        connections.close_all()
+
+
+def warm_cache(host=None, secure=None, workers=4, max_pages=3, search_terms=None):
+    """
+    Render every warm-up URL in parallel, populating the caches
+
+    Returns:
+        List of per-page result dicts (see warm_url), in URL order
+    """
+    host = host or get_default_host()
+    if secure is None:
+        secure = not settings.DEBUG
+
+    targets = get_warmup_urls(search_terms)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_warm_url_in_thread, url, host, secure, max_pages if paginated else 1)
+            for url, paginated in targets
+        ]
+        return [result for future in futures for result in future.result()]
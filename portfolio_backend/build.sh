@@ -73,6 +73,7 @@ python manage.py collectstatic --noinput
 echo ""
 echo "🗄️  [4/5] Running database migrations..."
 python manage.py migrate --noinput
+python manage.py rebuild_search_index
 
 # ----------------------------------------------------------------------------
 # Step 5: Create cache table (if using database cache)
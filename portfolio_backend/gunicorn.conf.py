@@ -0,0 +1,47 @@
+"""
+Gunicorn configuration
+
+Loaded automatically when gunicorn starts from this directory. Command-line
+options (e.g. the startCommand in render.yaml) take precedence.
+"""
+import threading
+
+
+def post_worker_init(worker):
+    """Warm the caches in the background once a worker has loaded the app"""
+    from django.conf import settings
+
+    if not settings.CACHE_WARMUP_ON_BOOT:
+        return
+
+    def warm():
+        from api.warmup import warm_cache
+
+        try:
+            results = warm_cache()
+            seconds = sum(result['seconds'] for result in results)
+            worker.log.info(f"Cache warm-up rendered {len(results)} URLs in {seconds:.2f}s")
+        except Exception as e:
+            worker.log.error(f"Error warming cache: {e}")
+
+    threading.Thread(target=warm, name='cache-warmup', daemon=True).start()
+
+
+def worker_exit(server, worker):
+    """Write the buffered view counts, analytics and visitors before the worker goes away"""
+    from api.analytics import flush_analytics
+    from api.counters import flush_view_counts
+    from api.visitors import flush_visitor_sketches
+
+    try:
+        flush_view_counts()
+    except Exception as e:
+        worker.log.error(f"Error flushing view counts: {e}")
+    try:
+        flush_analytics()
+    except Exception as e:
+        worker.log.error(f"Error flushing analytics: {e}")
+    try:
+        flush_visitor_sketches()
+    except Exception as e:
+        worker.log.error(f"Error flushing visitor sketches: {e}")
@@ -122,33 +122,99 @@ else:
     }
 
 # Cache configuration
-# Render.com provides REDIS_URL; fallback to local memory cache
+# Render.com provides REDIS_URL; fallback to local memory cache.
+# The default cache keeps hot keys in a per-worker LRU (api/cache_backends.py);
+# with Redis it sits in front of the shared 'redis' cache and drops local
+# copies on pub/sub invalidations.
 REDIS_URL = os.getenv('REDIS_URL')
 
+LOCAL_CACHE_OPTIONS = {
+    'MAX_ENTRIES': int(os.getenv('LOCAL_CACHE_MAX_ENTRIES', 1000)),
+    'MAX_BYTES': int(os.getenv('LOCAL_CACHE_MAX_MB', 32)) * 1024 * 1024,
+}
+
 if REDIS_URL:
-    # Production: Use Redis from Render.com
+    # Production: Use Redis from Render.com behind the in-process tier
     CACHES = {
         'default': {
+            'BACKEND': 'api.cache_backends.TwoTierCache',
+            'OPTIONS': {
+                **LOCAL_CACHE_OPTIONS,
+                'SHARED_CACHE': 'redis',
+                'LOCAL_TIMEOUT': int(os.getenv('LOCAL_CACHE_TIMEOUT', 60)),
+                'CHANNEL': 'portfolio:cache-invalidation',
+            },
+            'TIMEOUT': 300,
+        },
+        'redis': {
             'BACKEND': 'django_redis.cache.RedisCache',
             'LOCATION': REDIS_URL,
             'OPTIONS': {
                 'CLIENT_CLASS': 'django_redis.client.DefaultClient',
                 'CONNECTION_POOL_KWARGS': {'max_connections': 50},
                 'PARSER_CLASS': 'redis.connection.HiredisParser',
+                # Compact JSON, zlib-compressed above the threshold
+                # (api/cache_serializers.py; compare with manage.py benchmark_cache)
+                'SERIALIZER': 'api.cache_serializers.JSONSerializer',
+                'COMPRESSOR': 'api.cache_serializers.ZlibCompressor',
+                'COMPRESS_MIN_LENGTH': int(os.getenv('CACHE_COMPRESS_MIN_LENGTH', 1024)),
+                'COMPRESS_LEVEL': int(os.getenv('CACHE_COMPRESS_LEVEL', 6)),
             },
             'KEY_PREFIX': 'portfolio',
             'TIMEOUT': 300,
         }
     }
 else:
-    # Development: Use local memory cache
+    # Development: Use local memory cache only
     CACHES = {
         'default': {
-            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-            'LOCATION': 'unique-snowflake',
+            'BACKEND': 'api.cache_backends.TwoTierCache',
+            'OPTIONS': LOCAL_CACHE_OPTIONS,
         }
     }
 
+# Cached API responses embed a per-domain version that model signals bump on
+# every content change (see api/signals.py), so they can safely live for a day.
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# Detail page views are buffered (Redis or in-process) and written to the
+# database in one UPDATE per model every this many seconds (api/counters.py)
+VIEW_COUNT_FLUSH_INTERVAL = int(os.getenv('VIEW_COUNT_FLUSH_INTERVAL', 10))
+
+# Page/section view beacons are buffered the same way and added to the hourly
+# and daily rollup tables every this many seconds (api/analytics.py)
+ANALYTICS_FLUSH_INTERVAL = int(os.getenv('ANALYTICS_FLUSH_INTERVAL', 60))
+
+# Unique visitors of project/blog details are counted in HyperLogLog sketches
+# (Redis PFADD or in-process) merged into the database this often (api/visitors.py)
+VISITOR_FLUSH_INTERVAL = int(os.getenv('VISITOR_FLUSH_INTERVAL', 60))
+
+# Background threads run those flushes (an interval of 0 disables one of
+# them). The test runner turns them all off: tests flush explicitly.
+BACKGROUND_FLUSH = os.getenv('BACKGROUND_FLUSH', 'True').lower() in ('true', '1', 'yes', 'on')
+TEST_RUNNER = 'portfolio_backend.test_runner.TestRunner'
+
+# Full-text search of projects and blog posts (api/search_backends.py):
+# 'database' (PostgreSQL tsvector / SQLite FTS5), 'index' (BM25 tables),
+# 'contains' (unindexed icontains) or 'auto' (= 'database'). Signals only
+# update the active backend: run `manage.py rebuild_search_index` after
+# switching, e.g. from 'auto' to 'index'.
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+# PostgreSQL text search configuration (stemming and stopwords)
+SEARCH_CONFIG = os.getenv('SEARCH_CONFIG', 'english')
+# How many of the most searched blog queries are re-rendered after blog
+# changes (api/search_cache.py)
+SEARCH_REFRESH_QUERIES = int(os.getenv('SEARCH_REFRESH_QUERIES', 10))
+
+# Cache warm-up (python manage.py warm_cache, or on gunicorn worker boot).
+# The host defaults to RENDER_EXTERNAL_HOSTNAME or the first ALLOWED_HOSTS entry;
+# search terms default to the most searched queries, then the most used blog tags.
+CACHE_WARMUP_ON_BOOT = os.getenv('CACHE_WARMUP_ON_BOOT', 'False').lower() in ('true', '1', 'yes', 'on')
+CACHE_WARMUP_HOST = os.getenv('CACHE_WARMUP_HOST', '')
+CACHE_WARMUP_SEARCH_TERMS = [
+    term.strip() for term in os.getenv('CACHE_WARMUP_SEARCH_TERMS', '').split(',') if term.strip()
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -209,12 +275,14 @@ REST_FRAMEWORK = {
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle',
+        'api.throttling.AnonRateThrottle',
+        'api.throttling.UserRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
         'anon': os.getenv('THROTTLE_ANON', '100/hour'),
         'user': os.getenv('THROTTLE_USER', '1000/hour'),
+        'analytics': os.getenv('THROTTLE_ANALYTICS', '600/hour'),
+        'suggest': os.getenv('THROTTLE_SUGGEST', '3000/hour'),
     },
     'EXCEPTION_HANDLER': 'rest_framework.views.exception_handler',
     'DEFAULT_SCHEMA_CLASS': 'rest_framework.schemas.coreapi.AutoSchema',
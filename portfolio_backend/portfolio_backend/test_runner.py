@@ -0,0 +1,23 @@
+"""
+Test runner of the project (TEST_RUNNER in settings.py)
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Django's runner without background flush threads
+
+    Tests flush buffered view counts, analytics and visitor sketches
+    explicitly, so no thread writes to the test database behind their back.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._background_flush = override_settings(BACKGROUND_FLUSH=False)
+        self._background_flush.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._background_flush.disable()
+        super().teardown_test_environment(**kwargs)